@@ -0,0 +1,594 @@
+import copy
+import numpy as np
+from collections.abc import MutableMapping
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    Union
+)
+
+
+__all__ = ["ConfigBatch", "ConfigRow", "as_column"]
+
+
+Path = Tuple[Hashable, ...]
+
+
+class _Missing:
+    """
+    Marks the rows of a column where the key does not exist.
+    """
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+_IMMUTABLE_TYPES = (bool, int, float, complex, str, bytes, type(None))
+
+
+def _as_path(path: Union[Hashable, Sequence[Hashable]]) -> Path:
+    """
+    Convert a key or a sequence of nested keys to a ``tuple`` path.
+    """
+    if isinstance(path, tuple):
+        return path
+    if isinstance(path, str) or not isinstance(path, Sequence):
+        return (path,)
+    return tuple(path)
+
+
+def _flatten(mapping: Mapping, prefix: Path = ()) -> Iterator[Tuple[Path, Any]]:
+    """
+    Yield ``(path, leaf)`` pairs of a nested ``typing.Mapping``,
+    empty mappings are considered leaves.
+    """
+    for k, v in mapping.items():
+        path = prefix + (k,)
+        if isinstance(v, Mapping) and len(v) > 0:
+            yield from _flatten(v, path)
+        else:
+            yield path, v
+
+
+def _fits(dtype: np.dtype, value: Any) -> bool:
+    """
+    Whether ``value`` can be stored in a column of ``dtype``
+    without changing its type when it is read back.
+    """
+    if dtype.kind == "O":
+        return True
+    if dtype.kind == "b":
+        return isinstance(value, (bool, np.bool_))
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if dtype.kind == "i":
+        return isinstance(value, (int, np.integer)) and np.iinfo(dtype).min <= value <= np.iinfo(dtype).max
+    if dtype.kind == "f":
+        return isinstance(value, (float, np.floating))
+    return False
+
+
+def as_column(values: Sequence[Any]) -> np.ndarray:
+    """
+    Build a column from a sequence of values, numeric columns are used
+    when every value has the same numeric type, otherwise values are
+    stored in an ``object`` column.
+
+    Args:
+        values: a value for each row.
+
+    Returns:
+        A one dimensional ``numpy.ndarray``.
+    """
+    types = set(type(v) for v in values)
+
+    if len(types) == 1:
+        value_type = types.pop()
+        if value_type is bool:
+            return np.array(values, dtype=bool)
+        if value_type is float:
+            return np.array(values, dtype=np.float64)
+        if value_type is int:
+            try:
+                return np.array(values, dtype=np.int64)
+            except OverflowError:
+                pass
+
+    column = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        column[i] = v
+    return column
+
+
+def _broadcast_column(value: Any, n: int) -> np.ndarray:
+    """
+    Build a column repeating ``value`` ``n`` times, mutable values
+    are copied for each row.
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        column = as_column([value])
+        if column.dtype.kind != "O":
+            return np.full(n, value, dtype=column.dtype)
+        column = np.empty(n, dtype=object)
+        column[:] = [value] * n
+        return column
+
+    column = np.empty(n, dtype=object)
+    for i in range(n):
+        column[i] = copy.deepcopy(value)
+    return column
+
+
+class ConfigRow(MutableMapping):
+    """
+    A view over a row of a :py:class:`ConfigBatch` that follows
+    the ``typing.MutableMapping`` interface. Nested keys are
+    returned as views too, no data is copied when reading and
+    writes go straight to the columns of the batch.
+    """
+
+    __slots__ = ("_batch", "_index", "_prefix")
+
+    def __init__(self, batch: "ConfigBatch", index: int, prefix: Path = ()) -> None:
+        """
+        Args:
+            batch: the batch this view reads from.
+            index: the row of the batch.
+            prefix: nested keys of the view, the root of the row if empty.
+        """
+        self._batch = batch
+        self._index = index
+        self._prefix = prefix
+
+    def __getitem__(self, key: Hashable) -> Any:
+        path = self._prefix + (key,)
+        value = self._batch._get_leaf(path, self._index)
+
+        if value is not _MISSING:
+            return value
+        if self._batch._has_branch(path, self._index):
+            return ConfigRow(self._batch, self._index, path)
+
+        raise KeyError(key)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._batch._set_row(self._prefix + (key,), self._index, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        path = self._prefix + (key,)
+
+        if not self._batch._contains(path, self._index):
+            raise KeyError(key)
+
+        self._batch._clear_row(path, self._index)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for key in self._batch._children(self._prefix):
+            if self._batch._contains(self._prefix + (key,), self._index):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._batch._contains(self._prefix + (key,), self._index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    def to_dict(self) -> Dict[Hashable, Any]:
+        """
+        Returns:
+            The row as a nested ``dict``.
+        """
+        return {k: v.to_dict() if isinstance(v, ConfigRow) else v for k, v in self.items()}
+
+
+class ConfigBatch:
+    """
+    A batch of configurations stored as columns (struct-of-arrays).
+    Each leaf of the nested configurations is identified by its path,
+    a ``tuple`` of nested keys, and its values for every configuration
+    are stored in a ``numpy.ndarray``. Numeric leaves use numeric columns
+    and the rest of values are stored in ``object`` columns.
+
+    Rows can be accessed as :py:class:`ConfigRow` views, which follow the
+    ``typing.MutableMapping`` interface, so transforms written for
+    a single configuration can operate on the batch.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.batch import ConfigBatch
+        # --- hide: stop ---
+
+        batch = ConfigBatch.from_dicts([{"param_root": {"param_0": 0}}, {"param_root": {"param_0": 1}}])
+        column = batch.column(["param_root", "param_0"])
+        row = batch[1]["param_root"]["param_0"]
+
+        # --- hide: start ---
+        print(f"column: {column}, row: {row}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self, columns: Mapping[Path, np.ndarray], size: int) -> None:
+        """
+        Args:
+            columns: mapping from paths of nested keys to columns.
+            size: number of configurations (rows) of the batch.
+
+        Raises:
+            ValueError: if the length of any column is not ``size``.
+        """
+        self._size = size
+        self._columns = {}
+        self._index = None
+
+        for path, values in columns.items():
+            self.set_column(path, values)
+
+    @classmethod
+    def from_dicts(cls, cfgs: Sequence[Mapping]) -> "ConfigBatch":
+        """
+        Build a batch from a sequence of nested ``typing.Mapping``.
+
+        Args:
+            cfgs: a sequence of configurations, they do not need to
+                share the same keys.
+
+        Returns:
+            A batch with a row for each configuration.
+        """
+        size = len(cfgs)
+        values = {}
+
+        for i, cfg in enumerate(cfgs):
+            for path, leaf in _flatten(cfg):
+                if path not in values:
+                    values[path] = [_MISSING] * size
+                values[path][i] = leaf
+
+        batch = cls({}, size)
+        batch._columns = {path: as_column(col) for path, col in values.items()}
+        return batch
+
+    @classmethod
+    def from_config(cls, cfg: Mapping, n: int) -> "ConfigBatch":
+        """
+        Build a batch repeating the same configuration.
+
+        Args:
+            cfg: a nested ``typing.Mapping``, mutable values are
+                deep-copied for each row.
+            n: number of rows.
+
+        Returns:
+            A batch with ``n`` copies of ``cfg``.
+        """
+        batch = cls({}, n)
+        batch._columns = {path: _broadcast_column(leaf, n) for path, leaf in _flatten(cfg)}
+        return batch
+
+    def to_dicts(self) -> List[Dict[Hashable, Any]]:
+        """
+        Returns:
+            A nested ``dict`` for each row of the batch. Values are
+            not copied, numeric values are converted to python numbers.
+        """
+        cfgs = [{} for _ in range(self._size)]
+
+        for path, column in self._columns.items():
+            parents, key = path[:-1], path[-1]
+            for cfg, value in zip(cfgs, column.tolist()):
+                if value is _MISSING:
+                    continue
+                for p in parents:
+                    cfg = cfg.setdefault(p, {})
+                cfg[key] = value
+
+        return cfgs
+
+    @property
+    def paths(self) -> List[Path]:
+        """
+        Paths of the columns of the batch.
+        """
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> ConfigRow:
+        if not -self._size <= index < self._size:
+            raise IndexError(f"Row {index} out of range for a batch of size {self._size}.")
+        return ConfigRow(self, index % self._size)
+
+    def __iter__(self) -> Iterator[ConfigRow]:
+        for i in range(self._size):
+            yield ConfigRow(self, i)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(size={self._size}, paths={self.paths})"
+
+    def copy(self) -> "ConfigBatch":
+        """
+        Returns:
+            A batch with copied columns, values of ``object``
+            columns are not copied.
+        """
+        batch = type(self)({}, self._size)
+        batch._columns = {path: column.copy() for path, column in self._columns.items()}
+        return batch
+
+    def keys(self, path: Union[Hashable, Sequence[Hashable]] = ()) -> List[Hashable]:
+        """
+        Args:
+            path: a key or a sequence of nested keys, the root of the
+                configurations by default.
+
+        Returns:
+            The keys nested under ``path`` in any row of the batch.
+        """
+        return self._children(_as_path(path))
+
+    def column(self, path: Union[Hashable, Sequence[Hashable]]) -> np.ndarray:
+        """
+        Get the values of a leaf for every row, no data is copied.
+
+        Args:
+            path: a key or a sequence of nested keys.
+
+        Returns:
+            The column of ``path``.
+
+        Raises:
+            KeyError: if ``path`` is not a leaf of the batch.
+        """
+        path = _as_path(path)
+
+        if path not in self._columns:
+            raise KeyError(f"Path {path} is not a column of the batch.")
+
+        return self._columns[path]
+
+    def set_column(self, path: Union[Hashable, Sequence[Hashable]], values: Any) -> None:
+        """
+        Set the values of a leaf for every row. Any previous value
+        nested under ``path`` or at a parent of ``path`` is removed.
+
+        Args:
+            path: a key or a sequence of nested keys.
+            values: a ``numpy.ndarray`` or a sequence with a value for each row,
+                ``numpy.ndarray`` are stored without copying.
+
+        Raises:
+            ValueError: if ``values`` length is not the size of the batch.
+        """
+        path = _as_path(path)
+
+        if not isinstance(values, np.ndarray):
+            values = as_column(list(values))
+        if values.ndim != 1 or len(values) != self._size:
+            raise ValueError(f"Expected a column of shape ({self._size},) but got {values.shape}.")
+
+        self._drop_branch(path)
+        self._columns[path] = values
+        self._index = None
+
+    def fill(self, path: Union[Hashable, Sequence[Hashable]], value: Any) -> None:
+        """
+        Set the same value for every row, ``typing.Mapping`` values are
+        stored as one column per leaf and mutable values are deep-copied.
+
+        Args:
+            path: a key or a sequence of nested keys.
+            value: value to store.
+        """
+        path = _as_path(path)
+        self._drop_branch(path)
+
+        if isinstance(value, Mapping) and len(value) > 0:
+            for sub, leaf in _flatten(value):
+                self._columns[path + sub] = _broadcast_column(leaf, self._size)
+        else:
+            self._columns[path] = _broadcast_column(value, self._size)
+
+        self._index = None
+
+    def drop(self, path: Union[Hashable, Sequence[Hashable]]) -> None:
+        """
+        Remove a leaf or every leaf nested under ``path``.
+
+        Args:
+            path: a key or a sequence of nested keys.
+
+        Raises:
+            KeyError: if there is no column at or under ``path``.
+        """
+        path = _as_path(path)
+
+        if not self._drop_tree(path):
+            raise KeyError(f"Path {path} not found in the batch.")
+
+        self._index = None
+
+    def move(self, old: Union[Hashable, Sequence[Hashable]], new: Union[Hashable, Sequence[Hashable]]) -> None:
+        """
+        Move the columns at or under ``old`` under ``new``, moved
+        columns are placed after the rest of columns.
+
+        Args:
+            old: a key or a sequence of nested keys.
+            new: a key or a sequence of nested keys.
+
+        Raises:
+            KeyError: if there is no column at or under ``old``.
+        """
+        old, new = _as_path(old), _as_path(new)
+        moved = [(p, c) for p, c in self._columns.items() if p[:len(old)] == old]
+
+        if not moved:
+            raise KeyError(f"Path {old} not found in the batch.")
+
+        self._drop_tree(old)
+        for path, column in moved:
+            self._columns[new + path[len(old):]] = column
+
+        self._index = None
+
+    def contains(self, path: Union[Hashable, Sequence[Hashable]]) -> bool:
+        """
+        Args:
+            path: a key or a sequence of nested keys.
+
+        Returns:
+            Whether ``path`` exists in every row of the batch.
+        """
+        leaf, branch = self._masks(_as_path(path))
+        return bool(np.all(leaf | branch))
+
+    def is_mapping(self, path: Union[Hashable, Sequence[Hashable]]) -> bool:
+        """
+        Args:
+            path: a key or a sequence of nested keys.
+
+        Returns:
+            Whether the value at ``path`` is a ``typing.Mapping`` in every row of the batch.
+        """
+        path = _as_path(path)
+
+        if not path:
+            return True
+
+        leaf, branch = self._masks(path)
+        return bool(np.all(~leaf & branch))
+
+    def _present(self, path: Path) -> np.ndarray:
+        """
+        Mask of the rows where the column of ``path`` has a value.
+        """
+        column = self._columns.get(path)
+
+        if column is None:
+            return np.zeros(self._size, dtype=bool)
+        if column.dtype.kind != "O":
+            return np.ones(self._size, dtype=bool)
+
+        return np.fromiter((v is not _MISSING for v in column), dtype=bool, count=self._size)
+
+    def _masks(self, path: Path) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Masks of the rows where ``path`` is a leaf and where it has nested leaves.
+        """
+        if self._index is None:
+            self._build_index()
+
+        branch = np.zeros(self._size, dtype=bool)
+        for leaf in self._index[1].get(path, ()):
+            branch |= self._present(leaf)
+
+        return self._present(path), branch
+
+    def _drop_tree(self, path: Path) -> bool:
+        """
+        Remove the columns at or under ``path``, returns whether any column was removed.
+        """
+        dropped = [p for p in self._columns if p[:len(path)] == path]
+        for p in dropped:
+            del self._columns[p]
+        return bool(dropped)
+
+    def _drop_branch(self, path: Path) -> None:
+        """
+        Remove the columns at or under ``path`` and the leaves at its parents.
+        """
+        self._drop_tree(path)
+        for k in range(1, len(path)):
+            self._columns.pop(path[:k], None)
+
+    def _build_index(self) -> None:
+        """
+        Index the children and leaves under each prefix of the column paths.
+        """
+        children = {(): {}}
+        leaves = {}
+
+        for path in self._columns:
+            for k in range(len(path)):
+                children.setdefault(path[:k], {})[path[k]] = None
+                if k > 0:
+                    leaves.setdefault(path[:k], []).append(path)
+
+        self._index = (children, leaves)
+
+    def _children(self, prefix: Path) -> List[Hashable]:
+        if self._index is None:
+            self._build_index()
+        return list(self._index[0].get(prefix, ()))
+
+    def _get_leaf(self, path: Path, index: int) -> Any:
+        column = self._columns.get(path)
+        if column is None:
+            return _MISSING
+        return column.item(index)
+
+    def _has_branch(self, path: Path, index: int) -> bool:
+        if self._index is None:
+            self._build_index()
+        for leaf in self._index[1].get(path, ()):
+            column = self._columns[leaf]
+            if column.dtype.kind != "O" or column[index] is not _MISSING:
+                return True
+        return False
+
+    def _contains(self, path: Path, index: int) -> bool:
+        return self._get_leaf(path, index) is not _MISSING or self._has_branch(path, index)
+
+    def _writable(self, path: Path, value: Any) -> np.ndarray:
+        """
+        Get a column where ``value`` can be stored, it is created or converted if needed.
+        """
+        column = self._columns.get(path)
+
+        if column is None:
+            column = np.empty(self._size, dtype=object)
+            column[:] = [_MISSING] * self._size
+            self._columns[path] = column
+            self._index = None
+        elif not _fits(column.dtype, value):
+            column = column.astype(object)
+            self._columns[path] = column
+
+        return column
+
+    def _clear_row(self, path: Path, index: int) -> None:
+        """
+        Remove the value at ``path`` and every value nested under it from a row.
+        """
+        if self._index is None:
+            self._build_index()
+        for p in [path] + self._index[1].get(path, []):
+            if p in self._columns and self._get_leaf(p, index) is not _MISSING:
+                self._writable(p, _MISSING)[index] = _MISSING
+
+    def _set_row(self, path: Path, index: int, value: Any) -> None:
+        if isinstance(value, Mapping) and len(value) > 0:
+            leaves = [(path + sub, leaf) for sub, leaf in _flatten(value)]
+        else:
+            leaves = [(path, value)]
+
+        self._clear_row(path, index)
+        for k in range(1, len(path)):
+            if self._get_leaf(path[:k], index) is not _MISSING:
+                self._writable(path[:k], _MISSING)[index] = _MISSING
+
+        for leaf_path, leaf in leaves:
+            self._writable(leaf_path, leaf)[index] = leaf
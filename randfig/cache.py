@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+
+__all__ = ["CacheInfo", "FormulaCache"]
+
+
+_POLICIES = ("lru", "fifo")
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of a :py:class:`FormulaCache`.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class FormulaCache:
+    """
+    Bounded cache of the values computed by a :py:class:`randfig.transforms.formula.Formula`,
+    keyed by the values of the keys the formula reads.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import functools
+        from randfig import Formula
+        from randfig.cache import FormulaCache
+        from randfig.expressions import product_by_num
+        # --- hide: stop ---
+
+        cache = FormulaCache(maxsize=2, policy="lru")
+        formula = Formula(
+            keys=["param_1"],
+            formula=functools.partial(product_by_num, n_key="param_0", num=2),
+            cache=cache,
+        )
+
+        for value in [1, 2, 1, 3, 1]:
+            formula({"param_0": value})
+
+        # --- hide: start ---
+        print(cache.info())
+        # --- hide: stop ---
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128, policy: str = "lru") -> None:
+        """
+        Args:
+            maxsize: maximum number of cached values, unbounded if ``None``.
+            policy: eviction policy when the cache is full, ``"lru"`` evicts the
+                least recently used value and ``"fifo"`` the oldest inserted value.
+
+        Raises:
+            ValueError: if ``maxsize`` is smaller than 1 or ``policy`` is not supported.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"Expected a maxsize of at least 1 or None but got {maxsize}.")
+        if policy not in _POLICIES:
+            raise ValueError(f"Expected policy to be one of {_POLICIES} but got {policy}.")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self._values: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and count the hit or miss.
+
+        Args:
+            key: the values of the keys read by the formula.
+            default: value returned if ``key`` is not cached.
+
+        Returns:
+            The cached value or ``default``.
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        if self.policy == "lru":
+            self._values.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value, evicting another one if the cache is full.
+
+        Args:
+            key: the values of the keys read by the formula.
+            value: the value computed by the formula.
+        """
+        self._values[key] = value
+        self._values.move_to_end(key)
+
+        if self.maxsize is not None and len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        """
+        Returns:
+            The statistics of the cache.
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._values))
+
+    def clear(self) -> None:
+        """
+        Remove the cached values and reset the statistics.
+        """
+        self._values.clear()
+        self.hits = self.misses = self.evictions = 0
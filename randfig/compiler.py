@@ -0,0 +1,203 @@
+import functools
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+from randfig.transforms.bulk_edit import BulkEdit
+from randfig.transforms.compose import Compose
+from randfig.transforms.formula import Formula
+from randfig.transforms.insert import Insert
+from randfig.transforms.nest import Nest
+from randfig.transforms.remove import Remove
+from randfig.transforms.unpack import Unpack
+from randfig.utils import unpack
+
+
+__all__ = ["compile_pipeline"]
+
+
+_LITERAL_TYPES = (str, int, bool, type(None))
+
+
+def _raise_not_mapping(cfg: Any) -> None:
+    raise TypeError(f"Got: {cfg} for one of the nested values, which is {type(cfg)}, expected a``Mapping``.")
+
+
+def _raise_cfg_not_mapping(cfg: Any) -> None:
+    raise TypeError(f"cfg is not a Mapping, cfg is: {type(cfg)}")
+
+
+class _CodeGen:
+    """
+    Accumulates the source lines and the namespace of a compiled pipeline.
+    """
+
+    def __init__(self) -> None:
+        self.lines = []
+        self.namespace = {
+            "_Mapping": Mapping,
+            "_raise_not_mapping": _raise_not_mapping,
+            "_raise_cfg_not_mapping": _raise_cfg_not_mapping,
+            "_unpack": unpack,
+        }
+        self.checked = False
+        self._count = 0
+
+    def const(self, value: Any) -> str:
+        """
+        Get an expression for ``value``, literals are inlined and
+        the rest of values are bound to a name of the namespace.
+        """
+        if type(value) in _LITERAL_TYPES:
+            return repr(value)
+        return self.bind(value)
+
+    def bind(self, value: Any) -> str:
+        name = f"_c{self._count}"
+        self._count += 1
+        self.namespace[name] = value
+        return name
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " + line)
+
+    def check_cfg(self) -> None:
+        """
+        Emit the ``Mapping`` check of ``cfg`` unless it is already known to be a ``Mapping``.
+        """
+        if not self.checked:
+            self.emit("if not isinstance(cfg, _Mapping): _raise_cfg_not_mapping(cfg)")
+            self.checked = True
+
+    def parent(self, keys: Sequence[Any]) -> str:
+        """
+        Emit the access to the parent of the last key of ``keys`` and return its name.
+        """
+        self.check_cfg()
+        parent = "cfg"
+        for k in keys[:-1]:
+            self.emit(f"_node = {parent}[{self.const(k)}]")
+            self.emit("if not isinstance(_node, _Mapping): _raise_not_mapping(_node)")
+            parent = "_node"
+        return parent
+
+    def insert(self, tfs: Insert) -> None:
+        parent = self.parent(tfs.keys)
+        self.emit(f"{parent}[{self.const(tfs.keys[-1])}] = {self.const(tfs.value)}")
+
+    def remove(self, tfs: Remove) -> None:
+        parent = self.parent(tfs.keys)
+        self.emit(f"{parent}.pop({self.const(tfs.keys[-1])})")
+
+    def formula(self, tfs: Formula) -> None:
+        if tfs.cache is not None:
+            self.call(tfs)
+            return
+
+        self.check_cfg()
+        formula = tfs.formula
+
+        if isinstance(formula, functools.partial):
+            args = [self.const(a) for a in formula.args] + ["cfg"]
+            args += [f"{k}={self.const(v)}" for k, v in formula.keywords.items()]
+            call = f"{self.bind(formula.func)}({', '.join(args)})"
+        else:
+            call = f"{self.bind(formula)}(cfg)"
+
+        for key in tfs.keys:
+            self.emit(f"cfg[{self.const(key)}] = {call}")
+
+    def nest(self, tfs: Nest) -> None:
+        self.check_cfg()
+        keys = self.bind(tfs.keys)
+        key_set = self.bind(set(tfs.keys))
+        root = self.bind(tfs.root)
+
+        self.emit(f"for _k in {keys}:")
+        self.emit(f"    if _k not in cfg: raise KeyError(f'Key {{_k}} not found in self.keys: {{{keys}}}')")
+        self.emit(f"if {root} in cfg: raise ValueError(f'``root``: {{{root}}} already exists in ``cfg`` as a key.')")
+        self.emit(f"_leaves = {{k: v for k, v in cfg.items() if k in {key_set}}}")
+        self.emit(f"cfg = {{k: v for k, v in cfg.items() if k not in {key_set}}}")
+        self.emit(f"cfg[{root}] = _leaves")
+
+    def unpack(self, tfs: Unpack) -> None:
+        self.check_cfg()
+        remove = self.const(tfs.remove)
+        for k, nk in zip(tfs.keys, tfs.new_keys):
+            self.emit(f"cfg = _unpack(cfg, {self.const(k)}, {self.const(nk)}, {remove})")
+
+    def call(self, tfs: Callable[[Mapping], Mapping]) -> None:
+        self.emit(f"cfg = {self.bind(tfs)}(cfg)")
+        self.checked = False
+
+
+def _flatten(transforms: Sequence[Callable[[Mapping], Mapping]]) -> List[Callable[[Mapping], Mapping]]:
+    """
+    Inline the transforms of nested :py:class:`randfig.transforms.compose.Compose`
+    and the edits of :py:class:`randfig.transforms.bulk_edit.BulkEdit`.
+    """
+    flat = []
+    for tfs in transforms:
+        if type(tfs) is Compose:
+            flat.extend(_flatten(tfs.transforms))
+        elif type(tfs) is BulkEdit:
+            flat.extend(tfs.edits)
+        else:
+            flat.append(tfs)
+    return flat
+
+
+def compile_pipeline(transforms: Sequence[Callable[[Mapping], Mapping]]) -> Callable[[Mapping], Mapping]:
+    """
+    Generate a single python function equivalent to applying ``transforms``
+    sequentially. Instances of :py:class:`randfig.transforms.insert.Insert`,
+    :py:class:`randfig.transforms.remove.Remove`, :py:class:`randfig.transforms.nest.Nest`,
+    :py:class:`randfig.transforms.unpack.Unpack` and :py:class:`randfig.transforms.formula.Formula`
+    are inlined: their keys are accessed directly, the ``Mapping`` check of the
+    configuration is done once instead of once per transform and ``functools.partial``
+    formulas call the wrapped function directly. Cached formulas and any other
+    transform are called as usual.
+    Subclasses of the transforms above are not inlined.
+
+    The function is a snapshot of ``transforms``, changes to their attributes
+    after compiling are not reflected. The generated source is available in
+    the ``source`` attribute of the function.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig import Insert, Formula
+        from randfig.compiler import compile_pipeline
+        # --- hide: stop ---
+
+        fn = compile_pipeline([
+            Insert(keys=["param_1"], value=1),
+            Formula(keys=["param_2"], formula=lambda cfg: 2 * cfg["param_1"]),
+        ])
+
+        # --- hide: start ---
+        print(fn.source)
+        print(fn({"param_0": 0}))
+        # --- hide: stop ---
+
+    Args:
+        transforms: a sequence of configuration transforms.
+
+    Returns:
+        A callable that accepts a configuration and returns the transformed configuration.
+    """
+    gen = _CodeGen()
+    handlers: Dict[type, Callable[[Any], None]] = {
+        Insert: gen.insert,
+        Remove: gen.remove,
+        Formula: gen.formula,
+        Nest: gen.nest,
+        Unpack: gen.unpack,
+    }
+
+    for tfs in _flatten(transforms):
+        handlers.get(type(tfs), gen.call)(tfs)
+
+    source = "\n".join(["def compiled_pipeline(cfg):"] + gen.lines + ["    return cfg", ""])
+    exec(compile(source, "<randfig.compiler>", "exec"), gen.namespace)
+
+    fn = gen.namespace["compiled_pipeline"]
+    fn.source = source
+    return fn
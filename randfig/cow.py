@@ -0,0 +1,102 @@
+import copy
+from collections.abc import MutableMapping
+from numbers import Number
+from typing import Any, Dict, Hashable, Iterator, Mapping, Optional, Set, Tuple
+from randfig.utils import mapping_to_dict
+
+
+__all__ = ["CowDict"]
+
+
+_ATOMIC_TYPES = {int, float, bool, str, bytes, type(None)}
+
+_IMMUTABLE_TYPES = (Number, str, bytes, type(None), frozenset)
+
+
+class CowDict(MutableMapping):
+    """
+    Copy-on-write view of a nested ``typing.Mapping``. The view shares every value
+    with the base mapping until it is modified: the keys of a mapping are copied
+    the first time one of them is written, nested mappings are wrapped in a
+    :py:class:`CowDict` when they are read and other mutable values, like lists,
+    are deep copied when they are read. Hence, the base mapping is never modified
+    and only the nodes along the modified paths are copied.
+
+    :py:meth:`randfig.transforms.compose.Compose.sample` starts each configuration
+    from a :py:class:`CowDict` of the snapshot of the base configuration, instead of
+    a deep copy, when the pipeline is built with ``copy_on_write=True``.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.cow import CowDict
+        # --- hide: stop ---
+
+        base = {"param_root": {"param_0": 0}, "param_shared": {"param_1": 1}}
+        cfg = CowDict(base)
+        cfg["param_root"]["param_0"] = 10
+
+        # --- hide: start ---
+        print(f"cfg: {cfg.to_dict()}, base: {base}")
+        # --- hide: stop ---
+    """
+
+    __slots__ = ("_base", "_data", "_owned")
+
+    def __init__(self, base: Mapping) -> None:
+        """
+        Args:
+            base: the shared ``typing.Mapping``, it is not modified through the view.
+        """
+        self._base = base
+        # shallow copy of the base, built on the first write
+        self._data: Optional[Dict[Hashable, Any]] = None
+        # keys whose values are not shared with the base
+        self._owned: Set[Hashable] = set()
+
+    def _own(self) -> Dict[Hashable, Any]:
+        if self._data is None:
+            self._data = dict(self._base)
+        return self._data
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = (self._data if self._data is not None else self._base)[key]
+
+        if key in self._owned or type(value) in _ATOMIC_TYPES or isinstance(value, _IMMUTABLE_TYPES):
+            return value
+
+        value = CowDict(value) if isinstance(value, Mapping) else copy.deepcopy(value)
+        self._own()[key] = value
+        self._owned.add(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._own()[key] = value
+        self._owned.add(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._own()[key]
+        self._owned.discard(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in (self._data if self._data is not None else self._base)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._data if self._data is not None else self._base)
+
+    def __len__(self) -> int:
+        return len(self._data if self._data is not None else self._base)
+
+    def __repr__(self) -> str:
+        return f"CowDict({self.to_dict()})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # pickle the values instead of the whole base
+        return CowDict, (self.to_dict(),)
+
+    def to_dict(self) -> Dict[Hashable, Any]:
+        """
+        Returns:
+            A nested ``dict`` with the values of the view, it shares no value with the base mapping.
+        """
+        return mapping_to_dict(self)
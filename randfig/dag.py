@@ -0,0 +1,173 @@
+import heapq
+from typing import Callable, Hashable, List, Mapping, Optional, Sequence, Set, Tuple
+
+
+__all__ = ["DependencyGraph", "overlaps"]
+
+
+Path = Tuple[Hashable, ...]
+
+
+def overlaps(a: Path, b: Path) -> bool:
+    """
+    Whether two key paths overlap, that is one of them is a prefix of the other.
+
+    Args:
+        a: a ``tuple`` of nested keys.
+        b: a ``tuple`` of nested keys.
+
+    Returns:
+        ``True`` if a value under ``a`` may be a value under ``b``.
+    """
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+
+def _any_overlap(a: Optional[Sequence[Path]], b: Optional[Sequence[Path]]) -> bool:
+    """
+    Whether some path of ``a`` overlaps some path of ``b``, unknown paths (``None``) overlap everything.
+    """
+    if a is None or b is None:
+        return True
+    return any(overlaps(p, q) for p in a for q in b)
+
+
+class DependencyGraph:
+    """
+    Dependency graph of a sequence of transforms built from their
+    :py:attr:`randfig.config_transform.ConfigTransform.reads` and
+    :py:attr:`randfig.config_transform.ConfigTransform.writes`. Transforms
+    without such attributes are assumed to read and write every value.
+
+    A transform depends on a previous one if it reads a value the previous one
+    writes, writes a value it reads or both write the same value. Transforms
+    that write nothing, like :py:class:`randfig.transforms.save.Save`, have
+    side effects, so they also keep their relative order.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import functools
+        from randfig import Formula, Insert, Remove
+        from randfig.dag import DependencyGraph
+        from randfig.expressions import product_by_num
+        # --- hide: stop ---
+
+        graph = DependencyGraph([
+            Formula(keys=["param_1"], formula=functools.partial(product_by_num, n_key="param_0", num=2)),
+            Insert(keys=["param_2"], value=2),
+            Remove(keys=["param_1"]),
+        ])
+
+        # --- hide: start ---
+        print(f"levels: {graph.levels()}, dead: {graph.dead()}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self, transforms: Sequence[Callable[[Mapping], Mapping]]) -> None:
+        """
+        Args:
+            transforms: a sequence of configuration transforms.
+        """
+        self.transforms = list(transforms)
+        self.reads = [getattr(tfs, "reads", None) for tfs in self.transforms]
+        self.writes = [getattr(tfs, "writes", None) for tfs in self.transforms]
+        self.predecessors: List[Set[int]] = [set() for _ in self.transforms]
+
+        for j in range(len(self.transforms)):
+            for i in range(j):
+                if self._depends(i, j):
+                    self.predecessors[j].add(i)
+
+    def _depends(self, i: int, j: int) -> bool:
+        """
+        Whether the transform ``j`` must run after the transform ``i``.
+        """
+        if self.writes[i] == [] and self.writes[j] == []:
+            return True
+        return (
+            _any_overlap(self.writes[i], self.reads[j])
+            or _any_overlap(self.reads[i], self.writes[j])
+            or _any_overlap(self.writes[i], self.writes[j])
+        )
+
+    def levels(self) -> List[List[int]]:
+        """
+        Group the transforms in levels, the transforms of a level only depend
+        on transforms of previous levels, so they are independent of each other.
+
+        Returns:
+            The positions of the transforms of each level.
+        """
+        depth = []
+        for j, preds in enumerate(self.predecessors):
+            depth.append(max((depth[i] + 1 for i in preds), default=0))
+
+        levels = [[] for _ in range(max(depth, default=-1) + 1)]
+        for j, d in enumerate(depth):
+            levels[d].append(j)
+        return levels
+
+    def order(self) -> List[int]:
+        """
+        Sort the transforms topologically, constant transforms (see
+        :py:attr:`randfig.config_transform.ConfigTransform.constant`) are placed as
+        early as their dependencies allow, so the constant prefix hoisted by
+        :py:class:`randfig.transforms.compose.Compose` is as long as possible.
+        Ties keep the original order.
+
+        Returns:
+            The positions of the transforms in execution order.
+        """
+        pending = [len(preds) for preds in self.predecessors]
+        successors = [[] for _ in self.transforms]
+        for j, preds in enumerate(self.predecessors):
+            for i in preds:
+                successors[i].append(j)
+
+        def priority(i: int) -> Tuple[bool, int]:
+            return not getattr(self.transforms[i], "constant", False), i
+
+        ready = [priority(i) for i, n in enumerate(pending) if n == 0]
+        heapq.heapify(ready)
+        order = []
+
+        while ready:
+            _, i = heapq.heappop(ready)
+            order.append(i)
+            for j in successors[i]:
+                pending[j] -= 1
+                if pending[j] == 0:
+                    heapq.heappush(ready, priority(j))
+
+        return order
+
+    def dead(self) -> Set[int]:
+        """
+        Find the transforms whose output is never observed: every value they
+        write is overwritten or removed, for example by :py:class:`randfig.transforms.remove.Remove`,
+        before any transform reads it or writes a value nested under it. Transforms that write nothing or
+        whose writes are unknown are never dead.
+
+        Returns:
+            The positions of the dead transforms.
+        """
+        return {i for i, writes in enumerate(self.writes) if writes and all(self._killed(i, p) for p in writes)}
+
+    def _killed(self, i: int, path: Path) -> bool:
+        """
+        Whether the value written by the transform ``i`` at ``path`` is
+        overwritten or removed before being read. Writing a value nested
+        under ``path`` reads it, since the mapping at ``path`` must exist.
+        """
+        for j in range(i + 1, len(self.transforms)):
+            reads, writes = self.reads[j], self.writes[j]
+
+            if writes is None or _any_overlap(reads, [path]):
+                return False
+            if any(len(p) > len(path) and overlaps(p, path) for p in writes):
+                return False
+            if any(len(p) <= len(path) and overlaps(p, path) for p in writes):
+                return True
+
+        return False
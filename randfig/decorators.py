@@ -1,7 +1,10 @@
-from typing import Callable, Any, Mapping
+import functools
+import numpy as np
+from typing import Callable, Any, Mapping, Union
+from randfig.rng import current_rng
 
 
-def accept_cfg(fn: Callable[[Any], Any], *args: Any, **kwargs: Any) -> Callable[[Mapping, Any], Any]:
+def accept_cfg(fn: Union[Callable[[Any], Any], str], *args: Any, **kwargs: Any) -> Callable[[Mapping, Any], Any]:
     """
     This decorator is intended to use it with functions like
     ``random.randint`` or ``random.uniform`` in facebook-hydra configurations.
@@ -22,8 +25,22 @@ def accept_cfg(fn: Callable[[Any], Any], *args: Any, **kwargs: Any) -> Callable[
             - 20
             - 30
 
+    If ``fn`` is a ``str``, it is the name of a ``numpy.random.Generator`` method
+    that is called on :py:func:`randfig.rng.current_rng`, the generator of the current
+    :py:func:`randfig.rng.generation_context` or, outside of it, a generator seeded from
+    the global ``random`` generator, so draws are reproducible and can be vectorized
+    in batch mode:
+
+    .. code-block::
+
+        _target_: randfig.Formula
+        keys: ["scanner_radius"]
+        formula:
+          _target_: randfig.decorators.accept_cfg
+          _args_: ["uniform", 20, 30]
+
     Args:
-        fn: a callable.
+        fn: a callable or the name of a ``numpy.random.Generator`` method.
         args: arguments of that callable.
         kwargs: kwargs of that callable.
 
@@ -31,7 +48,15 @@ def accept_cfg(fn: Callable[[Any], Any], *args: Any, **kwargs: Any) -> Callable[
         A callable that accepts just a ``dict``-like configuration
         and returns ``fn(*args, **kwargs)``.
     """
-    def fn_accepts_cfg(cfg):
-        return fn(*args, **kwargs)
+    return functools.partial(_accepts_cfg, fn=fn, args=args, kwargs=kwargs)
+
 
-    return fn_accepts_cfg
+def _accepts_cfg(cfg: Mapping, fn: Union[Callable[[Any], Any], str], args: Any, kwargs: Any) -> Any:
+    """
+    Callable returned by :py:func:`accept_cfg`, it is a module
+    level function so it can be pickled.
+    """
+    if isinstance(fn, str):
+        value = getattr(current_rng(), fn)(*args, **kwargs)
+        return value.item() if isinstance(value, np.generic) else value
+    return fn(*args, **kwargs)
@@ -1,6 +1,10 @@
+import functools
+import inspect
 import math
+import numpy as np
 from numbers import Number
-from typing import Mapping, Any, List, Optional, Callable
+from typing import Mapping, Any, List, Optional, Callable, Tuple
+from randfig import decorators
 from randfig.utils import (
     add_uniform_jitter,
     search_divisor,
@@ -57,7 +61,8 @@ def rounding(cfg: Mapping, key: str, decimals: int) -> Any:
 
 
 def min_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Number,
-    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None) -> Number:
+    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None,
+    rng: Optional[np.random.Generator] = None) -> Number:
     """
     Computes a lower threshold (``lower_threshold``) assuming a gaussian distibution:
 
@@ -74,6 +79,7 @@ def min_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Numbe
         jitter: a uniform jitter with :py:func:`randfig.utils.add_uniform_jitter`.
             The value added is sampled from an uniform distribution with
             ``a = -jitter * peak``, ``b = jitter * peak``.
+        rng: generator used to sample the jitter, see :py:func:`randfig.utils.add_uniform_jitter`.
 
     Returns:
         Lower threshold.
@@ -93,13 +99,14 @@ def min_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Numbe
     lower_threshold = peak * (1 - sigmas * FWHM_TO_STD * resolution)
 
     if jitter is not None:
-        lower_threshold = add_uniform_jitter(lower_threshold, jitter, peak)
+        lower_threshold = add_uniform_jitter(lower_threshold, jitter, peak, rng)
 
     return lower_threshold
 
 
 def max_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Number,
-    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None) -> Number:
+    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None,
+    rng: Optional[np.random.Generator] = None) -> Number:
     """
     Computes an upper threshold (``upper_threshold``) assuming a gaussian distibution:
 
@@ -116,6 +123,7 @@ def max_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Numbe
         jitter: a uniform jitter with :py:func:`randfig.utils.add_uniform_jitter`.
             The value added is sampled from an uniform distribution with
             ``a = -jitter * peak``, ``b = jitter * peak``.
+        rng: generator used to sample the jitter, see :py:func:`randfig.utils.add_uniform_jitter`.
 
     Returns:
         Upper threshold.
@@ -135,7 +143,7 @@ def max_threshold_from_resolution(cfg: Mapping, resolution_key: str, peak: Numbe
     upper_threshold = peak * (1 + sigmas * FWHM_TO_STD * resolution)
 
     if jitter is not None:
-        upper_threshold = add_uniform_jitter(upper_threshold, jitter, peak)
+        upper_threshold = add_uniform_jitter(upper_threshold, jitter, peak, rng)
 
     return upper_threshold
 
@@ -338,7 +346,7 @@ def get_divisor(cfg: Mapping, key: str, search_divisor_kwargs: Mapping[str, Any]
     return search_divisor(n, **search_divisor_kwargs)
 
 
-def get_jittered_value(cfg: Mapping, key: str, p: Number) -> Number:
+def get_jittered_value(cfg: Mapping, key: str, p: Number, rng: Optional[np.random.Generator] = None) -> Number:
     """
     Stub.
 
@@ -346,6 +354,7 @@ def get_jittered_value(cfg: Mapping, key: str, p: Number) -> Number:
         cfg: a ``dict``-like config.
         key: key whose value is a ``Number`` to add jitter to.
         p: the amount of jitter to add, see :py:func:`randfig.utils.add_uniform_jitter`.
+        rng: generator used to sample the jitter, see :py:func:`randfig.utils.add_uniform_jitter`.
 
     Returns:
         Jittered value (``cfg[key] + uniform jitter``).
@@ -358,7 +367,7 @@ def get_jittered_value(cfg: Mapping, key: str, p: Number) -> Number:
     if not isinstance(value, Number):
         raise TypeError(f"Expected a Number but got {value} which is {type(value)}")
 
-    return add_uniform_jitter(value, value, p)
+    return add_uniform_jitter(value, value, p, rng)
 
 
 def pick_from_mapping(cfg: Mapping, key: str, mapping: Mapping[str, Any]) -> Any:
@@ -444,3 +453,102 @@ def trunc(cfg: Mapping, key: str, decimals: int) -> Any:
         raise TypeError(f"Expected a numeric but got {value_number} which is a {type(value_number)}.")
 
     return float(f"{value_number:.{decimals}f}")
+
+
+# Arguments of each expression that name the keys it reads and
+# the keys it modifies in place.
+_KEY_ARGUMENTS = {
+    decorators._accepts_cfg: ((), ()),
+    pop: (("key",), ("key",)),
+    rounding: (("key",), ()),
+    min_threshold_from_resolution: (("resolution_key",), ()),
+    max_threshold_from_resolution: (("resolution_key",), ()),
+    division: (("num_key", "den_key"), ()),
+    division_by_num: (("n_key",), ()),
+    product: (("a_key", "b_key"), ()),
+    product_by_num: (("n_key",), ()),
+    get_regular_polygon_sides: (("side_len_key", "apothem_key"), ()),
+    round_to_closest_even: (("key_n",), ()),
+    get_regular_polygon_apothem: (("side_len_key", "n_sides_key"), ()),
+    get_divisor: (("key",), ()),
+    get_jittered_value: (("key",), ()),
+    pick_from_mapping: (("key",), ()),
+    add: (("key_a", "key_b"), ()),
+    add_value: (("key",), ()),
+    call: (("key",), ()),
+    trunc: (("key",), ()),
+}
+
+
+def _bind(formula: Callable[[Mapping], Any]) -> Optional[Mapping[str, Any]]:
+    """
+    Get the arguments of a ``functools.partial`` of a function of this
+    module as they are bound when the partial is called with a configuration.
+    """
+    if not isinstance(formula, functools.partial) or formula.func not in _KEY_ARGUMENTS:
+        return None
+    try:
+        return inspect.signature(formula.func).bind_partial(*formula.args, None, **formula.keywords).arguments
+    except TypeError:
+        return None
+
+
+def infer_keys(formula: Callable[[Mapping], Any]) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Infer the keys accessed by a formula built as a ``functools.partial``
+    of a function of this module or as :py:func:`randfig.decorators.accept_cfg`.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import functools
+        from randfig.expressions import division, infer_keys
+        # --- hide: stop ---
+
+        reads, writes = infer_keys(functools.partial(division, num_key="param_0", den_key="param_1"))
+
+        # --- hide: start ---
+        print(f"reads: {reads}, writes: {writes}")
+        # --- hide: stop ---
+
+    Args:
+        formula: a ``Callable[[Mapping], Any]``.
+
+    Returns:
+        The keys read by ``formula`` and the keys it modifies in place,
+        or ``None`` if they can not be inferred.
+    """
+    arguments = _bind(formula)
+
+    if arguments is None:
+        return None
+
+    reads, writes = _KEY_ARGUMENTS[formula.func]
+
+    if any(name not in arguments for name in reads):
+        return None
+
+    return [arguments[name] for name in reads], [arguments[name] for name in writes]
+
+
+def is_deterministic(formula: Callable[[Mapping], Any]) -> bool:
+    """
+    Whether a formula built as a ``functools.partial`` of a function of this module
+    always returns the same value for the same values of the keys it reads and has
+    no side effects. Formulas that sample random values, like :py:func:`get_jittered_value`
+    or :py:func:`randfig.decorators.accept_cfg`, modify the configuration, like :py:func:`pop`,
+    or call arbitrary functions, like :py:func:`call`, are not deterministic.
+
+    Args:
+        formula: a ``Callable[[Mapping], Any]``.
+
+    Returns:
+        ``True`` if ``formula`` is known to be deterministic.
+    """
+    arguments = _bind(formula)
+
+    if arguments is None or formula.func in (decorators._accepts_cfg, pop, call, get_jittered_value):
+        return False
+    if formula.func in (min_threshold_from_resolution, max_threshold_from_resolution):
+        return arguments.get("jitter") is None
+    return True
@@ -0,0 +1,401 @@
+import functools
+import math
+import numpy as np
+from numbers import Number
+from typing import Mapping, Any, Optional, Callable, Union
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from randfig.batch import ConfigBatch, as_column
+from randfig.rng import current_rng
+from randfig.utils import search_divisor_array
+
+
+def _numeric(batch: ConfigBatch, key: str, name: str) -> np.ndarray:
+    """
+    Get the column of ``key`` checking that every value is a ``Number``.
+
+    Raises:
+        TypeError: if any value of the column is not a ``Number``.
+    """
+    column = batch.column(key)
+
+    if column.dtype.kind in "biuf":
+        return column
+
+    values = column.tolist()
+
+    for v in values:
+        if not isinstance(v, Number):
+            raise TypeError(f"Expected {name} to be a number, got {type(v)}.")
+
+    return np.array(values)
+
+
+def _check_number(name: str, num: Any) -> None:
+    if not isinstance(num, Number):
+        raise TypeError(f"Expected {name} to be a number, got {type(num)}.")
+
+
+def _check_zero_division(den: np.ndarray) -> None:
+    if np.any(den == 0):
+        raise ZeroDivisionError("division by zero")
+
+
+def _round(column: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Round as python's ``round`` does. ``numpy.round`` scales the values
+    before rounding, so values close to a tie are rounded again with ``round``.
+    """
+    rounded = np.round(column, decimals)
+
+    if column.dtype.kind != "f":
+        return rounded
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = column * 10.0 ** decimals
+        distance = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+        near_tie = distance <= np.maximum(4 * np.spacing(scaled), 1e-6)
+
+    idx = np.flatnonzero(near_tie)
+    rounded[idx] = [round(v, decimals) for v in column[idx].tolist()]
+
+    return rounded
+
+
+def _uniform_jitter(values: np.ndarray, reference: Any, rng: Optional[np.random.Generator]) -> np.ndarray:
+    """
+    Add a value sampled from ``U(-reference, reference)`` to each value,
+    all the values are sampled with a single call to ``rng``.
+    """
+    rng = rng if rng is not None else current_rng()
+    reference = np.broadcast_to(reference, values.shape)
+    return values + rng.uniform(-reference, reference)
+
+
+def pop(batch: ConfigBatch, key: str, element: int = 0) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.pop`.
+
+    Raises:
+        TypeError: if any value of ``key`` is not a ``List``.
+    """
+    values = batch.column(key).tolist()
+
+    for v in values:
+        if not isinstance(v, list):
+            raise TypeError(f"Expected a list but got {v} which is a {type(v)}.")
+
+    return as_column([v.pop(element) for v in values])
+
+
+def rounding(batch: ConfigBatch, key: str, decimals: int) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.rounding`.
+
+    Raises:
+        TypeError: if any value of ``key`` is not a ``Number``.
+    """
+    return _round(_numeric(batch, key, "value"), decimals)
+
+
+def min_threshold_from_resolution(batch: ConfigBatch, resolution_key: str, peak: Number,
+    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None,
+    rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.min_threshold_from_resolution`.
+    If ``rng`` is ``None``, :py:func:`randfig.rng.current_rng` is used.
+
+    Raises:
+        ValueError: if ``is_percentage`` is ``False`` but any ``resolution > 1``.
+    """
+    FWHM_TO_STD = 1 / 2.355
+
+    resolution = _numeric(batch, resolution_key, "resolution")
+
+    if is_percentage:
+        resolution = resolution / 100
+    if not is_percentage and np.any(resolution > 1):
+        raise ValueError(f"is_percentage is {is_percentage} but got numbers bigger than 1: {resolution[resolution > 1]}")
+
+    lower_threshold = peak * (1 - sigmas * FWHM_TO_STD * resolution)
+
+    if jitter is not None:
+        lower_threshold = _uniform_jitter(lower_threshold, jitter * peak, rng)
+
+    return lower_threshold
+
+
+def max_threshold_from_resolution(batch: ConfigBatch, resolution_key: str, peak: Number,
+    is_percentage: bool = True, sigmas: Number = 2, jitter: Optional[Number] = None,
+    rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.max_threshold_from_resolution`.
+    If ``rng`` is ``None``, :py:func:`randfig.rng.current_rng` is used.
+
+    Raises:
+        ValueError: if ``is_percentage`` is ``False`` but any ``resolution > 1``.
+    """
+    FWHM_TO_STD = 1 / 2.355
+
+    resolution = _numeric(batch, resolution_key, "resolution")
+
+    if is_percentage:
+        resolution = resolution / 100
+    if not is_percentage and np.any(resolution > 1):
+        raise ValueError(f"is_percentage is {is_percentage} but got numbers bigger than 1: {resolution[resolution > 1]}")
+
+    upper_threshold = peak * (1 + sigmas * FWHM_TO_STD * resolution)
+
+    if jitter is not None:
+        upper_threshold = _uniform_jitter(upper_threshold, jitter * peak, rng)
+
+    return upper_threshold
+
+
+def division(batch: ConfigBatch, num_key: str, den_key: str, integer: bool = False) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.division`.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.batch import ConfigBatch
+        from randfig.expressions import vectorized
+        # --- hide: stop ---
+
+        batch = ConfigBatch.from_dicts([{"num": 7, "den": 2}, {"num": 9, "den": 4}])
+        out = vectorized.division(batch, "num", "den", integer=True)
+
+        # --- hide: start ---
+        print(f"out: {out}")
+        # --- hide: stop ---
+
+    Raises:
+        TypeError: if any value of ``num_key`` or ``den_key`` is not a ``Number``.
+        ZeroDivisionError: if any value of ``den_key`` is zero.
+    """
+    num = _numeric(batch, num_key, "num")
+    den = _numeric(batch, den_key, "den")
+    _check_zero_division(den)
+
+    if integer:
+        return np.floor_divide(num, den).astype(np.int64)
+
+    return num / den
+
+
+def division_by_num(batch: ConfigBatch, n_key: str, num: Number, integer: bool = False) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.division_by_num`.
+
+    Raises:
+        TypeError: if any value of ``n_key`` or ``num`` are not ``Number`` instances.
+        ZeroDivisionError: if ``num`` is zero.
+    """
+    _check_number("num", num)
+    n = _numeric(batch, n_key, "n")
+    _check_zero_division(np.asarray(num))
+
+    if integer:
+        return np.floor_divide(n, num).astype(np.int64)
+
+    return n / num
+
+
+def product(batch: ConfigBatch, a_key: str, b_key: str) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.product`.
+
+    Raises:
+        TypeError: if any value of ``a_key`` or ``b_key`` is not a ``Number``.
+    """
+    return _numeric(batch, a_key, "a") * _numeric(batch, b_key, "b")
+
+
+def product_by_num(batch: ConfigBatch, n_key: str, num: Number) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.product_by_num`.
+
+    Raises:
+        TypeError: if any value of ``n_key`` or ``num`` are not ``Number`` instances.
+    """
+    _check_number("num", num)
+    return _numeric(batch, n_key, "n") * num
+
+
+def get_regular_polygon_sides(batch: ConfigBatch, side_len_key: str, apothem_key: str) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.get_regular_polygon_sides`.
+
+    Raises:
+        TypeError: if any value of ``side_len_key`` or ``apothem_key`` is not a ``Number``.
+        ZeroDivisionError: if any value of ``apothem_key`` is zero.
+    """
+    side_len = _numeric(batch, side_len_key, "side_len")
+    apothem = _numeric(batch, apothem_key, "apothem")
+    _check_zero_division(apothem)
+
+    return np.rint(math.pi / np.arctan(side_len / (2 * apothem))).astype(np.int64)
+
+
+def _as_int(batch: ConfigBatch, key: str) -> np.ndarray:
+    """
+    Cast the values of ``key`` to ``int`` as python's ``int`` does.
+    """
+    column = batch.column(key)
+
+    if column.dtype.kind in "biuf":
+        return column.astype(np.int64)
+
+    return np.array([int(v) for v in column.tolist()], dtype=np.int64)
+
+
+def round_to_closest_even(batch: ConfigBatch, key_n: str) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.round_to_closest_even`.
+    """
+    n = _as_int(batch, key_n)
+    return np.where(n < 1, 2, np.ceil(n / 2.) * 2).astype(np.int64)
+
+
+def get_regular_polygon_apothem(batch: ConfigBatch, side_len_key: str, n_sides_key: str) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.get_regular_polygon_apothem`.
+
+    Raises:
+        TypeError: when any value of ``side_len_key`` is not a ``Number`` instance.
+    """
+    side_len = _numeric(batch, side_len_key, "side_len")
+    n_sides = _as_int(batch, n_sides_key)
+    _check_zero_division(n_sides)
+
+    return side_len / (2 * np.tan(math.pi / n_sides))
+
+
+def get_divisor(batch: ConfigBatch, key: str, search_divisor_kwargs: Mapping[str, Any]) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.get_divisor`,
+    see :py:func:`randfig.utils.search_divisor_array`.
+    """
+    return search_divisor_array(_as_int(batch, key), **search_divisor_kwargs)
+
+
+def get_jittered_value(batch: ConfigBatch, key: str, p: Number, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.get_jittered_value`.
+    If ``rng`` is ``None``, :py:func:`randfig.rng.current_rng` is used.
+
+    Raises:
+        TypeError: if any value of ``key`` is not a ``Number``.
+    """
+    value = _numeric(batch, key, "value")
+    _check_number("p", p)
+
+    return _uniform_jitter(value, value * p, rng)
+
+
+def pick_from_mapping(batch: ConfigBatch, key: str, mapping: Mapping[str, Any]) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.pick_from_mapping`.
+    ``mapping`` is accessed once for each distinct value of ``key``.
+    """
+    column = batch.column(key)
+
+    if column.dtype.kind == "O":
+        return as_column([mapping[v] for v in column.tolist()])
+
+    uniques, inverse = np.unique(column, return_inverse=True)
+    picked = as_column([mapping[u] for u in uniques.tolist()])
+
+    return picked[inverse.reshape(-1)]
+
+
+def add(batch: ConfigBatch, key_a: str, key_b: str) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.add`.
+    """
+    return batch.column(key_a) + batch.column(key_b)
+
+
+def add_value(batch: ConfigBatch, key: str, value: Any) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.add_value`.
+    """
+    column = batch.column(key)
+
+    if column.dtype.kind == "O":
+        return as_column([v + value for v in column.tolist()])
+
+    return column + value
+
+
+def call(batch: ConfigBatch, key: str, fn: Callable) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.call`, ``fn``
+    is called for each value of ``key``.
+    """
+    return as_column([fn(v) for v in batch.column(key).tolist()])
+
+
+def trunc(batch: ConfigBatch, key: str, decimals: int) -> np.ndarray:
+    """
+    Vectorized :py:func:`randfig.expressions.trunc`.
+
+    Raises:
+        TypeError: if any value of ``key`` is not a ``Number``.
+    """
+    return _round(_numeric(batch, key, "value"), decimals).astype(np.float64)
+
+
+def _accepts_cfg(batch: ConfigBatch, fn: Union[Callable[[Any], Any], str], args: Any, kwargs: Any) -> np.ndarray:
+    """
+    Vectorized counterpart of :py:func:`randfig.decorators.accept_cfg`.
+    ``numpy.random.Generator`` methods are called once with ``size``
+    equal to the batch size, other callables are called for each row.
+    """
+    if isinstance(fn, str):
+        return getattr(current_rng(), fn)(*args, size=len(batch), **kwargs)
+    return as_column([fn(*args, **kwargs) for _ in range(len(batch))])
+
+
+_VECTORIZED = {
+    decorators._accepts_cfg: _accepts_cfg,
+    expressions.pop: pop,
+    expressions.rounding: rounding,
+    expressions.min_threshold_from_resolution: min_threshold_from_resolution,
+    expressions.max_threshold_from_resolution: max_threshold_from_resolution,
+    expressions.division: division,
+    expressions.division_by_num: division_by_num,
+    expressions.product: product,
+    expressions.product_by_num: product_by_num,
+    expressions.get_regular_polygon_sides: get_regular_polygon_sides,
+    expressions.round_to_closest_even: round_to_closest_even,
+    expressions.get_regular_polygon_apothem: get_regular_polygon_apothem,
+    expressions.get_divisor: get_divisor,
+    expressions.get_jittered_value: get_jittered_value,
+    expressions.pick_from_mapping: pick_from_mapping,
+    expressions.add: add,
+    expressions.add_value: add_value,
+    expressions.call: call,
+    expressions.trunc: trunc,
+}
+
+
+def get_vectorized(formula: Callable[[Mapping], Any]) -> Optional[Callable[[ConfigBatch], np.ndarray]]:
+    """
+    Get the vectorized counterpart of a formula built as a ``functools.partial``
+    of a function of :py:mod:`randfig.expressions`, for example
+    ``functools.partial(randfig.expressions.division, num_key="a", den_key="b")``,
+    or with :py:func:`randfig.decorators.accept_cfg`.
+
+    Args:
+        formula: a callable that accepts a ``dict``-like configuration.
+
+    Returns:
+        A callable that accepts a :py:class:`randfig.batch.ConfigBatch`
+        with the same arguments than ``formula`` or ``None`` if there
+        is no vectorized counterpart.
+    """
+    if isinstance(formula, functools.partial) and formula.func in _VECTORIZED:
+        return functools.partial(_VECTORIZED[formula.func], *formula.args, **formula.keywords)
+    return None
@@ -0,0 +1,596 @@
+import io
+import itertools
+import json
+import pickle
+import re
+import struct
+import ruamel.yaml as yaml
+import yaml as pyyaml
+from abc import ABC, abstractmethod
+from numbers import Integral, Real
+from ruamel.yaml.nodes import ScalarNode
+from ruamel.yaml.resolver import implicit_resolvers
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
+
+
+__all__ = ["Format", "YamlTemplate", "YamlFormat", "JsonFormat", "PickleFormat", "MsgpackFormat", "FORMATS", "get_format", "is_plain"]
+
+
+class _CDumper(getattr(pyyaml, "CSafeDumper", pyyaml.SafeDumper)):
+    """
+    Safe dumper of ``PyYAML``, which follows YAML 1.1, that also quotes the
+    strings loaded as other types by YAML 1.2, like ``0o17`` or ``1e3``.
+    """
+
+
+for _versions, _tag, _regexp, _first in implicit_resolvers:
+    if (1, 2) in _versions:
+        _CDumper.add_implicit_resolver(_tag, _regexp, _first)
+
+_PLAIN_TYPES = {dict, list, str, int, float, bool, type(None)}
+
+_SLOT = "randfigslot{}q"
+
+_SLOT_PATTERN = re.compile(r"randfigslot(\d+)q")
+
+_STR_TAG = "tag:yaml.org,2002:str"
+
+# default line width of the ruamel.yaml emitter
+_BEST_WIDTH = 80
+
+_MAX_STRINGS = 10000
+
+
+def is_plain(value: Any) -> bool:
+    """
+    Args:
+        value: any python object.
+
+    Returns:
+        Whether ``value`` is made only of ``dict``, ``list`` and scalars of builtin types.
+    """
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        cls = type(value)
+        if cls not in _PLAIN_TYPES:
+            return False
+        if cls is dict:
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif cls is list:
+            stack.extend(value)
+    return True
+
+
+class Format(ABC):
+    """
+    Interface for the serialization formats of the configurations.
+    """
+
+    extension = ""
+    """
+    Extension of the files written in this format.
+    """
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """
+        Args:
+            value: a configuration.
+
+        Returns:
+            The serialized configuration.
+        """
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """
+        Args:
+            data: a configuration serialized with :py:meth:`dumps`.
+
+        Returns:
+            The configuration.
+        """
+        pass
+
+
+class YamlTemplate:
+    """
+    Layout of the YAML documents of the configurations with the same structure as
+    a prototype configuration, that is the same nested keys in the same order and
+    lists of the same length. The layout is dumped once with ``ruamel.yaml``, then
+    each configuration is rendered by writing its escaped scalars in the layout,
+    which is much faster than dumping it and gives the same document.
+
+    :py:meth:`render` returns ``None`` when the structure of the configuration is
+    different or when one of its scalars can not be written in the layout, like
+    multiline strings, strings folded over several lines or values of other types.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.formats import YamlTemplate
+        # --- hide: stop ---
+
+        template = YamlTemplate({"param_root": {"param_0": 0, "param_1": [1, 2]}})
+        print(template.render({"param_root": {"param_0": "a: b", "param_1": [None, 1.5]}}))
+        print(template.render({"param_root": {"param_0": 0}}))
+    """
+
+    def __init__(self, prototype: Dict, sequence: int = 2, offset: int = 4) -> None:
+        """
+        Args:
+            prototype: a configuration made only of ``dict``, ``list`` and builtin scalars.
+            sequence: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
+            offset: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
+
+        Raises:
+            ValueError: if ``prototype`` is not a ``dict`` made only of ``dict``, ``list``
+                and builtin scalars, or if the layout can not be built from it.
+        """
+        if type(prototype) is not dict or not is_plain(prototype):
+            raise ValueError(f"Expected a dict made only of dict, list and builtin scalars but got {prototype}.")
+
+        self.sequence = sequence
+        self.offset = offset
+        # the emitter and the resolver of a YAML instance which is not used to dump
+        analyzer = yaml.YAML()
+        self._emitter = analyzer.emitter
+        self._resolver = analyzer.resolver
+        self._strings: Dict[str, Optional[str]] = {}
+        yml = yaml.YAML()
+        yml.indent(sequence=sequence, offset=offset)
+
+        slots = itertools.count()
+        self._shape, layout = self._compile(prototype, lambda: _SLOT.format(next(slots)))
+        _, nulls = self._compile(prototype, lambda: None)
+        parts = _SLOT_PATTERN.split(self._dump(yml, layout))
+        segments = parts[::2]
+        null_lines = self._dump(yml, nulls).split("\n")
+
+        if parts[1::2] != [str(i) for i in range(len(segments) - 1)] or not all(s.endswith(" ") for s in segments[:-1]):
+            raise ValueError(f"Could not build the layout of {prototype}.")
+
+        # the space before each scalar is written with the scalar
+        self._segments = [s[:-1] for s in segments[:-1]] + segments[-1:]
+        self._columns = []
+        self._nulls = []
+        line = 0
+
+        for segment in self._segments[:-1]:
+            line += segment.count("\n")
+            column = len(segment) - segment.rfind("\n") - 1
+            self._columns.append(column)
+            # null values are written with or without a space depending on the indents
+            self._nulls.append(null_lines[line][column:] if line < len(null_lines) else None)
+
+        if None in self._nulls or any(text.strip() for text in self._nulls):
+            raise ValueError(f"Could not build the layout of {prototype}.")
+
+    @staticmethod
+    def _dump(yml: yaml.YAML, value: Any) -> str:
+        stream = io.StringIO()
+        yml.dump(value, stream)
+        return stream.getvalue()
+
+    def _compile(self, value: Any, leaf: Callable[[], Any]) -> Tuple[Any, Any]:
+        """
+        The shape of ``value``, which is ``None`` for a scalar or the type, the keys
+        or the length and the shapes of the items for a container, and the layout
+        of ``value``, where every scalar is replaced by ``leaf()``.
+        """
+        cls = type(value)
+
+        if cls is dict:
+            items = [self._compile(v, leaf) for v in value.values()]
+            return (dict, tuple(value), [shape for shape, _ in items]), {k: v for k, (_, v) in zip(value, items)}
+        if cls is list:
+            items = [self._compile(v, leaf) for v in value]
+            return (list, len(value), [shape for shape, _ in items]), [v for _, v in items]
+        return None, leaf()
+
+    def _leaves(self, value: Any) -> Optional[List[Any]]:
+        """
+        The scalars of ``value`` in the order of the document, or
+        ``None`` if ``value`` has a different structure.
+        """
+        leaves = []
+        stack = [(self._shape, value)]
+
+        while stack:
+            shape, value = stack.pop()
+
+            if shape is None:
+                if type(value) is dict or type(value) is list:
+                    return None
+                leaves.append(value)
+                continue
+
+            cls, keys, shapes = shape
+            if type(value) is not cls:
+                return None
+            if cls is dict:
+                if tuple(value) != keys:
+                    return None
+                value = value.values()
+            elif len(value) != keys:
+                return None
+            stack.extend(reversed(list(zip(shapes, value))))
+
+        return leaves
+
+    def _string(self, value: str) -> Optional[str]:
+        """
+        The plain or single quoted scalar chosen by ``ruamel.yaml`` for ``value``,
+        ``None`` if it would be double quoted or span several lines.
+        """
+        try:
+            return self._strings[value]
+        except KeyError:
+            pass
+
+        analysis = self._emitter.analyze_scalar(value)
+        text = None
+
+        if analysis.allow_block_plain and self._resolver.resolve(ScalarNode, value, (True, False)) == _STR_TAG:
+            text = " " + value
+        elif analysis.allow_single_quoted and not analysis.multiline and "'" not in value:
+            text = " '" + value + "'"
+
+        if len(self._strings) >= _MAX_STRINGS:
+            self._strings.clear()
+        self._strings[value] = text
+        return text
+
+    def _scalar(self, value: Any, column: int, null: str) -> Optional[str]:
+        """
+        ``value`` as written by ``ruamel.yaml`` at ``column``, preceded by a
+        space, or ``null`` if it is ``None``. ``None`` if it is not supported.
+        """
+        cls = type(value)
+
+        if cls is str:
+            text = self._string(value)
+        elif cls is bool:
+            text = " true" if value else " false"
+        elif cls is int:
+            text = " " + str(value)
+        elif cls is float:
+            if value != value:
+                text = " .nan"
+            elif value in (float("inf"), float("-inf")):
+                text = " .inf" if value > 0 else " -.inf"
+            else:
+                text = " " + repr(value).lower()
+        elif value is None:
+            text = null
+        else:
+            text = None
+
+        # scalars past the end of the line are moved to the next line or folded
+        if text is not None and column + len(text) > _BEST_WIDTH:
+            return None
+        return text
+
+    def render(self, value: Any) -> Optional[str]:
+        """
+        Args:
+            value: a configuration.
+
+        Returns:
+            The YAML document of ``value``, or ``None`` if ``value`` can not be rendered
+            with the layout, then it must be dumped with ``ruamel.yaml``.
+        """
+        leaves = self._leaves(value)
+
+        if leaves is None:
+            return None
+
+        segments = self._segments
+        parts = [segments[0]]
+
+        for i, (leaf, column, null) in enumerate(zip(leaves, self._columns, self._nulls)):
+            text = self._scalar(leaf, column, null)
+            if text is None:
+                return None
+            parts.append(text)
+            parts.append(segments[i + 1])
+
+        return "".join(parts)
+
+
+class YamlFormat(Format):
+    """
+    YAML documents written with ``ruamel.yaml``, whose emitter is built once and
+    reused. Documents are loaded with the safe loader of ``ruamel.yaml``, which
+    follows YAML 1.2 like the emitter, so strings like ``yes`` or ``on`` are
+    loaded as strings.
+
+    If ``template`` is ``True``, the first ``dict`` dumped is the prototype of a
+    :py:class:`YamlTemplate`, then the configurations with the same structure are
+    rendered with it and the other ones are dumped with ``ruamel.yaml``.
+    """
+
+    extension = ".yaml"
+
+    def __init__(self, sequence: int = 2, offset: int = 4, c_dumper: bool = False, template: bool = False) -> None:
+        """
+        Args:
+            sequence: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
+            offset: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
+            c_dumper: if ``True``, values made only of ``dict``, ``list`` and builtin scalars
+                are dumped with the ``libyaml`` based dumper of ``PyYAML``, which is much faster
+                but ignores ``sequence`` and ``offset``. Other values are dumped with ``ruamel.yaml``.
+            template: if ``True``, configurations with the structure of the first one are rendered
+                with a :py:class:`YamlTemplate`. It takes precedence over ``c_dumper``.
+        """
+        self.sequence = sequence
+        self.offset = offset
+        self.c_dumper = c_dumper
+        self.template = template
+        # YamlTemplate, or False if it could not be built from the prototype
+        self._template: Union[YamlTemplate, bool, None] = None
+        self._yml = yaml.YAML()
+        self._yml.indent(sequence=sequence, offset=offset)
+        self._loader = yaml.YAML(typ="safe", pure=True)
+
+    def dumps(self, value: Any) -> bytes:
+        if self.template and type(value) is dict:
+            if self._template is None:
+                try:
+                    self._template = YamlTemplate(value, self.sequence, self.offset)
+                except ValueError:
+                    self._template = False
+
+            text = self._template.render(value) if self._template else None
+            if text is not None:
+                return text.encode("utf-8")
+
+        if self.c_dumper and is_plain(value):
+            return pyyaml.dump(value, Dumper=_CDumper, sort_keys=False, allow_unicode=True).encode("utf-8")
+
+        stream = io.StringIO()
+        self._yml.dump(value, stream)
+        return stream.getvalue().encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return self._loader.load(data)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_yml"] = None
+        state["_loader"] = None
+        state["_template"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["sequence"], state["offset"], state["c_dumper"], state["template"])
+
+
+class JsonFormat(Format):
+    """
+    JSON documents, written in a single line unless ``indent`` is given.
+    """
+
+    extension = ".json"
+
+    def __init__(self, indent: Optional[int] = None) -> None:
+        """
+        Args:
+            indent: indentation of the nested values, see ``json.dumps``.
+        """
+        self.indent = indent
+
+    def dumps(self, value: Any) -> bytes:
+        separators = (",", ":") if self.indent is None else None
+        return json.dumps(value, indent=self.indent, separators=separators, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class PickleFormat(Format):
+    """
+    ``pickle`` documents, any picklable value can be saved. Only
+    load documents from trusted sources, see the ``pickle`` module.
+    """
+
+    extension = ".pkl"
+
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        """
+        Args:
+            protocol: ``pickle`` protocol.
+        """
+        self.protocol = protocol
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=self.protocol)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+def _pack(value: Any, out: List[bytes]) -> None:
+    """
+    Append the MessagePack encoding of ``value`` to ``out``.
+    """
+    if value is None:
+        out.append(b"\xc0")
+    elif isinstance(value, bool):
+        out.append(b"\xc3" if value else b"\xc2")
+    elif isinstance(value, Integral):
+        value = int(value)
+        if 0 <= value < 0x80 or -0x20 <= value < 0:
+            out.append(struct.pack("b" if value < 0 else "B", value))
+        elif 0 <= value < 2 ** 64:
+            for code, fmt, limit in ((0xcc, ">B", 2 ** 8), (0xcd, ">H", 2 ** 16), (0xce, ">I", 2 ** 32), (0xcf, ">Q", 2 ** 64)):
+                if value < limit:
+                    out.append(bytes([code]) + struct.pack(fmt, value))
+                    break
+        elif -2 ** 63 <= value < 0:
+            for code, fmt, limit in ((0xd0, ">b", 2 ** 7), (0xd1, ">h", 2 ** 15), (0xd2, ">i", 2 ** 31), (0xd3, ">q", 2 ** 63)):
+                if value >= -limit:
+                    out.append(bytes([code]) + struct.pack(fmt, value))
+                    break
+        else:
+            raise ValueError(f"Integer {value} does not fit in 64 bits.")
+    elif isinstance(value, Real):
+        out.append(b"\xcb" + struct.pack(">d", float(value)))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_header(len(data), 0xa0, 32, (0xd9, 0xda, 0xdb)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_header(len(value), None, 0, (0xc4, 0xc5, 0xc6)) + bytes(value))
+    elif isinstance(value, Mapping):
+        out.append(_header(len(value), 0x80, 16, (None, 0xde, 0xdf)))
+        for k, v in value.items():
+            _pack(k, out)
+            _pack(v, out)
+    elif isinstance(value, (list, tuple)):
+        out.append(_header(len(value), 0x90, 16, (None, 0xdc, 0xdd)))
+        for v in value:
+            _pack(v, out)
+    else:
+        raise TypeError(f"Can not serialize {value}, which is {type(value)}.")
+
+
+def _header(size: int, fix: Optional[int], fix_limit: int, codes: Tuple[Optional[int], ...]) -> bytes:
+    """
+    Header of a string, binary, array or map of ``size`` items: the
+    ``fix`` code plus the size if it is smaller than ``fix_limit``, otherwise
+    the code for 8, 16 or 32 bits sizes followed by the size.
+    """
+    if fix is not None and size < fix_limit:
+        return bytes([fix | size])
+    for code, fmt, limit in zip(codes, (">B", ">H", ">I"), (2 ** 8, 2 ** 16, 2 ** 32)):
+        if code is not None and size < limit:
+            return bytes([code]) + struct.pack(fmt, size)
+    raise ValueError(f"Size {size} is too big.")
+
+
+_FIXED = {
+    0xcc: ">B", 0xcd: ">H", 0xce: ">I", 0xcf: ">Q",
+    0xd0: ">b", 0xd1: ">h", 0xd2: ">i", 0xd3: ">q",
+    0xca: ">f", 0xcb: ">d",
+}
+
+_SIZES = {
+    0xd9: ">B", 0xda: ">H", 0xdb: ">I",
+    0xc4: ">B", 0xc5: ">H", 0xc6: ">I",
+    0xdc: ">H", 0xdd: ">I",
+    0xde: ">H", 0xdf: ">I",
+}
+
+
+def _unpack(data: bytes, pos: int) -> Tuple[Any, int]:
+    """
+    Decode the MessagePack value at ``pos``.
+
+    Returns:
+        The value and the position after it.
+    """
+    code = data[pos]
+    pos += 1
+
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code == 0xc0:
+        return None, pos
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, pos
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + struct.calcsize(fmt)
+
+    if 0xa0 <= code <= 0xbf:
+        kind, size = "str", code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, size = "array", code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, size = "map", code & 0x0f
+    elif code in _SIZES:
+        fmt = _SIZES[code]
+        size = struct.unpack_from(fmt, data, pos)[0]
+        pos += struct.calcsize(fmt)
+        kind = {0xd9: "str", 0xda: "str", 0xdb: "str", 0xdc: "array", 0xdd: "array", 0xde: "map", 0xdf: "map"}.get(code, "bin")
+    else:
+        raise ValueError(f"Unsupported MessagePack type code {code:#x}.")
+
+    if kind == "str":
+        return bytes(data[pos:pos + size]).decode("utf-8"), pos + size
+    if kind == "bin":
+        return bytes(data[pos:pos + size]), pos + size
+
+    if kind == "array":
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+
+    mapping = {}
+    for _ in range(size):
+        k, pos = _unpack(data, pos)
+        mapping[k], pos = _unpack(data, pos)
+    return mapping, pos
+
+
+class MsgpackFormat(Format):
+    """
+    Compact binary documents in the `MessagePack <https://msgpack.org>`_ format,
+    readable by any MessagePack library. Mappings, lists, tuples, strings, bytes,
+    numbers, booleans and ``None`` are supported, tuples are loaded as lists.
+    """
+
+    extension = ".msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        out: List[bytes] = []
+        _pack(value, out)
+        return b"".join(out)
+
+    def loads(self, data: bytes) -> Any:
+        value, pos = _unpack(data, 0)
+
+        if pos != len(data):
+            raise ValueError(f"Found {len(data) - pos} bytes after the document.")
+        return value
+
+
+FORMATS: Dict[str, Type[Format]] = {
+    "yaml": YamlFormat,
+    "json": JsonFormat,
+    "pickle": PickleFormat,
+    "msgpack": MsgpackFormat,
+}
+"""
+Formats by name, see :py:func:`get_format`.
+"""
+
+
+def get_format(fmt: Union[str, Format]) -> Format:
+    """
+    Args:
+        fmt: a :py:class:`Format`, the name of a format of :py:data:`FORMATS`
+            or the extension of a format, like ``".json"``.
+
+    Returns:
+        The format, built with its default arguments if ``fmt`` is a ``str``.
+
+    Raises:
+        ValueError: if there is no format for ``fmt``.
+    """
+    if isinstance(fmt, Format):
+        return fmt
+
+    for name, cls in FORMATS.items():
+        if fmt in (name, cls.extension):
+            return cls()
+
+    extensions = tuple(cls.extension for cls in FORMATS.values())
+    raise ValueError(f"Expected a format in {tuple(FORMATS)} or an extension in {extensions} but got {fmt}.")
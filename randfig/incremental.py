@@ -0,0 +1,231 @@
+import copy
+from collections.abc import MutableMapping
+from numbers import Number
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, Optional, Set
+from randfig.rng import resolve_seed, sample_context, seeded_random
+from randfig.transforms.compose import Compose
+
+
+__all__ = ["Incremental"]
+
+
+_DELETED = object()
+
+_IMMUTABLE_TYPES = (Number, str, bytes, type(None))
+
+
+class _Tracker(MutableMapping):
+    """
+    View of a configuration that records the keys read and written through it.
+    ``reads`` becomes ``None`` when the keys are iterated, since then the whole
+    configuration is read. Mutable values that are read are recorded as written
+    because they may be modified in place.
+    """
+
+    __slots__ = ("data", "reads", "writes")
+
+    def __init__(self, data: Mapping) -> None:
+        self.data = data
+        self.reads: Optional[Set[Hashable]] = set()
+        self.writes: Dict[Hashable, None] = {}
+
+    def _read(self, key: Hashable) -> None:
+        if self.reads is not None:
+            self.reads.add(key)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        self._read(key)
+        value = self.data[key]
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            self.writes[key] = None
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.writes[key] = None
+        self.data[key] = value
+
+    def __delitem__(self, key: Hashable) -> None:
+        self.writes[key] = None
+        del self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        self._read(key)
+        return key in self.data
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self.reads = None
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        self.reads = None
+        return len(self.data)
+
+
+class _Record:
+    """
+    Keys read by a transform in the last run and the values it left in the written keys.
+    """
+
+    __slots__ = ("reads", "delta")
+
+    def __init__(self, reads: Optional[Set[Hashable]], delta: Dict[Hashable, Any]) -> None:
+        self.reads = reads
+        self.delta = delta
+
+
+def _differs(a: Any, b: Any) -> bool:
+    """
+    Whether two values of a configuration are different, values
+    that can not be compared are considered different.
+    """
+    if a is _DELETED or b is _DELETED:
+        return a is not b
+    if type(a) is not type(b):
+        return True
+    try:
+        return bool(a != b)
+    except (TypeError, ValueError):
+        return True
+
+
+def _affected(record: _Record, dirty: Set[Hashable]) -> bool:
+    """
+    Whether the transform of ``record`` read a key whose value changed.
+    """
+    if record.reads is None:
+        return bool(dirty)
+    return not record.reads.isdisjoint(dirty)
+
+
+class Incremental:
+    """
+    Regenerate the configuration of a :py:class:`randfig.transforms.compose.Compose`
+    incrementally when its base configuration changes. The keys each transform reads
+    and writes are tracked during a run. In the next run, only the transforms that read
+    a top-level key whose value changed are applied again, the values written by the
+    rest of transforms in the previous run are reused.
+
+    Transforms are applied as in :py:meth:`randfig.transforms.compose.Compose.sample`,
+    so each run gives the same configuration as a full sample with the same ``seed``
+    and ``index``. Transforms must only depend on the configuration and their generators:
+    side effects of skipped transforms, like writing a file, are not repeated.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig import Compose, Formula
+        from randfig.incremental import Incremental
+        # --- hide: stop ---
+
+        incremental = Incremental(Compose([
+            Formula(keys=["param_2"], formula=lambda cfg: 2 * cfg["param_0"]),
+            Formula(keys=["param_3"], formula=lambda cfg: 2 * cfg["param_1"]),
+        ]), seed=42)
+        incremental.run({"param_0": 0, "param_1": 1})
+        cfg = incremental.run({"param_0": 10, "param_1": 1})
+
+        # --- hide: start ---
+        print(f"cfg: {cfg}, recomputed: {incremental.recomputed}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self, compose: Compose, seed: Optional[int] = None, index: int = 0) -> None:
+        """
+        Args:
+            compose: the pipeline.
+            seed: root seed of the run, see :py:func:`randfig.rng.resolve_seed`.
+            index: index of the sample, see :py:meth:`randfig.transforms.compose.Compose.sample`.
+        """
+        self.compose = compose
+        self.seed = resolve_seed(seed)
+        self.index = index
+        self.recomputed: List[int] = []
+        self._base: Optional[Mapping] = None
+        self._records: List[_Record] = []
+
+    def reset(self) -> None:
+        """
+        Forget the previous run, the next run applies every transform.
+        """
+        self._base = None
+        self._records = []
+
+    def run(self, base_cfg: Mapping) -> Mapping:
+        """
+        Generate the configuration of ``base_cfg``. The positions of the
+        transforms applied again are stored in :py:attr:`self.recomputed`.
+        If a transform raises an exception, the previous run is forgotten.
+
+        Args:
+            base_cfg: configuration from which the sample starts, it is not modified.
+
+        Returns:
+            The generated configuration.
+        """
+        transforms = self.compose.transforms
+        positions = self.compose.positions if self.compose.positions is not None else range(len(transforms))
+
+        if self._base is None or len(self._records) != len(transforms):
+            dirty = None
+            self._records = [None] * len(transforms)
+        else:
+            keys = set(self._base) | set(base_cfg)
+            dirty = {k for k in keys if _differs(self._base.get(k, _DELETED), base_cfg.get(k, _DELETED))}
+
+        self._base = copy.deepcopy(base_cfg)
+        cfg = copy.deepcopy(base_cfg)
+        self.recomputed = []
+
+        try:
+            with seeded_random():
+                for i, tfs in enumerate(transforms):
+                    record = self._records[i]
+
+                    if dirty is not None and not _affected(record, dirty):
+                        for k, v in record.delta.items():
+                            if v is _DELETED:
+                                cfg.pop(k, None)
+                            else:
+                                cfg[k] = copy.deepcopy(v)
+                            dirty.discard(k)
+                        continue
+
+                    with sample_context(self.seed, self.index, positions[i]):
+                        cfg, self._records[i] = self._apply(tfs, cfg)
+                    self.recomputed.append(i)
+
+                    if dirty is not None:
+                        old, new = record.delta, self._records[i].delta
+                        for k in old.keys() | new.keys():
+                            if k in old and k in new and not _differs(old[k], new[k]):
+                                dirty.discard(k)
+                            else:
+                                dirty.add(k)
+        except BaseException:
+            # The records are partially updated, the next run starts from scratch.
+            self.reset()
+            raise
+
+        return cfg
+
+    @staticmethod
+    def _apply(tfs: Any, cfg: Mapping) -> Any:
+        """
+        Apply ``tfs`` to ``cfg`` through a :py:class:`_Tracker`.
+
+        Returns:
+            The transformed configuration and the :py:class:`_Record` of the transform.
+        """
+        before = list(cfg)
+        tracker = _Tracker(cfg)
+        out = tfs(tracker)
+
+        if out is tracker:
+            out, reads, written = cfg, tracker.reads, tracker.writes
+        else:
+            # The transform built a new configuration, so every key may have changed.
+            out = out.data if isinstance(out, _Tracker) else out
+            reads, written = None, dict.fromkeys(before + list(out))
+
+        delta = {k: copy.deepcopy(out[k]) if k in out else _DELETED for k in written}
+        return out, _Record(reads, delta)
@@ -0,0 +1,140 @@
+from collections.abc import Sequence as _Sequence
+from typing import Any, Hashable, Iterator, Mapping, MutableMapping, Sequence, Tuple, Union
+
+
+__all__ = ["KeyPath"]
+
+
+class KeyPath(_Sequence):
+    """
+    A sequence of nested keys that gets, sets and deletes its value in nested
+    mappings. The path is split once when it is built and it is walked with a
+    loop, so no intermediate sequences are created on each access.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.keypath import KeyPath
+        # --- hide: stop ---
+
+        cfg = {"param_root": {"param_nest": {"param_0": 0}}}
+        path = KeyPath("param_root.param_nest.param_1")
+        path.set(cfg, 1)
+        value = path.get(cfg)
+
+        # --- hide: start ---
+        print(f"cfg: {cfg}, value: {value}")
+        # --- hide: stop ---
+    """
+
+    __slots__ = ("keys", "parent", "last")
+
+    def __init__(self, keys: Union[str, Sequence[Hashable], "KeyPath"], sep: str = ".") -> None:
+        """
+        Args:
+            keys: a sequence of nested keys or a string of nested keys separated by ``sep``.
+            sep: separator of the keys of a string path.
+
+        Raises:
+            TypeError: if ``keys`` is nor a ``str`` nor a ``Sequence``.
+            ValueError: if ``keys`` is empty.
+        """
+        if isinstance(keys, str):
+            keys = keys.split(sep)
+        elif not isinstance(keys, _Sequence):
+            raise TypeError(f"Expected keys to be a {str} or a {Sequence} but got: {keys}, which is type: {type(keys)}.")
+
+        self.keys: Tuple[Hashable, ...] = tuple(keys)
+
+        if not self.keys:
+            raise ValueError("Expected at least one key.")
+
+        self.parent = self.keys[:-1]
+        self.last = self.keys[-1]
+
+    def __getitem__(self, i: Union[int, slice]) -> Any:
+        return self.keys[i]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, KeyPath):
+            return self.keys == other.keys
+        return self.keys == other
+
+    def __hash__(self) -> int:
+        return hash(self.keys)
+
+    def __repr__(self) -> str:
+        return f"KeyPath({list(self.keys)})"
+
+    def get(self, mapping: Mapping) -> Any:
+        """
+        Get the value of the path, see :py:func:`randfig.utils.get_nested_value`.
+
+        Args:
+            mapping: a nested ``typing.Mapping``.
+
+        Returns:
+            The value of the last key.
+        """
+        node = mapping
+        for k in self.keys:
+            node = node[k]
+        return node
+
+    def get_parent(self, mapping: Mapping) -> MutableMapping:
+        """
+        Get the mapping that holds the last key.
+
+        Args:
+            mapping: a nested ``typing.Mapping``.
+
+        Returns:
+            The parent of the last key.
+
+        Raises:
+            TypeError: if one of the values of the nested keys is not a ``Mapping``.
+        """
+        node = mapping
+        for k in self.parent:
+            if not isinstance(node, Mapping):
+                break
+            node = node[k]
+
+        if not isinstance(node, Mapping):
+            raise TypeError(f"Got: {node} for one of the nested values, which is {type(node)}, expected a``Mapping``.")
+
+        return node
+
+    def set(self, mapping: Mapping, value: Any) -> None:
+        """
+        Insert or update the value of the path, see :py:func:`randfig.utils.insert_nested_key`.
+
+        Args:
+            mapping: a nested ``typing.Mapping``.
+            value: value to insert.
+
+        Raises:
+            TypeError: if one of the values of the nested keys is not a ``Mapping``.
+        """
+        self.get_parent(mapping)[self.last] = value
+
+    def delete(self, mapping: Mapping) -> Any:
+        """
+        Remove the last key, see :py:func:`randfig.utils.remove_nested_key`.
+
+        Args:
+            mapping: a nested ``typing.Mapping``.
+
+        Returns:
+            The removed value.
+
+        Raises:
+            TypeError: if one of the values of the nested keys is not a ``Mapping``.
+        """
+        return self.get_parent(mapping).pop(self.last)
@@ -0,0 +1,251 @@
+import functools
+import random
+import numpy as np
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Union
+
+
+__all__ = [
+    "resolve_seed",
+    "sample_seed",
+    "counter_rng",
+    "sample_context",
+    "spawn_rngs",
+    "seeded_random",
+    "generation_context",
+    "get_rng",
+    "current_rng",
+    "current_index",
+]
+
+
+_RNG: ContextVar[Optional[np.random.Generator]] = ContextVar("randfig_rng", default=None)
+
+_INDEX: ContextVar[Optional[int]] = ContextVar("randfig_index", default=None)
+
+
+def resolve_seed(seed: Optional[int] = None) -> int:
+    """
+    Get the root seed of a generation run.
+
+    Args:
+        seed: a non negative ``int``, if ``None`` fresh
+            entropy is drawn from the operating system.
+
+    Returns:
+        The root seed.
+
+    Raises:
+        ValueError: if ``seed`` is negative.
+    """
+    if seed is None:
+        return np.random.SeedSequence().entropy
+    if seed < 0:
+        raise ValueError(f"Expected a non negative seed but got {seed}.")
+    return int(seed)
+
+
+def sample_seed(seed: int, index: int, position: int = 0) -> int:
+    """
+    Derive the seed of a sample from the root seed, the sample index
+    and the position of a transform in the pipeline. Seeds are derived
+    with ``numpy.random.SeedSequence``, so the streams of different samples
+    are independent and each sample gets the same seed no matter how samples
+    are distributed among workers.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.rng import sample_seed
+        # --- hide: stop ---
+
+        seeds = [sample_seed(seed=42, index=i) for i in range(3)]
+
+        # --- hide: start ---
+        print(f"seeds: {seeds}")
+        # --- hide: stop ---
+
+    Args:
+        seed: root seed, see :py:func:`resolve_seed`.
+        index: index of the sample.
+        position: position of the transform.
+
+    Returns:
+        A seed for the sample.
+    """
+    return int(np.random.SeedSequence(seed, spawn_key=(index, position)).generate_state(1, np.uint64)[0])
+
+
+@functools.lru_cache(maxsize=64)
+def _philox_key(seed: int) -> int:
+    """
+    Derive a 128 bits ``numpy.random.Philox`` key from a root seed.
+    """
+    high, low = np.random.SeedSequence(seed).generate_state(2, np.uint64).tolist()
+    return (high << 64) | low
+
+
+def counter_rng(seed: int, index: int, position: int = 0) -> np.random.Generator:
+    """
+    Build a counter-based generator (``numpy.random.Philox``) for a sample.
+    The key of the generator is derived from ``seed`` and its counter starts
+    at ``(index, position)`` in its upper 128 bits, so the generator of any
+    sample is built in constant time and streams do not overlap
+    unless a single stream draws more than ``2 ** 128`` blocks.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.rng import counter_rng
+        # --- hide: stop ---
+
+        value = counter_rng(seed=42, index=10 ** 9, position=3).uniform()
+
+        # --- hide: start ---
+        print(f"value: {value}")
+        # --- hide: stop ---
+
+    Args:
+        seed: root seed, see :py:func:`resolve_seed`.
+        index: index of the sample.
+        position: position of the transform in the pipeline.
+
+    Returns:
+        A ``numpy.random.Generator`` for the sample.
+
+    Raises:
+        ValueError: if ``index`` or ``position`` are negative.
+    """
+    if index < 0 or position < 0:
+        raise ValueError(f"Expected non negative index and position but got {index} and {position}.")
+
+    counter = np.array([0, 0, position, index], dtype=np.uint64)
+    return np.random.Generator(np.random.Philox(key=_philox_key(seed), counter=counter))
+
+
+def spawn_rngs(seed: Union[int, np.random.SeedSequence], n: int) -> List[np.random.Generator]:
+    """
+    Spawn independent generators, for example one for each worker.
+
+    Args:
+        seed: root seed or ``numpy.random.SeedSequence``.
+        n: number of generators.
+
+    Returns:
+        ``n`` independent ``numpy.random.Generator``.
+    """
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed_seq.spawn(n)]
+
+
+def get_rng() -> Optional[np.random.Generator]:
+    """
+    Returns:
+        The generator of the current :py:func:`generation_context`
+        or ``None`` outside a generation context.
+    """
+    return _RNG.get()
+
+
+def current_rng() -> np.random.Generator:
+    """
+    Returns:
+        The generator of the current :py:func:`generation_context` or, outside a
+        generation context, a new generator seeded from the global ``random``
+        generator, so ``random.seed`` makes the draws reproducible.
+    """
+    rng = _RNG.get()
+    return rng if rng is not None else np.random.default_rng(random.getrandbits(128))
+
+
+def current_index() -> Optional[int]:
+    """
+    Returns:
+        The index of the sample of the current :py:func:`sample_context`
+        or ``None`` outside a sample context.
+    """
+    return _INDEX.get()
+
+
+@contextmanager
+def generation_context(rng: Union[np.random.Generator, np.random.SeedSequence, int, None]) -> Iterator[np.random.Generator]:
+    """
+    Set the generator used by the stochastic functions of randfig, such as
+    :py:func:`randfig.utils.add_uniform_jitter` or :py:func:`randfig.decorators.accept_cfg`,
+    inside a ``with`` block. Contexts can be nested and are local to
+    each thread.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.rng import generation_context
+        from randfig.utils import add_uniform_jitter
+        # --- hide: stop ---
+
+        with generation_context(42):
+            jittered = add_uniform_jitter(460, 0.01, 511)
+
+        # --- hide: start ---
+        print(f"jittered: {jittered}")
+        # --- hide: stop ---
+
+    Args:
+        rng: a ``numpy.random.Generator`` or a seed to build one.
+
+    Yields:
+        The generator of the context.
+    """
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    token = _RNG.set(rng)
+    try:
+        yield rng
+    finally:
+        _RNG.reset(token)
+
+
+@contextmanager
+def sample_context(seed: int, index: int, position: int = 0) -> Iterator[np.random.Generator]:
+    """
+    Set the generators used while the transform at ``position`` is applied to the
+    sample ``index``: a :py:func:`generation_context` with :py:func:`counter_rng`
+    and the global ``random`` generator seeded with :py:func:`sample_seed`.
+    The state of the ``random`` module is not restored, see :py:func:`seeded_random`.
+    The index of the sample is available through :py:func:`current_index`.
+
+    Args:
+        seed: root seed, see :py:func:`resolve_seed`.
+        index: index of the sample.
+        position: position of the transform in the pipeline.
+
+    Yields:
+        The generator of the context.
+    """
+    random.seed(sample_seed(seed, index, position))
+    token = _INDEX.set(index)
+    try:
+        with generation_context(counter_rng(seed, index, position)) as rng:
+            yield rng
+    finally:
+        _INDEX.reset(token)
+
+
+@contextmanager
+def seeded_random(seed: Optional[int] = None) -> Iterator[None]:
+    """
+    Seed the global ``random`` generator inside a ``with`` block,
+    its previous state is restored when leaving the block.
+
+    Args:
+        seed: seed for the ``random`` module, if ``None`` the generator
+            is not seeded but its state is still restored.
+    """
+    state = random.getstate()
+    if seed is not None:
+        random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
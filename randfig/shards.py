@@ -0,0 +1,458 @@
+import math
+import mmap
+import re
+import struct
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from randfig.formats import Format, JsonFormat, YamlFormat
+
+
+__all__ = ["INDEX_DTYPE", "ShardWriter", "ShardReader", "shard_path", "index_path", "read_index"]
+
+
+INDEX_DTYPE = np.dtype([("sample_id", "<i8"), ("shard", "<u4"), ("offset", "<u8"), ("length", "<u8")])
+"""
+Record of the sidecar index of a set of shards: the id of the sample, the number
+of its shard and the offset and length in bytes of its document in the shard.
+"""
+
+_INDEX_MAGIC = b"RFIDX001"
+
+_RECORD = struct.Struct("<qIQQ")
+
+_SHARD_EXTENSIONS = (".yaml", ".jsonl")
+
+
+def shard_path(save_dir: Union[str, Path], filename: Union[str, Path], shard: int) -> Path:
+    """
+    Args:
+        save_dir: directory of the shards.
+        filename: name of the set of shards, like ``"configs.yaml"`` or ``"configs.jsonl"``.
+        shard: number of the shard.
+
+    Returns:
+        The path of the shard, like ``save_dir/configs-00003.yaml``.
+    """
+    filename = Path(filename)
+    return Path(save_dir).joinpath(f"{filename.stem}-{shard:05d}{filename.suffix}")
+
+
+def index_path(save_dir: Union[str, Path], filename: Union[str, Path]) -> Path:
+    """
+    Args:
+        save_dir: directory of the shards.
+        filename: name of the set of shards, like ``"configs.yaml"`` or ``"configs.jsonl"``.
+
+    Returns:
+        The path of the sidecar index, like ``save_dir/configs.idx``.
+    """
+    return Path(save_dir).joinpath(Path(filename).stem + ".idx")
+
+
+def _default_format(filename: Union[str, Path]) -> Format:
+    """
+    The format of the documents of the shards of ``filename``, given by its extension.
+    """
+    suffix = Path(filename).suffix
+
+    if suffix not in _SHARD_EXTENSIONS:
+        raise ValueError(f"Provided filename has extension {suffix}, but expected one of {_SHARD_EXTENSIONS}.")
+    return YamlFormat() if suffix == ".yaml" else JsonFormat()
+
+
+def read_index(path: Union[str, Path], mmap: bool = True) -> np.ndarray:
+    """
+    Read a sidecar index written by :py:class:`ShardWriter`.
+
+    Args:
+        path: path of the index.
+        mmap: whether to map the file into memory instead of reading it.
+
+    Returns:
+        A structured array of :py:data:`INDEX_DTYPE` records, in writing order.
+
+    Raises:
+        ValueError: if the file is not an index.
+    """
+    with open(path, "rb") as index_file:
+        magic = index_file.read(len(_INDEX_MAGIC))
+
+    if magic != _INDEX_MAGIC:
+        raise ValueError(f"{path} is not an index of shards.")
+
+    size = (Path(path).stat().st_size - len(_INDEX_MAGIC)) // INDEX_DTYPE.itemsize
+
+    if not mmap or size == 0:
+        return np.fromfile(path, dtype=INDEX_DTYPE, count=size, offset=len(_INDEX_MAGIC))
+    return np.memmap(path, dtype=INDEX_DTYPE, mode="r", offset=len(_INDEX_MAGIC), shape=(size,))
+
+
+class ShardWriter:
+    """
+    Append configurations to rolling shards, multi-document YAML files or JSON-Lines
+    files, instead of writing a file per configuration. The position of each document
+    is recorded in a binary sidecar index of :py:data:`INDEX_DTYPE` records, see
+    :py:func:`read_index`. Each YAML document starts with ``"---"`` and each JSON
+    document takes a single line, so shards are also valid multi-document YAML and
+    JSON-Lines files.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import tempfile
+        from randfig.shards import ShardWriter, read_index
+        save_dir = tempfile.mkdtemp()
+        # --- hide: stop ---
+
+        with ShardWriter(save_dir, "configs.jsonl", max_docs=2) as writer:
+            for i in range(3):
+                writer.write({"param_0": i})
+
+        # --- hide: start ---
+        print(read_index(writer.index_path))
+        # --- hide: stop ---
+    """
+
+    def __init__(self,
+        save_dir: Union[str, Path],
+        filename: Union[str, Path],
+        max_docs: Optional[int] = 10000,
+        max_bytes: Optional[int] = None,
+        fmt: Optional[Format] = None,
+        append: bool = False
+    ) -> None:
+        """
+        Args:
+            save_dir: directory of the shards, it is created if it does not exist.
+            filename: name of the set of shards, its extension sets the format of
+                the shards: ``".yaml"`` or ``".jsonl"``, see :py:func:`shard_path`.
+            max_docs: maximum number of documents of a shard, unbounded if ``None``.
+            max_bytes: maximum size in bytes of a shard, unbounded if ``None``. A
+                document bigger than ``max_bytes`` is written in its own shard.
+            fmt: format of the documents, by default a :py:class:`randfig.formats.YamlFormat`
+                or a :py:class:`randfig.formats.JsonFormat` depending on the extension of ``filename``.
+            append: if ``True``, documents are appended to an existing index in new shards,
+                otherwise the index is overwritten and the existing shards of ``filename``
+                are removed.
+
+        Raises:
+            ValueError: if the extension of ``filename`` is not supported.
+            ValueError: if ``max_docs`` or ``max_bytes`` are smaller than 1.
+        """
+        default_format = _default_format(filename)
+
+        if (max_docs is not None and max_docs < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError(f"Expected max_docs and max_bytes of at least 1 or None but got {max_docs} and {max_bytes}.")
+
+        self.save_dir = Path(save_dir)
+        self.save_dir.mkdir(exist_ok=True, parents=True)
+        self.filename = Path(filename)
+        self.index_path = index_path(self.save_dir, self.filename)
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+
+        self.format = fmt if fmt is not None else default_format
+        self._separators: Tuple[bytes, bytes] = (b"---\n", b"") if self.filename.suffix == ".yaml" else (b"", b"\n")
+
+        self.shard = -1
+        self.count = 0
+
+        if append and self.index_path.is_file():
+            index = read_index(self.index_path, mmap=False)
+            self.shard = int(index["shard"].max()) if len(index) else -1
+            self.count = len(index)
+            self._index = open(self.index_path, "ab")
+        else:
+            self._remove_shards()
+            self._index = open(self.index_path, "wb")
+            self._index.write(_INDEX_MAGIC)
+
+        self._file = None
+        self._docs = 0
+        self._bytes = 0
+
+    def _remove_shards(self) -> None:
+        """
+        Remove the shards written before, so none is left out of the new index.
+        """
+        pattern = re.compile(re.escape(self.filename.stem) + r"-\d{5,}" + re.escape(self.filename.suffix))
+
+        for path in self.save_dir.glob(f"{self.filename.stem}-*{self.filename.suffix}"):
+            if pattern.fullmatch(path.name):
+                path.unlink()
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._index.closed
+
+    def _roll(self) -> None:
+        """
+        Close the current shard and open the next one.
+        """
+        if self._file is not None:
+            self._file.close()
+
+        self.shard += 1
+        self._file = open(shard_path(self.save_dir, self.filename, self.shard), "wb")
+        self._docs = 0
+        self._bytes = 0
+
+    def write(self, value: Any, sample_id: Optional[int] = None) -> int:
+        """
+        Append a configuration to the current shard, a new shard is
+        started if the current one would exceed ``max_docs`` or ``max_bytes``.
+
+        Args:
+            value: the configuration.
+            sample_id: id of the configuration in the index, by default
+                the number of configurations written before.
+
+        Returns:
+            The id of the configuration.
+
+        Raises:
+            ValueError: if the writer is closed.
+        """
+        if self.closed:
+            raise ValueError(f"The writer of {self.index_path} is closed.")
+
+        prefix, suffix = self._separators
+        data = self.format.dumps(value)
+        size = len(prefix) + len(data) + len(suffix)
+
+        if (
+            self._file is None
+            or (self.max_docs is not None and self._docs >= self.max_docs)
+            or (self.max_bytes is not None and self._bytes and self._bytes + size > self.max_bytes)
+        ):
+            self._roll()
+
+        offset = self._bytes + len(prefix)
+        self._file.write(prefix + data + suffix)
+        self._bytes += size
+        self._docs += 1
+
+        sample_id = self.count if sample_id is None else sample_id
+        self._index.write(_RECORD.pack(sample_id, self.shard, offset, len(data)))
+        self.count += 1
+        return sample_id
+
+    def flush(self) -> None:
+        """
+        Flush the buffers of the current shard and the index.
+        """
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+        if not self._index.closed:
+            self._index.flush()
+
+    def close(self) -> None:
+        """
+        Close the current shard and the index, it can be called several times.
+        """
+        if self._file is not None:
+            self._file.close()
+        self._index.close()
+
+
+class _MappedShards:
+    """
+    Shards mapped into memory on their first read.
+    """
+
+    def __init__(self, save_dir: Path, filename: Path) -> None:
+        self.save_dir = save_dir
+        self.filename = filename
+        self._maps: Dict[int, mmap.mmap] = {}
+
+    def read(self, shard: int, offset: int, length: int) -> bytes:
+        mapped = self._maps.get(shard)
+
+        if mapped is None:
+            with open(shard_path(self.save_dir, self.filename, shard), "rb") as shard_file:
+                mapped = self._maps[shard] = mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return mapped[offset:offset + length]
+
+    def close(self) -> None:
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+
+def _load_records(save_dir: Path, filename: Path, fmt: Format, records: np.ndarray) -> List[Any]:
+    """
+    Load the documents of ``records``, it is a module level
+    function so it can be sent to worker processes.
+    """
+    shards = _MappedShards(save_dir, filename)
+    try:
+        return [fmt.loads(shards.read(int(r["shard"]), int(r["offset"]), int(r["length"]))) for r in records]
+    finally:
+        shards.close()
+
+
+class ShardReader:
+    """
+    Random access to the configurations written by a :py:class:`ShardWriter` or by
+    :py:class:`randfig.transforms.save.Save` with shards. The index and the shards
+    are mapped into memory, so loading a configuration only parses its own document.
+    If a sample id was written several times, the last document is loaded.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import tempfile
+        from randfig.shards import ShardReader, ShardWriter
+        save_dir = tempfile.mkdtemp()
+        # --- hide: stop ---
+
+        with ShardWriter(save_dir, "configs.yaml", max_docs=100) as writer:
+            for i in range(1000):
+                writer.write({"param_0": i})
+
+        with ShardReader(save_dir, "configs.yaml") as reader:
+            cfg = reader[512]
+            cfgs = list(reader.iter_range(10, 13))
+
+        # --- hide: start ---
+        print(f"cfg: {cfg}, cfgs: {cfgs}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self, save_dir: Union[str, Path], filename: Union[str, Path], fmt: Optional[Format] = None) -> None:
+        """
+        Args:
+            save_dir: directory of the shards.
+            filename: name of the set of shards, see :py:func:`shard_path`.
+            fmt: format of the documents, by default given by the extension of
+                ``filename`` as in :py:class:`ShardWriter`.
+
+        Raises:
+            ValueError: if the extension of ``filename`` is not supported.
+        """
+        self.save_dir = Path(save_dir)
+        self.filename = Path(filename)
+        self.format = fmt if fmt is not None else _default_format(filename)
+        self.index = read_index(index_path(self.save_dir, self.filename))
+
+        ids = np.asarray(self.index["sample_id"])
+
+        if len(ids) < 2 or bool(np.all(ids[1:] > ids[:-1])):
+            self.ids = ids
+            self._positions = None
+        else:
+            order = np.argsort(ids, kind="stable")
+            sorted_ids = ids[order]
+            last = np.r_[sorted_ids[1:] != sorted_ids[:-1], True]
+            self.ids = sorted_ids[last]
+            self._positions = order[last]
+
+        self._shards = _MappedShards(self.save_dir, self.filename)
+
+    def __enter__(self) -> "ShardReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return ShardReader, (self.save_dir, self.filename, self.format)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, sample_id: int) -> bool:
+        i = np.searchsorted(self.ids, sample_id)
+        return bool(i < len(self.ids) and self.ids[i] == sample_id)
+
+    def _records(self, lo: int, hi: int) -> np.ndarray:
+        """
+        Records of the sample ids from position ``lo`` to ``hi`` of :py:attr:`self.ids`.
+        """
+        if self._positions is None:
+            return self.index[lo:hi]
+        return self.index[self._positions[lo:hi]]
+
+    def __getitem__(self, sample_id: int) -> Any:
+        """
+        Args:
+            sample_id: id of the configuration.
+
+        Returns:
+            The configuration.
+
+        Raises:
+            KeyError: if ``sample_id`` is not in the index.
+        """
+        i = int(np.searchsorted(self.ids, sample_id))
+
+        if i >= len(self.ids) or self.ids[i] != sample_id:
+            raise KeyError(f"Sample {sample_id} not found in {index_path(self.save_dir, self.filename)}.")
+
+        r = self._records(i, i + 1)[0]
+        return self.format.loads(self._shards.read(int(r["shard"]), int(r["offset"]), int(r["length"])))
+
+    def iter_range(self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        workers: int = 1,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Iterate over the configurations whose sample id is in ``[start, stop)``, ordered
+        by sample id. Documents can be parsed by a pool of processes, which receive the
+        positions of the documents instead of the index.
+
+        Args:
+            start: smallest sample id, from the first one if ``None``.
+            stop: sample id after the biggest one, until the last one if ``None``.
+            workers: number of processes, documents are parsed in the
+                calling process if ``1``.
+            chunk_size: number of documents parsed by each task of the pool,
+                by default the documents are split in ``4 * workers`` chunks.
+
+        Yields:
+            The configurations.
+
+        Raises:
+            ValueError: if ``workers`` or ``chunk_size`` are smaller than 1.
+        """
+        if workers < 1 or (chunk_size is not None and chunk_size < 1):
+            raise ValueError(f"Expected at least 1 worker and a chunk_size of at least 1 but got {workers} and {chunk_size}.")
+
+        lo = 0 if start is None else int(np.searchsorted(self.ids, start))
+        hi = len(self.ids) if stop is None else int(np.searchsorted(self.ids, stop))
+
+        if workers == 1:
+            for r in self._records(lo, hi):
+                yield self.format.loads(self._shards.read(int(r["shard"]), int(r["offset"]), int(r["length"])))
+            return
+
+        chunk_size = chunk_size or max(1, math.ceil((hi - lo) / (4 * workers)))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # at most two tasks per worker are pending, so memory does not grow with the range
+            pending = deque()
+            for i in range(lo, hi, chunk_size):
+                records = self._records(i, min(i + chunk_size, hi))
+                pending.append(executor.submit(_load_records, self.save_dir, self.filename, self.format, records))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def close(self) -> None:
+        """
+        Unmap the shards, they are mapped again if a configuration is loaded.
+        """
+        self._shards.close()
@@ -0,0 +1,145 @@
+import math
+import numpy as np
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+from randfig.utils import factorize, _divisors_from_factors
+
+
+__all__ = ["DivisorIndex"]
+
+
+class DivisorIndex:
+    """
+    Smallest prime factor table of the integers up to a limit. Numbers up to the
+    limit are factorized in ``O(log n)`` steps, so their divisors are found without
+    trial division. The table can be saved and memory-mapped from disk: an index
+    loaded with ``mmap=True`` is pickled as its path, so the worker processes of
+    :py:meth:`randfig.transforms.compose.Compose.generate` map the same file
+    instead of receiving a copy of the table.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.sieve import DivisorIndex
+        from randfig.utils import search_divisor
+        # --- hide: stop ---
+
+        index = DivisorIndex(10 ** 6)
+        divisors = index.divisors(720720)
+        divisor = search_divisor(720720, "min", threshold=1000, index=index)
+
+        # --- hide: start ---
+        print(f"number of divisors: {len(divisors)}, divisor: {divisor}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self, limit: int, spf: Optional[np.ndarray] = None) -> None:
+        """
+        Args:
+            limit: biggest number of the index.
+            spf: a precomputed table, where ``spf[n]`` is the smallest prime factor
+                of ``n``. If ``None`` it is computed with a sieve.
+
+        Raises:
+            ValueError: if ``limit`` is smaller than 1 or ``spf`` has not ``limit + 1`` items.
+        """
+        if limit < 1:
+            raise ValueError(f"Expected a limit of at least 1 but got {limit}.")
+        if spf is not None and len(spf) != limit + 1:
+            raise ValueError(f"Expected a table with {limit + 1} items but got {len(spf)}.")
+
+        self.limit = int(limit)
+        self.spf = spf if spf is not None else self._sieve(self.limit)
+        self.path: Optional[Path] = None
+
+    @staticmethod
+    def _sieve(limit: int) -> np.ndarray:
+        """
+        Compute the smallest prime factor table up to ``limit``.
+        """
+        dtype = np.int32 if limit < 2 ** 31 else np.int64
+        spf = np.zeros(limit + 1, dtype=dtype)
+
+        for p in range(2, math.isqrt(limit) + 1):
+            if spf[p] == 0:
+                multiples = spf[p * p::p]
+                multiples[multiples == 0] = p
+
+        primes = spf == 0
+        spf[primes] = np.arange(limit + 1, dtype=dtype)[primes]
+        return spf
+
+    def factorize(self, n: int) -> List[int]:
+        """
+        Prime factorization of ``n``, numbers bigger than the limit
+        are factorized with :py:func:`randfig.utils.factorize`.
+
+        Args:
+            n: a positive ``int``.
+
+        Returns:
+            The prime factors of ``n`` in ascending order, with repetitions.
+        """
+        if n > self.limit:
+            return factorize(n)
+
+        spf = self.spf
+        factors = []
+
+        while n > 1:
+            p = int(spf[n])
+            factors.append(p)
+            n //= p
+
+        return factors
+
+    def divisors(self, n: int) -> List[int]:
+        """
+        Args:
+            n: a positive ``int``.
+
+        Returns:
+            The divisors of ``n`` in ascending order.
+        """
+        return _divisors_from_factors(self.factorize(n))
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Save the table as a ``.npy`` file.
+
+        Args:
+            path: path of the file, ``".npy"`` is appended if it has another extension.
+
+        Returns:
+            The path of the saved file.
+        """
+        path = Path(path)
+        if path.suffix != ".npy":
+            path = path.with_name(path.name + ".npy")
+
+        np.save(path, np.asarray(self.spf))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "DivisorIndex":
+        """
+        Load a table saved with :py:meth:`save`.
+
+        Args:
+            path: path of the ``.npy`` file.
+            mmap: whether to map the file into memory instead of reading it, the
+                pages of the file are then shared by every process that maps it.
+
+        Returns:
+            The loaded index.
+        """
+        path = Path(path)
+        spf = np.load(path, mmap_mode="r" if mmap else None)
+        index = cls(len(spf) - 1, spf=spf)
+        index.path = path if mmap else None
+        return index
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        if self.path is not None:
+            return DivisorIndex.load, (self.path, True)
+        return DivisorIndex, (self.limit, self.spf)
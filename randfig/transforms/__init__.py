@@ -5,6 +5,8 @@ from .nest import *
 from .save import *
 from .insert import *
 from .remove import *
+from .bulk_edit import *
+from .sample import *
 from .unpack import *
 
 
@@ -16,5 +18,7 @@ __all__ = (
     + save.__all__
     + insert.__all__
     + remove.__all__
+    + bulk_edit.__all__
+    + sample.__all__
     + unpack.__all__
 )
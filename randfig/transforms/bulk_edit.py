@@ -0,0 +1,131 @@
+from typing import Any, Sequence, Mapping, List, Union, Tuple, Hashable
+from randfig.batch import ConfigBatch
+from randfig.transforms.config_transform import ConfigTransform
+from randfig.transforms.insert import Insert
+from randfig.transforms.remove import Remove
+
+
+__all__ = ["BulkEdit"]
+
+
+_SET, _POP, _DESCEND = range(3)
+
+
+def _build(edits: Sequence[Tuple[Tuple[Hashable, ...], int, Any]]) -> List[Tuple[int, Hashable, Any]]:
+    """
+    Build the steps of one level of the trie. Edits keep their order, consecutive
+    edits that go deeper into the same key are merged into a single descent into it.
+    """
+    steps = []
+    key, deeper = None, []
+
+    for path, op, value in edits:
+        if deeper and (len(path) == 1 or path[0] != key):
+            steps.append((_DESCEND, key, _build(deeper)))
+            deeper = []
+        if len(path) > 1:
+            key = path[0]
+            deeper.append((path[1:], op, value))
+        else:
+            steps.append((op, path[0], value))
+
+    if deeper:
+        steps.append((_DESCEND, key, _build(deeper)))
+
+    return steps
+
+
+def _apply(node: Any, steps: List[Tuple[int, Hashable, Any]]) -> None:
+    """
+    Apply the steps of one level of the trie to ``node``.
+    """
+    if not isinstance(node, Mapping):
+        raise TypeError(f"Got: {node} for one of the nested values, which is {type(node)}, expected a``Mapping``.")
+
+    for op, key, arg in steps:
+        if op == _SET:
+            node[key] = arg
+        elif op == _POP:
+            node.pop(key)
+        else:
+            _apply(node[key], arg)
+
+
+class BulkEdit(ConfigTransform):
+    """
+    Apply a sequence of :py:class:`randfig.transforms.insert.Insert` and
+    :py:class:`randfig.transforms.remove.Remove` transforms in a single descent
+    of the configuration. Their nested keys are merged into a trie when the
+    transform is built, so each nested mapping is reached once per run of
+    consecutive edits under it instead of once per edit. Edits are applied in order, so the result,
+    including the order of the keys, is the same as applying them sequentially.
+
+    :py:class:`randfig.transforms.nest.Nest` is not supported: it builds a new
+    top-level mapping with its keys reordered, so it can not be applied during
+    the descent.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig import BulkEdit, Insert, Remove
+        # --- hide: stop ---
+
+        init_config = {"param_root": {"param_0": 0, "param_1": 1}}
+        bulk_edit = BulkEdit([
+            Insert(keys=["param_root", "param_2"], value=2),
+            Remove(keys=["param_root", "param_0"]),
+            Insert(keys=["param_3"], value=3),
+        ])
+        edited = bulk_edit(init_config)
+
+        # --- hide: start ---
+        print(f"edited: {edited}")
+        # --- hide: stop ---
+    """
+
+    constant = True
+
+    def __init__(self, edits: Sequence[Union[Insert, Remove]]) -> None:
+        """
+        Args:
+            edits: the :py:class:`randfig.transforms.insert.Insert` and
+                :py:class:`randfig.transforms.remove.Remove` transforms to apply, in order.
+                Their keys and values are read when the transform is built.
+
+        Raises:
+            TypeError: if one of the edits is nor an ``Insert`` nor a ``Remove``.
+        """
+        for tfs in edits:
+            if not isinstance(tfs, (Insert, Remove)):
+                raise TypeError(f"Expected {Insert} or {Remove} transforms but got: {tfs}, which is type: {type(tfs)}.")
+
+        super().__init__([list(tfs.path) for tfs in edits])
+        self.edits = list(edits)
+        self._steps = _build([
+            (tfs.path.keys, _SET, tfs.value) if isinstance(tfs, Insert) else (tfs.path.keys, _POP, None)
+            for tfs in self.edits
+        ])
+
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return []
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return [tuple(keys) for keys in self.keys]
+
+    def __call__(self, cfg: Mapping) -> Mapping:
+        _apply(cfg, self._steps)
+        return cfg
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        A :py:class:`randfig.batch.ConfigBatch` is edited column-wise by the
+        ``batch_call`` of each edit, in order.
+        """
+        if not isinstance(cfgs, ConfigBatch):
+            return super().batch_call(cfgs)
+
+        for tfs in self.edits:
+            cfgs = tfs.batch_call(cfgs)
+        return cfgs
@@ -1,4 +1,10 @@
-from typing import Sequence, Mapping
+import copy
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence, Mapping, List, Union, Optional, Iterator, Callable, Tuple, Hashable
+from randfig.batch import ConfigBatch
+from randfig.cow import CowDict
+from randfig.rng import resolve_seed, sample_seed, sample_context, seeded_random, generation_context
 from randfig.transforms.config_transform import ConfigTransform
 
 
@@ -8,19 +14,504 @@ __all__ = ["Compose"]
 class Compose:
     """
     Apply configuration transforms sequentially.
+
+    When many configurations are generated from the same base configuration
+    (:py:meth:`sample`, :py:meth:`generate`, :py:meth:`generate_batch` and
+    :py:meth:`iter_configs`), the leading transforms whose ``constant``
+    attribute is ``True`` are applied once and every configuration starts
+    from a copy of the result, see :py:attr:`randfig.config_transform.ConfigTransform.constant`.
+    The copy is a deep copy, or a :py:class:`randfig.cow.CowDict` view if
+    the pipeline is built with ``copy_on_write=True``.
     """
 
-    def __init__(self, transforms: Sequence[ConfigTransform]) -> None:
+    def __init__(self,
+        transforms: Sequence[ConfigTransform],
+        positions: Optional[Sequence[int]] = None,
+        copy_on_write: bool = False
+    ) -> None:
         """
         Args:
             transforms: a sequence of configuration
                 tranforms that implement the
                 :py:class:`randfig.config_transform.ConfigTransform`
                 interface.
+            positions: position of each transform used to key its generators,
+                see :py:meth:`sample`. If ``None``, the position of each transform
+                in ``transforms``. Pipelines derived by :py:meth:`prune`, :py:meth:`schedule`
+                or :py:meth:`fuse` keep the positions of the original pipeline,
+                so they generate the same configurations.
+            copy_on_write: if ``True``, generated configurations start from a
+                :py:class:`randfig.cow.CowDict` of the base configuration instead
+                of a deep copy, so only the values written by the transforms are
+                copied. The generated configurations are then
+                :py:class:`randfig.cow.CowDict` objects too, unless the last
+                transform returns a new mapping.
+
+        Raises:
+            ValueError: if ``positions`` and ``transforms`` have different lengths.
         """
+        if positions is not None and len(positions) != len(transforms):
+            raise ValueError(f"Expected {len(transforms)} positions but got {len(positions)}.")
+
         self.transforms = transforms
+        self.positions = positions
+        self.copy_on_write = copy_on_write
 
     def __call__(self, cfg: Mapping) -> Mapping:
         for tfs in self.transforms:
             cfg = tfs(cfg)
         return cfg
+
+    @property
+    def constant(self) -> bool:
+        """
+        Whether every transform is constant.
+        """
+        return all(getattr(tfs, "constant", False) for tfs in self.transforms)
+
+    @property
+    def reads(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        """
+        Paths read by any of the transforms, ``None`` if
+        unknown, see :py:attr:`randfig.config_transform.ConfigTransform.reads`.
+        """
+        return _union(getattr(tfs, "reads", None) for tfs in self.transforms)
+
+    @property
+    def writes(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        """
+        Paths written by any of the transforms, ``None`` if
+        unknown, see :py:attr:`randfig.config_transform.ConfigTransform.writes`.
+        """
+        return _union(getattr(tfs, "writes", None) for tfs in self.transforms)
+
+    def _hoist(self, base_cfg: Mapping) -> Tuple[Mapping, int]:
+        """
+        Apply the leading constant transforms to a copy of ``base_cfg``.
+
+        Returns:
+            The transformed copy and the position of the first non constant transform.
+        """
+        first = 0
+        while first < len(self.transforms) and getattr(self.transforms[first], "constant", False):
+            first += 1
+
+        cfg = copy.deepcopy(base_cfg)
+        for tfs in self.transforms[:first]:
+            cfg = tfs(cfg)
+
+        return cfg, first
+
+    def _sample(self, snapshot: Mapping, first: int, index: int, seed: int) -> Mapping:
+        """
+        Apply the transforms from ``first`` on to a copy of ``snapshot``, see :py:meth:`sample`.
+        """
+        cfg = CowDict(snapshot) if self.copy_on_write else copy.deepcopy(snapshot)
+        positions = self.positions if self.positions is not None else range(len(self.transforms))
+
+        with seeded_random():
+            for i in range(first, len(self.transforms)):
+                with sample_context(seed, index, positions[i]):
+                    cfg = self.transforms[i](cfg)
+
+        return cfg
+
+    def compile(self) -> Callable[[Mapping], Mapping]:
+        """
+        Generate a single function equivalent to this pipeline,
+        see :py:func:`randfig.compiler.compile_pipeline`.
+
+        Returns:
+            A callable that accepts a configuration and returns the transformed configuration.
+        """
+        from randfig.compiler import compile_pipeline
+
+        return compile_pipeline(self.transforms)
+
+    def prune(self) -> "Compose":
+        """
+        Build a pipeline where the :py:class:`randfig.transforms.formula.Formula`
+        transforms whose output is never observed (see :py:meth:`randfig.dag.DependencyGraph.dead`)
+        are replaced by :py:class:`randfig.transforms.insert.Insert` transforms of ``None``,
+        so their keys still exist for a later :py:class:`randfig.transforms.remove.Remove`.
+        The configurations generated with a seed are the same as the
+        ones of this pipeline, unless a dead formula raises an exception.
+
+        .. exec_code::
+
+            # --- hide: start ---
+            from randfig import Compose, Formula, Remove
+            # --- hide: stop ---
+
+            compose = Compose([
+                Formula(keys=["param_1"], formula=lambda cfg: 2 * cfg["param_0"], reads=["param_0"]),
+                Remove(keys=["param_1"]),
+            ])
+            pruned = compose.prune()
+
+            # --- hide: start ---
+            print(f"transforms: {pruned.transforms}")
+            # --- hide: stop ---
+
+        Returns:
+            A :py:class:`Compose` without dead formulas.
+        """
+        from randfig.dag import DependencyGraph
+        from randfig.transforms.formula import Formula
+        from randfig.transforms.insert import Insert
+
+        dead = DependencyGraph(self.transforms).dead()
+        positions = self.positions if self.positions is not None else range(len(self.transforms))
+        transforms, pruned_positions = [], []
+
+        for i, tfs in enumerate(self.transforms):
+            if i in dead and isinstance(tfs, Formula):
+                transforms.extend(Insert(keys=[k], value=None) for k in tfs.keys)
+                pruned_positions.extend(positions[i] for _ in tfs.keys)
+            else:
+                transforms.append(tfs)
+                pruned_positions.append(positions[i])
+
+        return Compose(transforms, positions=pruned_positions, copy_on_write=self.copy_on_write)
+
+    def schedule(self) -> "Compose":
+        """
+        Build a pipeline with the transforms reordered so that constant
+        transforms run as early as their dependencies allow, which makes
+        the hoisted constant prefix longer, see :py:meth:`randfig.dag.DependencyGraph.order`.
+        Generators are keyed by the original positions, so :py:meth:`sample`
+        and :py:meth:`generate` give the same configurations.
+
+        Returns:
+            A :py:class:`Compose` with the reordered transforms.
+        """
+        from randfig.dag import DependencyGraph
+
+        return self._select(DependencyGraph(self.transforms).order())
+
+    def fuse(self) -> "Compose":
+        """
+        Build a pipeline where each run of adjacent :py:class:`randfig.transforms.insert.Insert`
+        and :py:class:`randfig.transforms.remove.Remove` transforms is replaced by a
+        :py:class:`randfig.transforms.bulk_edit.BulkEdit`, which applies them in a single
+        descent of the configuration. Subclasses of both transforms are not fused.
+
+        .. exec_code::
+
+            # --- hide: start ---
+            from randfig import Compose, Insert, Remove
+            # --- hide: stop ---
+
+            compose = Compose([
+                Insert(keys=["param_root", "param_1"], value=1),
+                Remove(keys=["param_root", "param_0"]),
+                Insert(keys=["param_2"], value=2),
+            ])
+            fused = compose.fuse()
+
+            # --- hide: start ---
+            print(f"transforms: {fused.transforms}")
+            print(fused({"param_root": {"param_0": 0}}))
+            # --- hide: stop ---
+
+        Returns:
+            A :py:class:`Compose` with the edits fused.
+        """
+        from randfig.transforms.bulk_edit import BulkEdit
+        from randfig.transforms.insert import Insert
+        from randfig.transforms.remove import Remove
+
+        positions = self.positions if self.positions is not None else range(len(self.transforms))
+        transforms, fused_positions = [], []
+        run: List[int] = []
+
+        for i, tfs in enumerate(list(self.transforms) + [None]):
+            if type(tfs) in (Insert, Remove):
+                run.append(i)
+                continue
+
+            if len(run) > 1:
+                transforms.append(BulkEdit([self.transforms[j] for j in run]))
+                fused_positions.append(positions[run[0]])
+            elif run:
+                transforms.append(self.transforms[run[0]])
+                fused_positions.append(positions[run[0]])
+            run = []
+
+            if tfs is not None:
+                transforms.append(tfs)
+                fused_positions.append(positions[i])
+
+        return Compose(transforms, positions=fused_positions, copy_on_write=self.copy_on_write)
+
+    def _select(self, indices: Sequence[int]) -> "Compose":
+        """
+        Build a pipeline with the transforms at ``indices`` keeping their positions.
+        """
+        positions = self.positions if self.positions is not None else range(len(self.transforms))
+        return Compose(
+            [self.transforms[i] for i in indices],
+            positions=[positions[i] for i in indices],
+            copy_on_write=self.copy_on_write
+        )
+
+    def sample(self, base_cfg: Mapping, index: int, seed: int) -> Mapping:
+        """
+        Generate the configuration ``index`` of a run seeded with ``seed``.
+        Each transform is applied inside a :py:func:`randfig.rng.sample_context`,
+        whose generators are keyed by ``(seed, index, position)``, where ``position``
+        is the position of the transform. Hence, any configuration of a run
+        is rebuilt directly without generating the previous ones. The state
+        of the global ``random`` generator is restored afterwards.
+
+        .. exec_code::
+
+            # --- hide: start ---
+            from randfig import Compose, Formula
+            from randfig.decorators import accept_cfg
+            # --- hide: stop ---
+
+            compose = Compose([Formula(keys=["param_1"], formula=accept_cfg("uniform", 0, 1))])
+            cfg = compose.sample({"param_0": 0}, index=10 ** 7, seed=42)
+
+            # --- hide: start ---
+            print(f"cfg: {cfg}")
+            # --- hide: stop ---
+
+        Args:
+            base_cfg: configuration from which the sample starts, it is not modified.
+            index: index of the sample.
+            seed: root seed of the run.
+
+        Returns:
+            The generated configuration.
+        """
+        return self._sample(*self._hoist(base_cfg), index, seed)
+
+    def generate(self,
+        base_cfg: Mapping,
+        n: int,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        start: int = 0
+    ) -> List[Mapping]:
+        """
+        Generate the configurations ``start, ..., start + n - 1`` from ``base_cfg``,
+        see :py:meth:`sample`. Samples can be spread over a pool of processes, the
+        output does not depend on the number of workers. Since samples only depend
+        on ``seed`` and their index, a run can be split among machines through ``start``.
+        The transforms must be picklable when ``workers > 1``, for instance
+        ``functools.partial`` objects instead of lambdas.
+
+        .. exec_code::
+
+            # --- hide: start ---
+            import random
+            from randfig import Compose, Formula
+            # --- hide: stop ---
+
+            compose = Compose([Formula(keys=["param_1"], formula=lambda cfg: random.randint(0, 9))])
+            cfgs = compose.generate({"param_0": 0}, n=3, seed=42)
+
+            # --- hide: start ---
+            print(f"cfgs: {cfgs}")
+            # --- hide: stop ---
+
+        Args:
+            base_cfg: configuration from which every configuration starts, it is not modified.
+            n: number of configurations to generate.
+            workers: number of processes, configurations are generated
+                in the calling process if ``1``.
+            seed: root seed of the run, see :py:func:`randfig.rng.resolve_seed`.
+            start: index of the first configuration.
+
+        Returns:
+            A list with ``n`` generated configurations, ordered by index.
+
+        Raises:
+            ValueError: if ``n`` or ``start`` are negative or ``workers`` is smaller than 1.
+        """
+        if n < 0 or start < 0:
+            raise ValueError(f"Expected non negative number of configurations and start but got {n} and {start}.")
+        if workers < 1:
+            raise ValueError(f"Expected at least 1 worker but got {workers}.")
+
+        seed = resolve_seed(seed)
+        snapshot, first = self._hoist(base_cfg)
+        stop = start + n
+
+        if workers == 1:
+            return _generate_range(self, snapshot, first, seed, start, stop)
+
+        chunk_size = max(1, math.ceil(n / (4 * workers)))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_generate_range, self, snapshot, first, seed, i, min(i + chunk_size, stop))
+                for i in range(start, stop, chunk_size)
+            ]
+            return [cfg for future in futures for cfg in future.result()]
+
+    def iter_configs(self,
+        base_cfg: Mapping,
+        n: int,
+        chunk_size: Optional[int] = None,
+        seed: Optional[int] = None,
+        start: int = 0
+    ) -> Iterator[Union[Mapping, ConfigBatch]]:
+        """
+        Lazily generate the configurations ``start, ..., start + n - 1``,
+        only one configuration or chunk is kept in memory at a time, so
+        each one can be written by a sink before the next one is generated:
+
+        .. exec_code::
+
+            # --- hide: start ---
+            from randfig import Compose, Formula
+            from randfig.decorators import accept_cfg
+            # --- hide: stop ---
+
+            compose = Compose([Formula(keys=["param_1"], formula=accept_cfg("uniform", 0, 1))])
+
+            for cfg in compose.iter_configs({"param_0": 0}, n=2, seed=42):
+                print(cfg)
+
+            for batch in compose.iter_configs({"param_0": 0}, n=5, chunk_size=2, seed=42):
+                print(len(batch))
+
+        Args:
+            base_cfg: configuration from which every configuration starts, it is not modified.
+            n: number of configurations to generate.
+            chunk_size: if ``None`` configurations are generated one by one
+                with :py:meth:`sample`, otherwise they are generated in
+                :py:class:`randfig.batch.ConfigBatch` chunks of ``chunk_size``
+                configurations with :py:meth:`generate_batch`. Each chunk draws its
+                values at once from a generator seeded by the index of its first
+                configuration, ``randfig.rng.sample_seed(seed, i)``, so chunked
+                configurations depend on ``chunk_size`` and differ from the ones of
+                :py:meth:`sample` and :py:meth:`generate` for the same ``seed``. They
+                are reproducible for the same ``seed``, ``start`` and ``chunk_size``.
+            seed: root seed of the run, see :py:func:`randfig.rng.resolve_seed`.
+            start: index of the first configuration.
+
+        Yields:
+            A configuration or a :py:class:`randfig.batch.ConfigBatch` chunk.
+
+        Raises:
+            ValueError: if ``n`` or ``start`` are negative or ``chunk_size`` is smaller than 1.
+        """
+        if n < 0 or start < 0:
+            raise ValueError(f"Expected non negative number of configurations and start but got {n} and {start}.")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"Expected a chunk_size of at least 1 but got {chunk_size}.")
+
+        seed = resolve_seed(seed)
+        snapshot, first = self._hoist(base_cfg)
+        stop = start + n
+
+        if chunk_size is None:
+            for i in range(start, stop):
+                yield self._sample(snapshot, first, i, seed)
+            return
+
+        for i in range(start, stop, chunk_size):
+            yield self._generate_batch(snapshot, first, min(chunk_size, stop - i), sample_seed(seed, i))
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        Apply the transforms sequentially to a batch of configurations.
+        Each transform processes the whole batch before the next one
+        is applied, see :py:meth:`randfig.config_transform.ConfigTransform.batch_call`.
+        Transforms without a ``batch_call`` method are applied to each
+        configuration of the batch.
+
+        Args:
+            cfgs: a :py:class:`randfig.batch.ConfigBatch` or a
+                sequence of ``typing.Mapping``-like configurations.
+
+        Returns:
+            The transformed configurations.
+        """
+        return _batch_call(self.transforms, cfgs)
+
+    def generate_batch(self, base_cfg: Mapping, n: int, seed: Optional[int] = None) -> ConfigBatch:
+        """
+        Generate ``n`` configurations from ``base_cfg`` in a single
+        pass over the transforms, see :py:meth:`batch_call`. The
+        configurations are stored as columns, see :py:class:`randfig.batch.ConfigBatch`.
+        The transforms are applied inside a :py:func:`randfig.rng.generation_context`
+        so stochastic transforms can draw the values of the whole batch at once.
+
+        .. exec_code::
+
+            # --- hide: start ---
+            from randfig import Compose, Formula
+            # --- hide: stop ---
+
+            compose = Compose([Formula(keys=["param_1"], formula=lambda cfg: 2 * cfg["param_0"])])
+            cfgs = compose.generate_batch({"param_0": 1}, n=2).to_dicts()
+
+            # --- hide: start ---
+            print(f"cfgs: {cfgs}")
+            # --- hide: stop ---
+
+        Args:
+            base_cfg: configuration from which every configuration
+                of the batch starts, it is not modified.
+            n: number of configurations to generate.
+            seed: root seed of the batch, see :py:func:`randfig.rng.resolve_seed`.
+
+        Returns:
+            A :py:class:`randfig.batch.ConfigBatch` with ``n``
+            generated configurations.
+
+        Raises:
+            ValueError: if ``n`` is negative.
+        """
+        if n < 0:
+            raise ValueError(f"Expected a non negative number of configurations but got {n}.")
+
+        return self._generate_batch(*self._hoist(base_cfg), n, resolve_seed(seed))
+
+    def _generate_batch(self, snapshot: Mapping, first: int, n: int, seed: int) -> ConfigBatch:
+        """
+        Apply the transforms from ``first`` on to a batch of copies of ``snapshot``,
+        see :py:meth:`generate_batch`.
+        """
+        with seeded_random(seed), generation_context(seed):
+            return _batch_call(self.transforms[first:], ConfigBatch.from_config(snapshot, n))
+
+
+def _union(paths: Iterator[Optional[List[Tuple[Hashable, ...]]]]) -> Optional[List[Tuple[Hashable, ...]]]:
+    """
+    Concatenate the paths of several transforms without duplicates, ``None`` if any of them is ``None``.
+    """
+    union = []
+    for p in paths:
+        if p is None:
+            return None
+        union.extend(path for path in p if path not in union)
+    return union
+
+
+def _batch_call(
+    transforms: Sequence[ConfigTransform],
+    cfgs: Union[ConfigBatch, Sequence[Mapping]]
+) -> Union[ConfigBatch, List[Mapping]]:
+    """
+    Apply ``transforms`` sequentially to a batch, see :py:meth:`Compose.batch_call`.
+    """
+    if not isinstance(cfgs, ConfigBatch):
+        cfgs = list(cfgs)
+    for tfs in transforms:
+        batch_call = getattr(tfs, "batch_call", None)
+        cfgs = batch_call(cfgs) if batch_call is not None else [tfs(cfg) for cfg in cfgs]
+    return cfgs
+
+
+def _generate_range(compose: Compose, snapshot: Mapping, first: int, seed: int, start: int, stop: int) -> List[Mapping]:
+    """
+    Generate the samples from ``start`` to ``stop``, it is a module
+    level function so it can be sent to worker processes.
+    """
+    return [compose._sample(snapshot, first, i, seed) for i in range(start, stop)]
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Mapping, Any, Sequence
+from typing import Mapping, Any, Sequence, List, Union, Optional, Tuple, Hashable
+from randfig.batch import ConfigBatch
+from randfig.keypath import KeyPath
 
 
 __all__ = ["ConfigTransform"]
@@ -11,6 +13,23 @@ class ConfigTransform(ABC):
     act on ``typing.Mapping``-like configurations.
     """
 
+    constant = False
+    """
+    Whether the transform is deterministic and has no side effects, so
+    it always gives the same output for the same input configuration.
+    Leading constant transforms of a :py:class:`randfig.compose.Compose`
+    are applied once when generating several configurations.
+    """
+
+    nested_keys = False
+    """
+    Whether :py:attr:`keys` is a single path of nested keys, which is then also
+    stored as a :py:class:`randfig.keypath.KeyPath` in :py:attr:`path` (``None``
+    if :py:attr:`keys` is empty). A ``str`` is split on dots and stored as a
+    ``list``, so ``"param_root.param_0"`` is ``["param_root", "param_0"]`` and keys
+    with a literal ``.`` must be given in a sequence, like ``["param.0"]``.
+    """
+
     def __init__(self, keys: Sequence[str]) -> None:
         """
         Args:
@@ -33,9 +52,30 @@ class ConfigTransform(ABC):
         if value is not None:
             if not isinstance(value, Sequence):
                 raise TypeError(f"Expected keys to be a {Sequence} but got: {value}, which is type: {type(value)}.")
+        if self.nested_keys:
+            self.path = KeyPath(value) if value else None
+            value = list(self.path) if isinstance(value, str) else value
         self._keys = value
         return self._keys
 
+    @property
+    def reads(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        """
+        Paths of the values read by the transform, each path is a ``tuple``
+        of nested keys and ``()`` stands for the whole configuration.
+        ``None`` if unknown, the transform is then assumed to read every value.
+        See :py:class:`randfig.dag.DependencyGraph`.
+        """
+        return None
+
+    @property
+    def writes(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        """
+        Paths of the values set, modified or removed by the transform, see :py:attr:`reads`.
+        ``None`` if unknown, the transform is then assumed to write every value.
+        """
+        return None
+
     def _check_keys(self, cfg: Mapping[str, Any]) -> None:
         """
         Checks the existance of :py:attr:`self.keys` in
@@ -77,3 +117,29 @@ class ConfigTransform(ABC):
             cfg: a ``typing.Mapping``-like configuration.
         """
         pass
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        Transform a batch of configurations at once. Concrete
+        implementations may override this method with a faster
+        implementation, by default ``__call__`` is applied to
+        each configuration of the batch.
+
+        Args:
+            cfgs: a :py:class:`randfig.batch.ConfigBatch` or a
+                sequence of ``typing.Mapping``-like configurations.
+
+        Returns:
+            The transformed configurations, a :py:class:`randfig.batch.ConfigBatch`
+            if ``cfgs`` is a :py:class:`randfig.batch.ConfigBatch`.
+        """
+        if not isinstance(cfgs, ConfigBatch):
+            return [self(cfg) for cfg in cfgs]
+
+        rows = list(cfgs)
+        out_rows = [self(row) for row in rows]
+
+        if all(out is row for out, row in zip(out_rows, rows)):
+            return cfgs
+
+        return ConfigBatch.from_dicts(out_rows)
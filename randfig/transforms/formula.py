@@ -1,10 +1,20 @@
-from typing import Callable, Mapping, Sequence, Any
+import copy
+import numpy as np
+from typing import Callable, Mapping, Sequence, Any, List, Optional, Union, Tuple, Hashable
+from randfig.batch import ConfigBatch, _as_path
+from randfig.cache import FormulaCache
+from randfig.expressions import infer_keys, is_deterministic
+from randfig.expressions.vectorized import get_vectorized
 from randfig.transforms.config_transform import ConfigTransform
+from randfig.utils import get_nested_value
 
 
 __all__ = ["Formula"]
 
 
+_MISSING = object()
+
+
 class Formula(ConfigTransform):
     """
     Compute a configuration value from a ``Callable[[Mapping], Any]``.
@@ -25,16 +35,77 @@ class Formula(ConfigTransform):
         # --- hide: stop ---
     """
 
-    def __init__(self, keys: Sequence[str], formula: Callable[[Mapping], Any]) -> None:
+    def __init__(self,
+        keys: Sequence[str],
+        formula: Callable[[Mapping], Any],
+        batch_formula: Optional[Callable[[ConfigBatch], np.ndarray]] = None,
+        constant: bool = False,
+        reads: Optional[Sequence[Union[Hashable, Sequence[Hashable]]]] = None,
+        cache: Union[bool, FormulaCache, None] = None
+    ) -> None:
         """
         Args:
             formula: a callable for computing ``keys``, the signature must be the
                 one specified in the type hints, that is ``typing.Callable[[Mapping], Any]``.
                 In order to follow that signature, ``functools.partial`` might help
                 in most cases.
+            batch_formula: a callable that computes ``keys`` for every row of a
+                :py:class:`randfig.batch.ConfigBatch` at once. If ``None`` and ``formula``
+                is a ``functools.partial`` of a function of :py:mod:`randfig.expressions`,
+                its counterpart of :py:mod:`randfig.expressions.vectorized` is used.
+            constant: whether ``formula`` is deterministic, see
+                :py:attr:`randfig.config_transform.ConfigTransform.constant`.
+            reads: keys or sequences of nested keys read by ``formula``. If ``None``
+                and ``formula`` is a ``functools.partial`` of a function of
+                :py:mod:`randfig.expressions`, they are inferred from its arguments,
+                see :py:func:`randfig.expressions.infer_keys`. If they are neither given
+                nor inferred, the values written by ``formula`` besides ``keys`` are
+                unknown too, so :py:attr:`writes` is ``None``.
+            cache: a :py:class:`randfig.cache.FormulaCache` to reuse the values computed for
+                the same values of ``reads``, or ``True`` for a default one. Only formulas
+                that are ``constant`` or known to be deterministic (see
+                :py:func:`randfig.expressions.is_deterministic`) can be cached.
+                Values of ``reads`` that are not hashable are never cached.
+
+        Raises:
+            ValueError: if ``cache`` is set but ``reads`` is unknown or ``formula`` may be stochastic.
         """
         super().__init__(keys)
         self.formula = formula
+        self.batch_formula = batch_formula if batch_formula is not None else get_vectorized(formula)
+        self.constant = constant
+        inferred = infer_keys(formula)
+        if inferred is not None:
+            self._mutates = [_as_path(k) for k in inferred[1]]
+        else:
+            # side effects of formulas that can not be analysed are unknown unless reads are declared
+            self._mutates = [] if reads is not None else None
+
+        if reads is not None:
+            self._reads = [_as_path(k) for k in reads]
+        elif inferred is not None:
+            self._reads = [_as_path(k) for k in inferred[0]]
+        else:
+            self._reads = None
+
+        if isinstance(cache, bool):
+            cache = FormulaCache() if cache else None
+        if cache is not None:
+            if self._reads is None:
+                raise ValueError(f"Can not cache formula {formula} without knowing the keys it reads, pass ``reads``.")
+            if not (constant or is_deterministic(formula)):
+                raise ValueError(f"Can not cache formula {formula} since it may be stochastic, pass ``constant=True`` if it is not.")
+        self.cache = cache
+
+    @property
+    def reads(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        return self._reads
+
+    @property
+    def writes(self) -> Optional[List[Tuple[Hashable, ...]]]:
+        if self._mutates is None:
+            return None
+        return [(k,) for k in self.keys] + self._mutates
 
     def __call__(self, cfg: Mapping) -> Mapping:
         """
@@ -43,5 +114,36 @@ class Formula(ConfigTransform):
         """
         self._check_mapping(cfg)
         for key in self.keys:
-            cfg[key] = self.formula(cfg)
+            cfg[key] = self.formula(cfg) if self.cache is None else self._cached(cfg)
         return cfg
+
+    def _cached(self, cfg: Mapping) -> Any:
+        """
+        Get the value of ``formula`` from :py:attr:`self.cache` or compute and cache it.
+        """
+        try:
+            values = (cfg[p[0]] if len(p) == 1 else get_nested_value(cfg, p) for p in self._reads)
+            # 1, 1.0 and True are equal keys, but the formula may return values of different types
+            key = tuple((type(v), v) for v in values)
+            value = self.cache.get(key, _MISSING)
+        except TypeError:
+            return self.formula(cfg)
+
+        if value is _MISSING:
+            value = self.formula(cfg)
+            self.cache.put(key, copy.deepcopy(value))
+            return value
+
+        return copy.deepcopy(value)
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        Compute the new keys for every row of a :py:class:`randfig.batch.ConfigBatch`
+        with :py:attr:`self.batch_formula` if available.
+        """
+        if not isinstance(cfgs, ConfigBatch) or self.batch_formula is None:
+            return super().batch_call(cfgs)
+
+        for key in self.keys:
+            cfgs.set_column(key, self.batch_formula(cfgs))
+        return cfgs
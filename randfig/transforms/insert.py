@@ -1,6 +1,6 @@
-from typing import Sequence, Mapping, Any
+from typing import Sequence, Mapping, Any, List, Union, Tuple, Hashable
+from randfig.batch import ConfigBatch
 from randfig.transforms.config_transform import ConfigTransform
-from randfig.utils import insert_nested_key
 
 
 __all__ = ["Insert"]
@@ -9,8 +9,9 @@ __all__ = ["Insert"]
 class Insert(ConfigTransform):
     """
     Insert key, value pairs in the input configuration.
-    This class relies in :py:func:`randfig.utils.insert_nested_key`,
-    see its documentation for detailed info.
+    The nested keys are stored as a :py:class:`randfig.keypath.KeyPath`
+    in :py:attr:`self.path`, see :py:func:`randfig.utils.insert_nested_key`
+    for detailed info.
 
     .. exec_code::
 
@@ -27,16 +28,40 @@ class Insert(ConfigTransform):
         # --- hide: stop ---
     """
 
+    constant = True
+
+    nested_keys = True
+
     def __init__(self, keys: Sequence[str], value: Any) -> None:
         """
         Args:
-            keys: sequence of nested keys.
+            keys: sequence of nested keys or a string of nested keys separated by dots,
+                keys with a literal ``.`` must be given in a sequence, see
+                :py:attr:`randfig.transforms.config_transform.ConfigTransform.nested_keys`.
             value: value that will be inserted.
         """
         super().__init__(keys)
         self.value = value
 
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return []
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return [tuple(self.keys)]
+
     def __call__(self, cfg: Mapping) -> Mapping:
-        insert_nested_key(cfg, self.keys, self.value)
+        self.path.set(cfg, self.value)
         return cfg
 
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        If the parents of the nested keys are mappings in every row
+        of a :py:class:`randfig.batch.ConfigBatch`, the value is
+        inserted as whole columns. Mutable values are copied for each row.
+        """
+        if isinstance(cfgs, ConfigBatch) and cfgs.is_mapping(self.path.parent):
+            cfgs.fill(self.keys, self.value)
+            return cfgs
+        return super().batch_call(cfgs)
@@ -1,4 +1,5 @@
-from typing import Mapping, Sequence
+from typing import Mapping, Sequence, List, Union, Tuple, Hashable
+from randfig.batch import ConfigBatch
 from randfig.transforms.config_transform import ConfigTransform
 
 
@@ -25,6 +26,8 @@ class Nest(ConfigTransform):
         # --- hide: stop ---
     """
 
+    constant = True
+
     def __init__(self, keys: Sequence[str], root: str) -> None:
         """
         Args:
@@ -35,6 +38,14 @@ class Nest(ConfigTransform):
         super().__init__(keys)
         self.root = root
 
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return [(k,) for k in self.keys]
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return [(k,) for k in self.keys] + [(self.root,)]
+
     def __call__(self, cfg: Mapping) -> Mapping:
         """
         Raises:
@@ -52,3 +63,22 @@ class Nest(ConfigTransform):
             raise ValueError(f"``root``: {self.root} already exists in ``cfg`` as a key.")
 
         return cfg
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        If :py:attr:`self.keys` exist in every row of a :py:class:`randfig.batch.ConfigBatch`
+        and :py:attr:`self.root` does not exist in any of them, the columns
+        are moved under :py:attr:`self.root`.
+        """
+        if not isinstance(cfgs, ConfigBatch):
+            return super().batch_call(cfgs)
+
+        batch_keys = cfgs.keys()
+
+        if self.root in batch_keys or not all(cfgs.contains([k]) for k in self.keys):
+            return super().batch_call(cfgs)
+
+        for k in [k for k in batch_keys if k in self.keys]:
+            cfgs.move([k], [self.root, k])
+
+        return cfgs
@@ -1,6 +1,6 @@
-from typing import Sequence, Mapping
+from typing import Sequence, Mapping, List, Union, Tuple, Hashable
+from randfig.batch import ConfigBatch
 from randfig.transforms.config_transform import ConfigTransform
-from randfig.utils import remove_nested_key
 
 
 __all__ = ["Remove"]
@@ -9,9 +9,9 @@ __all__ = ["Remove"]
 class Remove(ConfigTransform):
     """
     If they exist, remove key, value pairs specified by
-    :py:attr:`self.keys`. This class relies on
-    :py:func:`randfig.remove_nested_key`, see its
-    documentation for detailed info.
+    :py:attr:`self.keys`. The nested keys are stored as a
+    :py:class:`randfig.keypath.KeyPath` in :py:attr:`self.path`,
+    see :py:func:`randfig.utils.remove_nested_key` for detailed info.
 
     .. exec_code::
 
@@ -28,10 +28,37 @@ class Remove(ConfigTransform):
         # --- hide: stop ---
     """
 
+    constant = True
+
+    nested_keys = True
+
     def __init__(self, keys: Sequence[str]) -> None:
+        """
+        Args:
+            keys: sequence of nested keys or a string of nested keys separated by dots,
+                keys with a literal ``.`` must be given in a sequence, see
+                :py:attr:`randfig.transforms.config_transform.ConfigTransform.nested_keys`.
+        """
         super().__init__(keys)
 
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return []
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return [tuple(self.keys)]
+
     def __call__(self, cfg: Mapping) -> Mapping:
-        remove_nested_key(cfg, self.keys)
+        self.path.delete(cfg)
         return cfg
 
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        If the nested keys exist in every row of a
+        :py:class:`randfig.batch.ConfigBatch`, their columns are dropped.
+        """
+        if isinstance(cfgs, ConfigBatch) and cfgs.is_mapping(self.path.parent) and cfgs.contains(self.keys):
+            cfgs.drop(self.keys)
+            return cfgs
+        return super().batch_call(cfgs)
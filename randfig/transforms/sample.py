@@ -0,0 +1,129 @@
+import numpy as np
+from typing import Sequence, Mapping, List, Union, Optional, Tuple, Hashable, TYPE_CHECKING
+from randfig.batch import ConfigBatch
+from randfig.rng import current_rng
+from randfig.transforms.config_transform import ConfigTransform
+from randfig.utils import get_divisors
+
+if TYPE_CHECKING:
+    from randfig.sieve import DivisorIndex
+
+
+__all__ = ["SampleDivisorPair"]
+
+
+class SampleDivisorPair(ConfigTransform):
+    """
+    Sample a number and one of its divisors at once, instead of sampling a number
+    and searching a divisor afterwards with :py:func:`randfig.utils.search_divisor`.
+    Every valid ``(n, divisor)`` pair within the given ranges is tabulated once
+    with :py:func:`randfig.utils.get_divisors`, then each sample is a single draw of
+    the generator of the current :py:func:`randfig.rng.generation_context`.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig import SampleDivisorPair
+        from randfig.rng import generation_context
+        # --- hide: stop ---
+
+        sample = SampleDivisorPair(keys=["n_events", "batch_size"], n_range=(1000, 1100), divisor_range=(16, 64))
+
+        with generation_context(42):
+            cfg = sample({})
+
+        # --- hide: start ---
+        print(f"cfg: {cfg}, number of pairs: {len(sample.n)}")
+        # --- hide: stop ---
+    """
+
+    def __init__(self,
+        keys: Sequence[str],
+        n_range: Tuple[int, int],
+        divisor_range: Optional[Tuple[int, int]] = None,
+        per_n: bool = False,
+        index: Optional["DivisorIndex"] = None
+    ) -> None:
+        """
+        Args:
+            keys: the key of the number and the key of the divisor.
+            n_range: smallest and biggest number, both included.
+            divisor_range: smallest and biggest divisor, both included.
+                If ``None`` any divisor is valid.
+            per_n: if ``False`` every valid pair is equally likely. If ``True``, every number
+                with at least one valid divisor is equally likely and then every valid
+                divisor of the number is equally likely.
+            index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`randfig.utils.get_divisors`.
+
+        Raises:
+            ValueError: if ``keys`` has not two keys.
+            ValueError: if a range is empty or the smallest number is smaller than 1.
+            ValueError: if there is no valid pair.
+        """
+        super().__init__(keys)
+
+        if len(keys) != 2:
+            raise ValueError(f"Expected the key of the number and the key of the divisor but got: {keys}.")
+
+        n_min, n_max = n_range
+        d_min, d_max = divisor_range if divisor_range is not None else (1, n_max)
+
+        if n_min < 1 or n_min > n_max:
+            raise ValueError(f"Expected a range of positive numbers but got {n_range}.")
+        if d_min > d_max:
+            raise ValueError(f"Expected a non empty range of divisors but got {divisor_range}.")
+
+        n, divisors = [], []
+        for m in range(n_min, n_max + 1):
+            valid = [d for d in get_divisors(m, index) if d_min <= d <= d_max]
+            n += [m] * len(valid)
+            divisors += valid
+
+        if not n:
+            raise ValueError(f"There is no number in {n_range} with a divisor in {divisor_range}.")
+
+        self.n = np.array(n, dtype=np.int64)
+        self.divisors = np.array(divisors, dtype=np.int64)
+        self.per_n = per_n
+        # first pair and number of pairs of each number
+        self._starts = np.flatnonzero(np.r_[True, self.n[1:] != self.n[:-1]])
+        self._counts = np.diff(np.r_[self._starts, len(self.n)])
+
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return []
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return [(k,) for k in self.keys]
+
+    def _draw(self, size: Optional[int] = None) -> Union[int, np.ndarray]:
+        """
+        Draw the positions of ``size`` pairs in the table.
+        """
+        rng = current_rng()
+
+        if not self.per_n:
+            return rng.integers(len(self.n), size=size)
+
+        numbers = rng.integers(len(self._starts), size=size)
+        return self._starts[numbers] + rng.integers(self._counts[numbers])
+
+    def __call__(self, cfg: Mapping) -> Mapping:
+        self._check_mapping(cfg)
+        i = self._draw()
+        cfg[self.keys[0]] = int(self.n[i])
+        cfg[self.keys[1]] = int(self.divisors[i])
+        return cfg
+
+    def batch_call(self, cfgs: Union[ConfigBatch, Sequence[Mapping]]) -> Union[ConfigBatch, List[Mapping]]:
+        """
+        Draw the pairs of every row of a :py:class:`randfig.batch.ConfigBatch` at once.
+        """
+        if not isinstance(cfgs, ConfigBatch):
+            return super().batch_call(cfgs)
+
+        i = self._draw(len(cfgs))
+        cfgs.set_column(self.keys[0], self.n[i])
+        cfgs.set_column(self.keys[1], self.divisors[i])
+        return cfgs
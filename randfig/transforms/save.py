@@ -1,46 +1,197 @@
-import ruamel.yaml as yaml
+import copy
+import os
+import queue
+import threading
+import weakref
 from pathlib import Path
-from typing import Sequence, Mapping, List, Union, Optional
+from typing import Any, Sequence, Mapping, List, Union, Optional, Tuple, Hashable
+from randfig.formats import FORMATS, Format, YamlFormat, get_format
+from randfig.rng import current_index
+from randfig.shards import ShardWriter
 from randfig.transforms.config_transform import ConfigTransform
-from randfig.utils import get_nested_value
+from randfig.utils import mapping_to_dict
 
 
 __all__ = ["Save"]
 
 
+def _stop_writer(writer_queue: queue.Queue, thread: threading.Thread) -> None:
+    """
+    Write the pending configurations and stop the writer thread.
+    """
+    writer_queue.put(None)
+    thread.join()
+
+
+def _write(target: Union[Path, ShardWriter], value: dict, sample_id: Optional[int], fmt: Format) -> None:
+    """
+    Write a configuration to a file or append it to shards.
+    """
+    if isinstance(target, ShardWriter):
+        target.write(value, sample_id)
+        return
+
+    with open(target, 'wb') as nested_cfg_file:
+        nested_cfg_file.write(fmt.dumps(value))
+
+
+def _run_writer(writer_queue: queue.Queue, errors: List[BaseException]) -> None:
+    """
+    Loop of the writer thread, writes are skipped after an error until it is raised.
+    It only holds the queue and the errors, so the transform can be garbage collected
+    while the thread runs, which stops the thread.
+    """
+    while True:
+        item = writer_queue.get()
+        try:
+            if item is None:
+                return
+            if not errors:
+                _write(*item)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            writer_queue.task_done()
+
+
 class Save(ConfigTransform):
     """
     Saves the value of a sequence of nested keys
     as a YAML file, such value must be a ``typing.Mapping``.
+    Other formats of :py:data:`randfig.formats.FORMATS`, like JSON,
+    ``pickle`` or MessagePack, are chosen by the extension of the
+    file or by the ``fmt`` argument, see :py:mod:`randfig.formats`.
+
+    The YAML emitter is built once and reused by every call, see
+    :py:class:`randfig.formats.YamlFormat`, and with ``template=True`` configurations
+    with the structure of the first one are rendered from a layout compiled once, see
+    :py:class:`randfig.formats.YamlTemplate`. Files can be written by a background
+    thread, so that serialization and disk writes overlap with the generation of
+    the next configurations. Then, :py:meth:`flush` waits for the pending files
+    and :py:meth:`close` stops the thread, both raise the first error of the
+    thread if any. The thread is also stopped at exit of the process that built
+    the transform. Other processes, like the workers of
+    :py:meth:`randfig.transforms.compose.Compose.generate`, may exit without
+    stopping it, so they always write files in the calling thread.
+
+    Instead of overwriting a single file, configurations can be appended to rolling
+    shards with a sidecar index, see :py:class:`randfig.shards.ShardWriter`. Each
+    configuration is indexed by its sample index when it is saved inside
+    :py:meth:`randfig.transforms.compose.Compose.sample`, see :py:func:`randfig.rng.current_index`.
+    Shards must be written by the process that built the transform, other
+    processes raise a ``RuntimeError``.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        import tempfile
+        from randfig import Save
+        save_dir = tempfile.mkdtemp()
+        # --- hide: stop ---
+
+        with Save(save_dir=save_dir, filename="config.yaml", c_dumper=True, queue_size=8) as save:
+            save({"param_root": {"param_0": 0, "param_1": [1, 2]}})
+
+        # --- hide: start ---
+        print(save.save_path.read_text())
+        # --- hide: stop ---
+
+        with Save(save_dir=save_dir, filename="configs.jsonl", shard_size=1000) as save:
+            for i in range(3):
+                save({"param_0": i})
+
+        # --- hide: start ---
+        print(save.save_dir.joinpath("configs-00000.jsonl").read_text())
+        # --- hide: stop ---
     """
 
+    nested_keys = True
+
     def __init__(self,
         save_dir: Union[str, Path],
         filename: str,
         keys: Optional[Sequence[str]] = None,
         sequence: int = 2,
-        offset: int = 4
+        offset: int = 4,
+        c_dumper: bool = False,
+        queue_size: int = 0,
+        shard_size: Optional[int] = None,
+        shard_bytes: Optional[int] = None,
+        fmt: Union[str, Format, None] = None,
+        template: bool = False
     ) -> None:
         """
         Args:
-            save_dir: path to dir where the configuration will be saved as YAML.
+            save_dir: path to dir where the configuration will be saved.
             filename: name of the file where the configuration will be saved. It
-                must have ``".yaml"`` extension.
+                must have the extension of ``fmt``, or if ``fmt`` is ``None`` the extension
+                of a format of :py:data:`randfig.formats.FORMATS`, like ``".yaml"``, ``".json"``,
+                ``".pkl"`` or ``".msgpack"``. When saving to shards, it must have ``".yaml"``
+                or ``".jsonl"`` extension and it is the name of the set of shards.
+            keys: sequence of nested keys or a string of nested keys separated by dots,
+                the value of the keys is saved. If ``None`` the whole configuration is saved.
+                Keys with a literal ``.`` must be given in a sequence, see
+                :py:attr:`randfig.transforms.config_transform.ConfigTransform.nested_keys`.
             sequence: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
             offset: ``ruamel.yaml`` parameter for ``YAML.indend`` method (avoid bad indents in lists).
+            c_dumper: if ``True``, values made only of ``dict``, ``list`` and builtin scalars
+                are dumped with the ``libyaml`` based dumper of ``PyYAML``, which is much faster
+                but ignores ``sequence`` and ``offset``. Other values are dumped with ``ruamel.yaml``.
+            queue_size: maximum number of configurations waiting to be written by
+                a background thread. If ``0``, files are written in the calling thread.
+            shard_size: maximum number of configurations of a shard. If this argument or
+                ``shard_bytes`` are not ``None``, configurations are appended to shards.
+            shard_bytes: maximum size in bytes of a shard.
+            fmt: a :py:class:`randfig.formats.Format` or the name of a format of
+                :py:data:`randfig.formats.FORMATS`. If ``None``, the format is given by
+                the extension of ``filename``. ``sequence``, ``offset`` and ``c_dumper``
+                only apply to the YAML format built by this transform.
+            template: if ``True``, YAML documents of configurations with the structure of the
+                first one saved are rendered with a layout built once, which is much faster
+                than dumping them, see :py:class:`randfig.formats.YamlTemplate`. Other
+                configurations are dumped as usual.
 
         Raises:
             ValueError: ``filename`` has a path structure,
                 that is it has parents: ``configs.yaml`` is valid, ``configs/config.yaml``
                 is not valid.
-            ValueError: if ``filename`` has an extension different from ``".yaml"``.
+            ValueError: if ``filename`` has an extension different from the expected ones,
+                for instance ``".yml"``.
+            ValueError: if ``fmt`` is not a format or is given when saving to shards.
+            ValueError: if ``queue_size`` is negative.
+            ValueError: if ``shard_size`` or ``shard_bytes`` are smaller than 1.
         """
+        if queue_size < 0:
+            raise ValueError(f"Expected a non negative queue_size but got {queue_size}.")
+        if (shard_size is not None and shard_size < 1) or (shard_bytes is not None and shard_bytes < 1):
+            raise ValueError(f"Expected shard_size and shard_bytes of at least 1 or None but got {shard_size} and {shard_bytes}.")
+
+        if fmt is not None:
+            if shard_size is not None or shard_bytes is not None:
+                raise ValueError("The format of the shards is given by the extension of filename.")
+            get_format(fmt)
+
+        self.shard_size = shard_size
+        self.shard_bytes = shard_bytes
+        self.fmt = fmt
         super().__init__(keys)
         self.save_dir = save_dir
         self.filename = filename
         self.save_path = self.save_dir.joinpath(self.filename)
         self.sequence = sequence
         self.offset = offset
+        self.c_dumper = c_dumper
+        self.template = template
+        self.queue_size = queue_size
+        self._cached_format = (None, None)
+        self._shard_writer = None
+        self._append = False
+        self._queue = None
+        self._finalizer = None
+        # errors of the writer thread, the first one is raised
+        self._errors: List[BaseException] = []
+        # the process that owns the writer thread and the shards
+        self._pid = os.getpid()
 
     @property
     def save_dir(self):
@@ -64,26 +215,147 @@ class Save(ConfigTransform):
             raise ValueError(f"It seems like provided filename is a path: {str(self._filename)}.")
 
         file_ext = self._filename.suffix
-        expected_ext = ".yaml"
 
-        if file_ext != expected_ext:
+        if self.sharded:
+            expected_ext = (".yaml", ".jsonl")
+        elif self.fmt is None:
+            expected_ext = tuple(cls.extension for cls in FORMATS.values())
+        else:
+            expected_ext = (get_format(self.fmt).extension,)
+
+        if file_ext not in expected_ext:
             raise ValueError(f"Provided filename has extension {file_ext}, but expected {expected_ext}.")
         return self._filename
 
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether configurations are appended to shards.
+        """
+        return self.shard_size is not None or self.shard_bytes is not None
+
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return [tuple(self.keys) if self.keys is not None else ()]
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        return []
+
     def __call__(self, cfg: Mapping) -> Mapping:
         """
         Returns:
             Input configuration without modifications.
+
+        Raises:
+            RuntimeError: if configurations are saved to shards in another
+                process than the one that built the transform.
         """
         self._check_mapping(cfg)
-        nested_val = get_nested_value(cfg, self.keys) if self.keys is not None else cfg
+        nested_val = self.path.get(cfg) if self.path is not None else cfg
         self._check_mapping(nested_val)
 
-        self.save_path.unlink(missing_ok=True)
+        nested_val = mapping_to_dict(nested_val)
 
-        with open(self.save_path, 'w') as nested_cfg_file:
-            yml = yaml.YAML()
-            yml.indent(sequence=self.sequence, offset=self.offset)
-            yml.dump(nested_val, nested_cfg_file)
+        target = self._shards() if self.sharded else self.save_path
+
+        if not self.queue_size or os.getpid() != self._pid:
+            _write(target, nested_val, current_index(), self._format())
+        else:
+            self._raise_error()
+            # the configuration may be modified by the next transforms before it is written
+            self._writer().put((target, copy.deepcopy(nested_val), current_index(), self._format()))
 
         return cfg
+
+    def __enter__(self) -> "Save":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(_cached_format=(None, None), _shard_writer=None, _queue=None, _finalizer=None, _errors=[])
+        return state
+
+    def _format(self) -> Format:
+        """
+        The format of the files, built again only if the format,
+        ``sequence``, ``offset``, ``c_dumper`` or ``template`` changed.
+        """
+        if isinstance(self.fmt, Format):
+            return self.fmt
+
+        name = self.fmt if self.fmt is not None else self._filename.suffix
+        key = (name, self.sequence, self.offset, self.c_dumper, self.template)
+        cached_key, fmt = self._cached_format
+
+        if cached_key != key:
+            is_yaml = name in ("yaml", YamlFormat.extension)
+            fmt = YamlFormat(self.sequence, self.offset, self.c_dumper, self.template) if is_yaml else get_format(name)
+            self._cached_format = (key, fmt)
+        return fmt
+
+    def _shards(self) -> ShardWriter:
+        """
+        The writer of the shards, which is opened on the first call. The shards
+        written before are overwritten, unless the writer was closed by :py:meth:`close`.
+        """
+        if self._shard_writer is None:
+            if os.getpid() != self._pid:
+                raise RuntimeError(f"Shards {self.filename} must be written by the process that built the transform, pass workers=1.")
+            fmt = self._format() if self._filename.suffix == ".yaml" else None
+            writer = ShardWriter(self.save_dir, self.filename, self.shard_size, self.shard_bytes, fmt, self._append)
+            # registered before the finalizer of the writer thread, so it is called after it at exit
+            weakref.finalize(self, writer.close)
+            self._shard_writer = writer
+            self._append = True
+        return self._shard_writer
+
+    def _writer(self) -> queue.Queue:
+        """
+        The queue of the background writer thread, which is started on the first call.
+        """
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(target=_run_writer, args=(self._queue, self._errors), daemon=True)
+            thread.start()
+            self._finalizer = weakref.finalize(self, _stop_writer, self._queue, thread)
+        return self._queue
+
+    def _raise_error(self) -> None:
+        if self._errors:
+            error = self._errors[0]
+            self._errors.clear()
+            raise error
+
+    def flush(self) -> None:
+        """
+        Wait until every pending configuration is written.
+
+        Raises:
+            Exception: the first error raised by the writer thread since the last check.
+        """
+        if self._queue is not None:
+            self._queue.join()
+        if self._shard_writer is not None:
+            self._shard_writer.flush()
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Write the pending configurations, stop the writer thread and close
+        the shards. A new thread is started and new shards are appended if
+        the transform is called again.
+
+        Raises:
+            Exception: the first error raised by the writer thread since the last check.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+            self._queue = self._finalizer = None
+        if self._shard_writer is not None:
+            self._shard_writer.close()
+            self._shard_writer = None
+        self._raise_error()
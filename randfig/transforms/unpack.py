@@ -1,4 +1,4 @@
-from typing import Sequence, Mapping, Any
+from typing import Sequence, Mapping, Any, List, Tuple, Hashable
 from randfig.transforms.config_transform import ConfigTransform
 from randfig.utils import unpack
 
@@ -27,6 +27,8 @@ class Unpack(ConfigTransform):
         # --- hide: stop ---
     """
 
+    constant = True
+
     def __init__(self, keys: Sequence[str], new_keys: Sequence[Sequence[Any]], remove: bool = False) -> None:
         """
         Args:
@@ -38,6 +40,15 @@ class Unpack(ConfigTransform):
         self.new_keys = new_keys
         self.remove = remove
 
+    @property
+    def reads(self) -> List[Tuple[Hashable, ...]]:
+        return [(k,) for k in self.keys]
+
+    @property
+    def writes(self) -> List[Tuple[Hashable, ...]]:
+        writes = [(k,) for nk in self.new_keys for k in nk]
+        return writes + [(k,) for k in self.keys] if self.remove else writes
+
     def __call__(self, cfg: Mapping) -> Mapping:
         self._check_mapping(cfg)
 
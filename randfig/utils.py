@@ -1,22 +1,30 @@
+import functools
+import itertools
 import math
-import operator
-import random
 import warnings
+import numpy as np
 from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from functools import reduce
 from numbers import Number
 from typing import (
     Mapping,
     Sequence,
     Any,
+    Callable,
     DefaultDict,
     Dict,
     List,
     Union,
     Optional,
-    Iterable
+    Iterable,
+    Tuple,
+    TYPE_CHECKING
 )
+from randfig.keypath import KeyPath
+from randfig.rng import current_rng
+
+if TYPE_CHECKING:
+    from randfig.sieve import DivisorIndex
 
 
 def get_nested_value(mapping: Mapping, map_list: Sequence[str]) -> Any:
@@ -43,39 +51,119 @@ def get_nested_value(mapping: Mapping, map_list: Sequence[str]) -> Any:
     Returns:
         The value of the last key specified by ``map_list``.
     """
-    return reduce(operator.getitem, map_list, mapping)
+    node = mapping
+    for k in map_list:
+        node = node[k]
+    return node
+
+
+def _convert_mappings(
+    mapping: Any,
+    is_converted: Callable[[Mapping], bool],
+    convert: Callable[[Iterable[Tuple[Any, Any]]], Mapping],
+    inplace: bool
+) -> Any:
+    """
+    Convert every ``typing.Mapping`` of a nested ``typing.Mapping`` with ``convert``,
+    walking it with a stack instead of recursion. Mappings for which ``is_converted``
+    is ``True`` are reused when none of their values changed, or updated in place
+    with the changed values if ``inplace`` is ``True``.
+    """
+    if not isinstance(mapping, Mapping):
+        return mapping
+
+    # frames: mapping, iterator of its items, changed values and key in the parent mapping
+    stack = [(mapping, iter(mapping.items()), {}, None)]
+    # ``isinstance`` checks against ``Mapping`` are slow, they are done once per type
+    is_mapping = {dict: True}
+
+    while stack:
+        node, items, changed, parent_key = stack[-1]
+
+        for k, v in items:
+            cls = type(v)
+            found = is_mapping.get(cls)
+            if found is None:
+                found = is_mapping[cls] = isinstance(v, Mapping)
+            if found:
+                stack.append((v, iter(v.items()), {}, k))
+                break
+        else:
+            stack.pop()
+
+            if is_converted(node) and (inplace or not changed):
+                node.update(changed)
+                out = node
+            else:
+                out = convert((k, changed.get(k, v)) for k, v in node.items())
+
+            if stack and out is not node:
+                stack[-1][2][parent_key] = out
+
+    return out
+
 
+def _is_defaultdict(mapping: Mapping) -> bool:
+    return type(mapping) is defaultdict and mapping.default_factory is defaultdict
 
-def mapping_to_defaultdict(mapping: Mapping[str, Any]) -> DefaultDict[str, Any]:
+
+def mapping_to_defaultdict(mapping: Mapping[str, Any], inplace: bool = False) -> DefaultDict[str, Any]:
     """
     Convert a nested ``typing.Mapping`` to
-    a nested ``typing.DefaultDict`` recursively.
+    a nested ``typing.DefaultDict``.
+
+    Subtrees that already are ``defaultdict(defaultdict, ...)`` are
+    returned as they are instead of being copied.
 
     Args:
         mapping: nested ``typing.Mapping``.
+        inplace: if ``True``, nested ``defaultdict`` objects with converted
+            values are updated instead of copied. Other mappings are
+            always copied.
 
     Returns:
         Nested ``typing.DefaultDict``.
     """
-    if isinstance(mapping, Mapping):
-        mapping = defaultdict(defaultdict, {k: mapping_to_defaultdict(v) for k, v in mapping.items()})
-    return mapping
+    return _convert_mappings(mapping, _is_defaultdict, lambda items: defaultdict(defaultdict, items), inplace)
+
+
+def _is_dict(mapping: Mapping) -> bool:
+    return type(mapping) is dict
 
 
-def mapping_to_dict(mapping: Mapping[str, Any]) -> Dict[str, Any]:
+def mapping_to_dict(mapping: Mapping[str, Any], inplace: bool = False) -> Dict[str, Any]:
     """
     Convert a nested ``typing.Mapping`` to
-    a nested ``typing.Dict`` recursively.
+    a nested ``typing.Dict``.
+
+    Subtrees that already are plain ``dict`` objects
+    are returned as they are instead of being copied.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from collections import OrderedDict
+        from randfig.utils import mapping_to_dict
+        # --- hide: stop ---
+
+        plain = {"param_0": 0}
+        mapping = OrderedDict(param_root=OrderedDict(param_1=1), param_plain=plain)
+        converted = mapping_to_dict(mapping)
+
+        # --- hide: start ---
+        print(f"converted: {converted}, plain is reused: {converted['param_plain'] is plain}")
+        # --- hide: stop ---
 
     Args:
         mapping: nested ``typing.Mapping``.
+        inplace: if ``True``, nested ``dict`` objects with converted
+            values are updated instead of copied. Other mappings are
+            always copied.
 
     Returns:
         Nested ``typing.Dict``.
     """
-    if isinstance(mapping, Mapping):
-        mapping = {k: mapping_to_dict(v) for k, v in mapping.items()}
-    return mapping
+    return _convert_mappings(mapping, _is_dict, dict, inplace)
 
 
 def insert_nested_key(cfg: Dict[str, Dict], keys: Sequence[str], value: Any) -> None:
@@ -104,16 +192,7 @@ def insert_nested_key(cfg: Dict[str, Dict], keys: Sequence[str], value: Any) ->
     Raises:
         TypeError: if one of the values of the nested keys is not a ``Mapping``.
     """
-    if isinstance(cfg, Mapping):
-        first_key = keys[0]
-        remaining_keys = keys[1:]
-
-        if not remaining_keys:
-            cfg[first_key] = value
-        else:
-            insert_nested_key(cfg[first_key], remaining_keys, value)
-    else:
-        raise TypeError(f"Got: {cfg} for one of the nested values, which is {type(cfg)}, expected a``Mapping``.")
+    KeyPath(keys).set(cfg, value)
 
 
 def remove_nested_key(cfg: Dict[str, Dict], keys: Sequence[str]) -> None:
@@ -140,31 +219,25 @@ def remove_nested_key(cfg: Dict[str, Dict], keys: Sequence[str]) -> None:
     Raises:
         TypeError: if one of the values of the nested keys is not a ``Mapping``.
     """
-    if isinstance(cfg, Mapping):
-        first_key = keys[0]
-        remaining_keys = keys[1:]
-
-        if not remaining_keys:
-            cfg.pop(first_key)
-        else:
-            remove_nested_key(cfg[first_key], remaining_keys)
-    else:
-        raise TypeError(f"Got: {cfg} for one of the nested values, which is {type(cfg)}, expected a``Mapping``.")
+    KeyPath(keys).delete(cfg)
 
 
-def add_uniform_jitter(value: Number, p: Number, reference: Number) -> Number:
+def add_uniform_jitter(value: Number, p: Number, reference: Number, rng: Optional[np.random.Generator] = None) -> Number:
     """
     Add jitter to ``value`` based on a fraction, ``p`` of ``reference``:
 
     .. code-block::
 
-        value = value + random.uniform(-p * reference, p * reference)
+        value = value + rng.uniform(-p * reference, p * reference)
 
     Args:
         value: jitted will be added to this argument.
         p: fraction of ``reference`` that will be added to ``value``.
         reference: the jitter added to ``value`` is sampled from an uniform
             distribution with range ``a = -p * reference``, ``b = p * reference``.
+        rng: generator used to sample the jitter. If ``None``, :py:func:`randfig.rng.current_rng`
+            is used, which draws from the global ``random`` generator outside a
+            :py:func:`randfig.rng.generation_context`.
 
     Returns:
         Jittered value.
@@ -177,42 +250,98 @@ def add_uniform_jitter(value: Number, p: Number, reference: Number) -> Number:
             raise TypeError(f"Expected {name} to be a number but got {type(num)}.")
 
     effective_reference = p * reference
-
-    return value + random.uniform(-effective_reference, effective_reference)
+    rng = rng if rng is not None else current_rng()
+    return value + rng.uniform(-effective_reference, effective_reference)
 
 
-def get_divisors(n: Number) -> List[int]:
+def factorize(n: int) -> List[int]:
     """
-    Get the divisors of a number.
+    Prime factorization of a positive integer by trial division up to its square root.
 
     Args:
-        n: taget number (internally casted to ``int``).
+        n: a positive ``int``.
 
     Returns:
-        The divisors of the input number.
+        The prime factors of ``n`` in ascending order, with repetitions.
+    """
+    factors = []
 
-    Raises:
-        ValueError: When ``n==0``.
+    while n % 2 == 0:
+        factors.append(2)
+        n //= 2
+
+    p = 3
+    while p * p <= n:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 2
+
+    if n > 1:
+        factors.append(n)
+
+    return factors
+
+
+def _divisors_from_factors(factors: Sequence[int]) -> List[int]:
     """
-    num = int(n)
+    Sorted divisors of the product of ``factors``, a sorted sequence of prime factors.
+    """
+    divisors = [1]
+    for p, group in itertools.groupby(factors):
+        powers = [p ** e for e in range(1, len(list(group)) + 1)]
+        divisors += [d * q for d in divisors for q in powers]
+
+    divisors.sort()
+    return divisors
 
+
+@functools.lru_cache(maxsize=1024)
+def _divisors(num: int) -> Tuple[int, ...]:
+    """
+    Sorted divisors of ``num`` built from its prime factors, shared by
+    :py:func:`get_divisors` and the functions that search divisors.
+    """
     if num == 0:
         raise ValueError("For convinience 0 is not a valid number.")
-    if num == 1:
-        return [num]
+    if num < 1:
+        # Kept from the previous trial division, negative numbers only get the trivial divisors.
+        return (1, num)
 
-    factors = [1]
+    return tuple(_divisors_from_factors(factorize(num)))
 
-    for t in range(2, math.ceil((num // 2) + 1)):
-        if num % t == 0:
-            factors.append(int(t))
 
-    factors.append(num)
+def _sorted_divisors(num: int, index: Optional["DivisorIndex"] = None) -> Sequence[int]:
+    """
+    Sorted divisors of ``num`` from ``index`` if ``num`` is
+    in its range, from the cache of :py:func:`_divisors` otherwise.
+    """
+    if index is not None and 0 < num <= index.limit:
+        return index.divisors(num)
+    return _divisors(num)
 
-    return factors
+
+def get_divisors(n: Number, index: Optional["DivisorIndex"] = None) -> List[int]:
+    """
+    Get the divisors of a number. They are built from the prime factors of the number
+    (see :py:func:`factorize`) and cached, so repeated calls with the same number,
+    including the ones of :py:func:`search_divisor`, are not computed again.
+
+    Args:
+        n: taget number (internally casted to ``int``).
+        index: a :py:class:`randfig.sieve.DivisorIndex` used to factorize ``n``
+            if it is in its range.
+
+    Returns:
+        The divisors of the input number in ascending order.
+
+    Raises:
+        ValueError: When ``n==0``.
+    """
+    return list(_sorted_divisors(int(n), index))
 
 
-def find_divisor(n: Number, divisors: Sequence[Number]) -> Union[int, None]:
+def find_divisor(n: Number, divisors: Sequence[Number], index: Optional["DivisorIndex"] = None) -> Union[int, None]:
     """
     Sequentially, tries to find each item of ``divisors`` in the
     divisors of ``n``. The first item of ``divisors`` that matches
@@ -222,6 +351,7 @@ def find_divisor(n: Number, divisors: Sequence[Number]) -> Union[int, None]:
     Args:
         n: number to find the divisor of (internally casted to ``int``)
         divisors: seuquence of divisors to find (internally casted to ``int``).
+        index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`get_divisors`.
 
     Returns:
         The first item of divisors that matches a divisor of ``n``.
@@ -241,14 +371,14 @@ def find_divisor(n: Number, divisors: Sequence[Number]) -> Union[int, None]:
     if not divisors_:
         raise ValueError("Empty list of divisors to find after excluding 0.")
 
-    real_divisors = get_divisors(n_)
+    real_divisors = _sorted_divisors(n_, index)
 
     for div in divisors_:
         if div in real_divisors:
             return div
 
 
-def find_immediately_lower_divisor(n: Number, threshold: Number) -> int:
+def find_immediately_lower_divisor(n: Number, threshold: Number, index: Optional["DivisorIndex"] = None) -> int:
     """
     Find the divisor of ``n``  immediately smaller than
     a given threshold.
@@ -258,6 +388,7 @@ def find_immediately_lower_divisor(n: Number, threshold: Number) -> int:
         threshold: the divisor returned is the biggest
             divisor of ``n`` smaller than this threshold
             (internally casted to ``int``).
+        index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`get_divisors`.
 
     Returns:
         The biggest divisor of ``n`` smaller than ``threshold``.
@@ -271,12 +402,12 @@ def find_immediately_lower_divisor(n: Number, threshold: Number) -> int:
     if threshold_ == 0:
         raise ValueError("There is no divisors equal or smaller than 0.")
 
-    divisors_ = get_divisors(n_)
+    divisors_ = _sorted_divisors(n_, index)
 
     return divisors_[bisect_left(divisors_, threshold_)-1]
 
 
-def find_immediately_upper_divisor(n: Number, threshold: Number) -> int:
+def find_immediately_upper_divisor(n: Number, threshold: Number, index: Optional["DivisorIndex"] = None) -> int:
     """
     Find the divisor of ``n``  immediately bigger than
     a given threshold.
@@ -286,6 +417,7 @@ def find_immediately_upper_divisor(n: Number, threshold: Number) -> int:
         threshold: the divisor returned is the smallest
             divisor of ``n`` bigger than this threshold
             (internally casted to ``int``).
+        index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`get_divisors`.
 
     Returns:
         The smallest divisor of ``n`` bigger than ``threshold``.
@@ -300,7 +432,7 @@ def find_immediately_upper_divisor(n: Number, threshold: Number) -> int:
         raise ValueError("There is no divisors equal or smaller than 0.")
 
     # this will raise ValueError if n_ is 0
-    divisors_ = get_divisors(n_)
+    divisors_ = _sorted_divisors(n_, index)
 
     if threshold_ >= n_:
         warnings.warn(f"Threshold {threshold_} is bigger than n {n_}, returning n.")
@@ -310,7 +442,13 @@ def find_immediately_upper_divisor(n: Number, threshold: Number) -> int:
     return divisors_[bisect_right(divisors_, threshold_)]
 
 
-def search_divisor(n: Number, not_found_strategy: str, threshold: Number, divisors: Optional[Sequence[Number]] = None) -> int:
+def search_divisor(
+    n: Number,
+    not_found_strategy: str,
+    threshold: Number,
+    divisors: Optional[Sequence[Number]] = None,
+    index: Optional["DivisorIndex"] = None
+) -> int:
     """
     Checks sequentially if the items of ``divisors``
     are actually divisors of ``n`` the first match
@@ -370,6 +508,7 @@ def search_divisor(n: Number, not_found_strategy: str, threshold: Number, diviso
             are matched sequentially against the divisors of
             ``n`` the first match is returned. If ``None``
             the selected strategy is directly applied.
+        index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`get_divisors`.
 
     Returns:
         A divisor of ``n``.
@@ -378,17 +517,253 @@ def search_divisor(n: Number, not_found_strategy: str, threshold: Number, diviso
         ValueError: if ``not_found_strategy`` is not ``"min"`` or ``"max"``.
     """
     if divisors is not None:
-        if div_ := find_divisor(n, divisors):
+        if div_ := find_divisor(n, divisors, index):
             return div_
 
     if not_found_strategy == "min":
-        return find_immediately_lower_divisor(n, threshold)
+        return find_immediately_lower_divisor(n, threshold, index)
     elif not_found_strategy == "max":
-        return find_immediately_upper_divisor(n, threshold)
+        return find_immediately_upper_divisor(n, threshold, index)
     else:
         raise ValueError(f"not_found_strategy={not_found_strategy} is not a valid strategy, available strategies are 'min' and 'max'")
 
 
+def search_divisor_array(
+    n: Union[Sequence[Number], np.ndarray],
+    not_found_strategy: str,
+    threshold: Union[Number, Sequence[Number], np.ndarray],
+    divisors: Optional[Sequence[Number]] = None,
+    index: Optional["DivisorIndex"] = None
+) -> np.ndarray:
+    """
+    Array version of :py:func:`search_divisor`, each item of the output is
+    ``search_divisor(n[i], not_found_strategy, threshold[i], divisors, index)``.
+    Preferred ``divisors`` are checked with one modulo operation over the whole
+    array for each of them. The strategy is only applied to the items without a
+    preferred divisor: the divisors of every distinct ``n`` are built at once from
+    their prime factors and all the thresholds are searched in them at once.
+
+    .. exec_code::
+
+        # --- hide: start ---
+        from randfig.utils import search_divisor_array
+        # --- hide: stop ---
+
+        divisors = search_divisor_array([45, 45, 64, 210], "min", threshold=[7, 20, 7, 100], divisors=[8, 15])
+
+        # --- hide: start ---
+        print(f"divisors: {divisors}")
+        # --- hide: stop ---
+
+    Args:
+        n: numbers to find the divisor of (internally casted to ``int``).
+        not_found_strategy: one of ``"min"``, ``"max"``, see :py:func:`search_divisor`.
+        threshold: a threshold for each number or a single threshold for every number
+            (internally casted to ``int``).
+        divisors: preferred divisors, see :py:func:`search_divisor`.
+        index: a :py:class:`randfig.sieve.DivisorIndex`, see :py:func:`get_divisors`.
+
+    Returns:
+        An ``int64`` array of divisors with the shape of ``n``.
+
+    Raises:
+        ValueError: if any item of ``n`` is 0.
+        ValueError: if ``divisors`` is empty after removing the zeros.
+        ValueError: if ``not_found_strategy`` is not ``"min"`` or ``"max"`` and
+            some item has none of ``divisors``.
+        ValueError: if the threshold of some item without any of ``divisors`` is 0.
+    """
+    n_ = np.asarray(n).astype(np.int64)
+    threshold_ = np.broadcast_to(np.asarray(threshold).astype(np.int64), n_.shape)
+
+    if (n_ == 0).any():
+        raise ValueError("For convinience 0 is not a valid number.")
+
+    out = np.zeros(n_.shape, dtype=np.int64)
+    found = np.zeros(n_.shape, dtype=bool)
+
+    if divisors is not None:
+        divisors_ = list(dict.fromkeys([int(m) for m in divisors]))
+
+        if 0 in divisors_:
+            warnings.warn("Excluding 0 from divisors")
+            divisors_ = [i for i in divisors_ if i != 0]
+        if not divisors_:
+            raise ValueError("Empty list of divisors to find after excluding 0.")
+
+        for div in divisors_:
+            # the divisors of negative numbers are 1 and the number itself, see get_divisors
+            is_divisor = (n_ % div == 0) if div > 0 else np.zeros(n_.shape, dtype=bool)
+            match = ~found & np.where(n_ > 0, is_divisor, (n_ == div) | (div == 1))
+            out[match] = div
+            found |= match
+
+    pending = ~found
+
+    if pending.any():
+        if not_found_strategy not in ("min", "max"):
+            raise ValueError(f"not_found_strategy={not_found_strategy} is not a valid strategy, available strategies are 'min' and 'max'")
+        if (threshold_[pending] == 0).any():
+            raise ValueError("There is no divisors equal or smaller than 0.")
+
+        out[pending] = _search_strategy_array(n_[pending], threshold_[pending], not_found_strategy, index)
+
+    return out
+
+
+def _search_strategy_array(n: np.ndarray, threshold: np.ndarray, not_found_strategy: str, index: Optional["DivisorIndex"]) -> np.ndarray:
+    """
+    Apply ``not_found_strategy`` to every item, see :py:func:`search_divisor_array`. The divisors of
+    every distinct positive ``n`` are stored in one table sorted by ``(n, divisor)``, so all the
+    thresholds are searched with a single ``numpy.searchsorted``.
+    """
+    lower = not_found_strategy == "min"
+    result = np.empty(len(n), dtype=np.int64)
+    negative = n < 0
+
+    if negative.any():
+        # the divisors of negative numbers are not sorted, keep the scalar semantics
+        fn = find_immediately_lower_divisor if lower else find_immediately_upper_divisor
+        result[negative] = [fn(num, t, index) for num, t in zip(n[negative].tolist(), threshold[negative].tolist())]
+
+    positive = ~negative
+    uniques, inverse = np.unique(n[positive], return_inverse=True)
+    inverse = inverse.reshape(-1)
+    threshold = threshold[positive]
+    out = np.empty(len(inverse), dtype=np.int64)
+
+    if not len(uniques):
+        return result
+
+    # table keys are owner * size + divisor, chunks of uniques keep them in int64
+    size = int(uniques[-1]) + 1
+    chunk = max(1, (2 ** 62) // size)
+
+    for first in range(0, len(uniques), chunk):
+        nums = uniques[first:first + chunk]
+        rows = np.flatnonzero((inverse >= first) & (inverse < first + len(nums)))
+        owners = inverse[rows] - first
+        ts = np.clip(threshold[rows], 0, size)
+
+        table_owner, table_div = _divisor_table(nums, index)
+        keys = np.sort(table_owner * size + table_div)
+        table_div = keys % size
+        queries = owners * size + ts
+
+        if lower:
+            positions = np.searchsorted(keys, queries, side="left") - 1
+            # no divisor below the threshold wraps around to n, as in find_immediately_lower_divisor
+            wraps = ts <= 1
+            out[rows] = np.where(wraps, nums[owners], table_div[np.maximum(positions, 0)])
+        else:
+            positions = np.searchsorted(keys, queries, side="right")
+            above = threshold[rows] >= nums[owners]
+            out[rows] = np.where(above, nums[owners], table_div[np.minimum(positions, len(keys) - 1)])
+
+            if above.any():
+                warnings.warn(f"{int(above.sum())} thresholds are bigger than n, returning n.")
+
+    result[positive] = out
+    return result
+
+
+def _primes(limit: int) -> np.ndarray:
+    """
+    Prime numbers up to ``limit`` with the sieve of Eratosthenes.
+    """
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for p in range(2, math.isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = False
+    return np.flatnonzero(sieve)
+
+
+def _factorize_array(nums: np.ndarray, index: Optional["DivisorIndex"] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Prime factorization of an array of positive numbers, factors of every number are
+    found at once with the smallest prime factors of ``index`` or by trial division.
+
+    Returns:
+        The position in ``nums``, the prime and the exponent of each prime factor.
+    """
+    rem = nums.astype(np.int64)
+    owners, primes, exponents = [], [], []
+
+    def divide(alive: np.ndarray, p: np.ndarray) -> None:
+        r = rem[alive]
+        e = np.zeros(len(alive), dtype=np.int64)
+        divisible = np.ones(len(alive), dtype=bool)
+        while divisible.any():
+            r = np.where(divisible, r // p, r)
+            e += divisible
+            divisible &= r % p == 0
+        rem[alive] = r
+        owners.append(alive)
+        primes.append(np.broadcast_to(p, alive.shape))
+        exponents.append(e)
+
+    alive = np.flatnonzero(rem > 1)
+
+    if index is not None and len(nums) and int(nums.max()) <= index.limit:
+        while len(alive):
+            divide(alive, np.asarray(index.spf[rem[alive]], dtype=np.int64))
+            alive = alive[rem[alive] > 1]
+    else:
+        for p in _primes(math.isqrt(int(nums.max())) if len(nums) else 1).tolist():
+            # what is left of numbers below p * p is 1 or a prime
+            alive = alive[rem[alive] >= p * p]
+            if not len(alive):
+                break
+            hits = alive[rem[alive] % p == 0]
+            if len(hits):
+                divide(hits, np.int64(p))
+
+        left = np.flatnonzero(rem > 1)
+        owners.append(left)
+        primes.append(rem[left])
+        exponents.append(np.ones(len(left), dtype=np.int64))
+
+    if not owners:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    return np.concatenate(owners), np.concatenate(primes).astype(np.int64), np.concatenate(exponents)
+
+
+def _divisor_table(nums: np.ndarray, index: Optional["DivisorIndex"] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divisors of an array of positive numbers, built from their prime factors at once.
+
+    Returns:
+        The position in ``nums`` and the value of each divisor, sorted by position.
+    """
+    owner, prime, exponent = _factorize_array(nums, index)
+    order = np.argsort(owner, kind="stable")
+    owner, prime, exponent = owner[order], prime[order], exponent[order]
+
+    # rank of each prime factor among the factors of the same number
+    first = np.r_[True, owner[1:] != owner[:-1]] if len(owner) else np.zeros(0, dtype=bool)
+    rank = np.arange(len(owner)) - np.maximum.accumulate(np.where(first, np.arange(len(owner)), 0))
+
+    table_owner = np.arange(len(nums))
+    table_div = np.ones(len(nums), dtype=np.int64)
+
+    for r in range(int(rank.max()) + 1 if len(rank) else 0):
+        selected = rank == r
+        owner_exp = np.zeros(len(nums), dtype=np.int64)
+        owner_exp[owner[selected]] = exponent[selected]
+        owner_prime = np.ones(len(nums), dtype=np.int64)
+        owner_prime[owner[selected]] = prime[selected]
+
+        # each divisor is multiplied by p ** k, k = 0, ..., e
+        reps = owner_exp[table_owner] + 1
+        k = np.arange(int(reps.sum())) - np.repeat(np.cumsum(reps) - reps, reps)
+        table_owner = np.repeat(table_owner, reps)
+        table_div = np.repeat(table_div, reps) * owner_prime[table_owner] ** k
+
+    return table_owner, table_div
+
+
 def unpack(cfg: Mapping[str, Any], key: str, new_keys: Sequence[str], remove: bool = False) -> Mapping:
     """
     Stub.
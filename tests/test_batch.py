@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+from collections.abc import Mapping
+from randfig.batch import ConfigBatch
+from randfig.transforms import Formula, Insert, Nest, Remove, Unpack
+
+
+@pytest.fixture
+def cfgs():
+    return [
+        {"param_root": {"param_0": 0, "param_1": [0]}, "param_2": "a", "param_4": [0, 1]},
+        {"param_root": {"param_0": 1, "param_1": [1]}, "param_2": 2.5, "param_4": [1, 2]},
+    ]
+
+
+def test_round_trip(cfgs):
+    batch = ConfigBatch.from_dicts(cfgs)
+    assert len(batch) == 2
+    assert batch.to_dicts() == cfgs
+
+
+@pytest.mark.parametrize("path,dtype", [
+    [["param_root", "param_0"], np.int64],
+    [["param_root", "param_1"], object],
+    ["param_2", object],
+])
+def test_column_dtype(cfgs, path, dtype):
+    batch = ConfigBatch.from_dicts(cfgs)
+    assert batch.column(path).dtype == dtype
+
+
+def test_row_is_mapping_view(cfgs):
+    batch = ConfigBatch.from_dicts(cfgs)
+    row = batch[1]
+
+    assert isinstance(row, Mapping)
+    assert row["param_root"]["param_0"] == 1
+    assert isinstance(row["param_root"]["param_0"], int)
+
+    row["param_root"]["param_0"] = 1.5
+    row["param_3"] = 3
+    del row["param_2"]
+
+    assert batch.to_dicts()[0] == cfgs[0]
+    assert batch.to_dicts()[1] == {"param_root": {"param_0": 1.5, "param_1": [1]}, "param_4": [1, 2], "param_3": 3}
+
+
+def test_row_key_error(cfgs):
+    batch = ConfigBatch.from_dicts(cfgs)
+
+    with pytest.raises(KeyError):
+        batch[0]["param_fake"]
+    with pytest.raises(KeyError):
+        del batch[0]["param_fake"]
+
+
+def test_from_config_copies_mutable_values():
+    batch = ConfigBatch.from_config({"param_0": [0], "param_1": 1}, 2)
+    batch[0]["param_0"].append(1)
+
+    assert batch.to_dicts() == [{"param_0": [0, 1], "param_1": 1}, {"param_0": [0], "param_1": 1}]
+
+
+def test_set_column_wrong_length(cfgs):
+    batch = ConfigBatch.from_dicts(cfgs)
+
+    with pytest.raises(ValueError):
+        batch.set_column("param_3", np.zeros(3))
+
+
+@pytest.mark.parametrize("transform", [
+    Insert(keys=["param_root", "param_3"], value={"param_30": [3]}),
+    Remove(keys=["param_root", "param_0"]),
+    Nest(keys=["param_2", "param_root"], root="param_new_root"),
+    Formula(keys=["param_3"], formula=lambda cfg: cfg["param_root"]["param_0"] * 2),
+    Unpack(keys=["param_4"], new_keys=[["param_40", "param_41"]], remove=True),
+])
+def test_batch_call_matches_call(cfgs, transform):
+    expected = [transform(cfg) for cfg in ConfigBatch.from_dicts(cfgs).to_dicts()]
+    out = transform.batch_call(ConfigBatch.from_dicts(cfgs))
+
+    assert isinstance(out, ConfigBatch)
+    assert out.to_dicts() == expected
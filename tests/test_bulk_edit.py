@@ -0,0 +1,113 @@
+import copy
+import random
+import pytest
+from randfig.transforms import BulkEdit, Compose, Insert, Nest, Remove
+
+
+def _random_edits(rng, n):
+    keys = ["param_0", "param_1", "param_2"]
+    edits = []
+    for _ in range(n):
+        path = [rng.choice(keys) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.8:
+            edits.append(Insert(keys=path, value=rng.choice([0, {}, {k: {} for k in keys}])))
+        else:
+            edits.append(Remove(keys=path))
+    return edits
+
+
+def _items(cfg):
+    """
+    Nested items of a configuration, which also compare the order of the keys.
+    """
+    if isinstance(cfg, dict):
+        return [(k, _items(v)) for k, v in cfg.items()]
+    return cfg
+
+
+def _apply(transforms, cfg):
+    try:
+        for tfs in transforms:
+            cfg = tfs(cfg)
+    except (KeyError, TypeError):
+        return None
+    return cfg
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_bulk_edit_matches_sequential(seed):
+    rng = random.Random(seed)
+    edits = _random_edits(rng, rng.randint(1, 12))
+    keys = ["param_0", "param_1", "param_2"]
+    base_cfg = {k0: {k1: {k2: {} for k2 in keys} for k1 in keys} for k0 in keys}
+
+    # values inserted by the edits are shared, copy them for each application
+    expected = _apply(copy.deepcopy(edits), copy.deepcopy(base_cfg))
+    result = _apply([BulkEdit(copy.deepcopy(edits))], copy.deepcopy(base_cfg))
+
+    assert _items(result) == _items(expected)
+
+
+def test_bulk_edit(nested_config):
+    bulk_edit = BulkEdit([
+        Insert(keys=["param_root", "param_nest", "param_2"], value=2),
+        Remove(keys=["param_root", "param_nest", "param_0"]),
+        Insert(keys=["param_root", "param_1"], value=1),
+        Remove(keys=["param_root", "param_1"]),
+        Insert(keys=["param_3"], value=3),
+    ])
+    edited = bulk_edit(copy.deepcopy(nested_config))
+
+    assert edited == {"param_root": {"param_nest": {"param_1": 1, "param_2": 2}}, "param_3": 3}
+    assert bulk_edit.reads == []
+    assert ("param_root", "param_nest", "param_2") in bulk_edit.writes
+
+
+@pytest.mark.parametrize('edits,exception', [
+    [[Remove(keys=["param_3"])], KeyError],
+    [[Insert(keys=["param_0", "param_1"], value=1)], TypeError],
+    [[Remove(keys=["param_0"]), Insert(keys=["param_0", "param_1"], value=1)], KeyError],
+])
+def test_bulk_edit_errors(config, edits, exception):
+    with pytest.raises(exception):
+        BulkEdit(edits)(copy.deepcopy(config))
+
+
+def test_bulk_edit_not_edit():
+    with pytest.raises(TypeError):
+        BulkEdit([Nest(keys=["param_0"], root="param_root")])
+
+
+def test_bulk_edit_batch(config):
+    bulk_edit = BulkEdit([Insert(keys=["param_3"], value=3), Remove(keys=["param_0"])])
+    cfgs = [copy.deepcopy(config) for _ in range(2)]
+    expected = [bulk_edit(copy.deepcopy(config)) for _ in range(2)]
+    assert bulk_edit.batch_call(cfgs) == expected
+
+
+def test_fuse(config):
+    compose = Compose([
+        Insert(keys=["param_3"], value=3),
+        Remove(keys=["param_0"]),
+        Nest(keys=["param_1"], root="param_root"),
+        Insert(keys=["param_root", "param_4"], value=4),
+        Remove(keys=["param_2"]),
+        Remove(keys=["param_3"]),
+    ])
+    fused = compose.fuse()
+
+    assert [type(tfs) for tfs in fused.transforms] == [BulkEdit, Nest, BulkEdit]
+    assert fused.positions == [0, 2, 3]
+    assert fused(copy.deepcopy(config)) == compose(copy.deepcopy(config))
+    assert fused.compile()(copy.deepcopy(config)) == compose(copy.deepcopy(config))
+
+
+def test_fuse_keeps_key_order():
+    compose = Compose([
+        Insert(keys=["param_0"], value=1),
+        Insert(keys=["param_1"], value=2),
+        Remove(keys=["param_0"]),
+        Insert(keys=["param_0"], value=3),
+    ])
+
+    assert list(compose.fuse()({}).items()) == list(compose({}).items()) == [("param_1", 2), ("param_0", 3)]
@@ -0,0 +1,34 @@
+import pytest
+from randfig.cache import FormulaCache
+
+
+@pytest.mark.parametrize("policy,expected", [["lru", [0, 2]], ["fifo", [1, 2]]])
+def test_eviction(policy, expected):
+    cache = FormulaCache(maxsize=2, policy=policy)
+    cache.put(0, "a")
+    cache.put(1, "b")
+    cache.get(0)
+    cache.put(2, "c")
+
+    assert [k for k in range(3) if cache.get(k) is not None] == expected
+    assert cache.info().evictions == 1
+
+
+def test_info_and_clear():
+    cache = FormulaCache(maxsize=None)
+    for k in range(200):
+        cache.put(k, k)
+
+    assert cache.get(0) == 0
+    assert cache.get(-1, "missing") == "missing"
+    assert cache.info() == (1, 1, 0, None, 200)
+
+    cache.clear()
+
+    assert cache.info() == (0, 0, 0, None, 0)
+
+
+@pytest.mark.parametrize("maxsize,policy", [[0, "lru"], [1, "random"]])
+def test_value_error(maxsize, policy):
+    with pytest.raises(ValueError):
+        FormulaCache(maxsize=maxsize, policy=policy)
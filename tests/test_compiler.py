@@ -0,0 +1,45 @@
+import pytest
+import copy
+import functools
+import randfig.expressions as expressions
+from randfig.compiler import compile_pipeline
+from randfig.transforms import Compose, Formula, Insert, Nest, Remove, Save, Unpack
+
+
+@pytest.fixture
+def cfg():
+    return {"param_0": 2, "param_1": [3, 4], "param_root": {"param_nest": {"param_2": 5}}}
+
+
+def transforms(tmp_path):
+    return [
+        Insert(keys=["param_root", "param_nest", "param_3"], value=6),
+        Formula(keys=["param_4"], formula=functools.partial(expressions.product, a_key="param_0", b_key="param_0")),
+        Formula(keys=["param_5", "param_6"], formula=lambda cfg: cfg["param_0"] + 1),
+        Unpack(keys=["param_1"], new_keys=[["param_10", "param_11"]], remove=True),
+        Compose([Remove(keys=["param_root", "param_nest", "param_2"])]),
+        Save(save_dir=tmp_path, filename="config.yaml"),
+        Nest(keys=["param_4", "param_5"], root="param_new_root"),
+    ]
+
+
+def test_compile_matches_compose(tmp_path, cfg):
+    expected = Compose(transforms(tmp_path))(copy.deepcopy(cfg))
+    compiled = Compose(transforms(tmp_path)).compile()
+
+    assert compiled(copy.deepcopy(cfg)) == expected
+
+
+@pytest.mark.parametrize("tfs,cfg,error", [
+    [Insert(keys=["param_root", "param_1"], value=0), {"param_root": 0}, TypeError],
+    [Insert(keys=["param_fake", "param_1"], value=0), {"param_root": {}}, KeyError],
+    [Remove(keys=["param_fake"]), {"param_root": {}}, KeyError],
+    [Nest(keys=["param_fake"], root="param_new_root"), {"param_root": {}}, KeyError],
+    [Nest(keys=["param_root"], root="param_root"), {"param_root": {}}, ValueError],
+    [Formula(keys=["param_1"], formula=lambda cfg: 0), 0, TypeError],
+])
+def test_compile_errors(tfs, cfg, error):
+    with pytest.raises(error):
+        tfs(copy.deepcopy(cfg))
+    with pytest.raises(error):
+        compile_pipeline([tfs])(copy.deepcopy(cfg))
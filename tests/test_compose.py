@@ -1,5 +1,14 @@
 import pytest
-from randfig.transforms import Compose, Formula, Nest
+import functools
+import random
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from randfig.rng import sample_seed
+from randfig.transforms import Compose, Formula, Insert, Nest
+
+
+def uniform(cfg):
+    return random.uniform(0, 1)
 
 
 def test_compose(config):
@@ -17,3 +26,140 @@ def test_compose(config):
 
     assert cfg_transforms == expected
 
+
+
+def test_generate_batch():
+    base_cfg = {"param_0": 1}
+    transforms = Compose([
+        Formula(keys=["param_1"], formula=lambda cfg: 2 * cfg["param_0"]),
+        Nest(keys=["param_0", "param_1"], root="param_root")
+    ])
+    cfgs = transforms.generate_batch(base_cfg, 3).to_dicts()
+
+    assert cfgs == [{"param_root": {"param_0": 1, "param_1": 2}}] * 3
+    assert base_cfg == {"param_0": 1}
+
+
+def test_generate_batch_negative_n():
+    with pytest.raises(ValueError):
+        Compose([]).generate_batch({}, -1)
+
+
+def test_generate_is_deterministic():
+    base_cfg = {"param_0": 0}
+    transforms = Compose([
+        Formula(keys=["param_1"], formula=uniform)
+    ])
+    cfgs = transforms.generate(base_cfg, 8, seed=42)
+
+    assert cfgs == transforms.generate(base_cfg, 8, seed=42)
+    assert cfgs == transforms.generate(base_cfg, 8, workers=3, seed=42)
+    assert cfgs[5] == transforms.sample(base_cfg, 5, seed=42)
+    assert len(set(cfg["param_1"] for cfg in cfgs)) == 8
+    assert base_cfg == {"param_0": 0}
+
+
+@pytest.mark.parametrize("n,workers", [[-1, 1], [1, 0]])
+def test_generate_value_error(n, workers):
+    with pytest.raises(ValueError):
+        Compose([]).generate({}, n, workers=workers)
+
+
+def test_generate_batch_is_deterministic():
+    transforms = Compose([
+        Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform", 0, 1))
+    ])
+    batch = transforms.generate_batch({"param_0": 0}, 4, seed=42)
+
+    assert batch.column("param_1").dtype == float
+    assert batch.to_dicts() == transforms.generate_batch({"param_0": 0}, 4, seed=42).to_dicts()
+    assert len(set(batch.column("param_1").tolist())) == 4
+
+
+def test_generate_with_rng_expressions():
+    transforms = Compose([
+        Formula(keys=["param_1"], formula=decorators.accept_cfg("integers", 0, 1000)),
+        Formula(keys=["param_2"], formula=functools.partial(expressions.get_jittered_value, key="param_1", p=0.1)),
+    ])
+    cfgs = transforms.generate({"param_0": 0}, 4, workers=2, seed=7)
+
+    assert cfgs == transforms.generate({"param_0": 0}, 4, seed=7)
+    assert all(isinstance(cfg["param_1"], int) for cfg in cfgs)
+
+
+def test_generate_start():
+    transforms = Compose([
+        Formula(keys=["param_1"], formula=uniform),
+        Formula(keys=["param_2"], formula=decorators.accept_cfg("normal")),
+    ])
+    cfgs = transforms.generate({"param_0": 0}, 6, seed=42)
+
+    assert cfgs[2:] == transforms.generate({"param_0": 0}, 4, seed=42, start=2)
+    assert cfgs[3] == transforms.sample({"param_0": 0}, 3, seed=42)
+
+
+def test_iter_configs():
+    transforms = Compose([Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform"))])
+    cfgs = transforms.iter_configs({"param_0": 0}, 5, seed=42)
+
+    assert not isinstance(cfgs, list)
+    assert list(cfgs) == transforms.generate({"param_0": 0}, 5, seed=42)
+
+
+def test_iter_configs_chunks():
+    transforms = Compose([Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform"))])
+    chunks = list(transforms.iter_configs({"param_0": 0}, 5, chunk_size=2, seed=42))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [c.to_dicts() for c in chunks] == [
+        c.to_dicts() for c in transforms.iter_configs({"param_0": 0}, 5, chunk_size=2, seed=42)
+    ]
+
+
+def test_iter_configs_chunks_seeds():
+    transforms = Compose([Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform"))])
+    chunks = [c.to_dicts() for c in transforms.iter_configs({"param_0": 0}, 4, chunk_size=2, seed=42, start=3)]
+
+    # each chunk is seeded by the index of its first configuration, not by the index of each configuration
+    assert chunks == [
+        transforms.generate_batch({"param_0": 0}, 2, seed=sample_seed(42, i)).to_dicts() for i in [3, 5]
+    ]
+    assert [c.to_dicts() for c in transforms.iter_configs({"param_0": 0}, 4, chunk_size=4, seed=42, start=3)] != [
+        chunks[0] + chunks[1]
+    ]
+
+
+@pytest.mark.parametrize("n,chunk_size", [[-1, None], [1, 0]])
+def test_iter_configs_value_error(n, chunk_size):
+    with pytest.raises(ValueError):
+        next(Compose([]).iter_configs({}, n, chunk_size=chunk_size))
+
+
+def test_constant_prefix_is_applied_once():
+    calls = []
+
+    def count(cfg):
+        calls.append(cfg)
+        return 2 * cfg["param_0"]
+
+    transforms = Compose([
+        Insert(keys=["param_0"], value=1),
+        Formula(keys=["param_1"], formula=count, constant=True),
+        Formula(keys=["param_2"], formula=uniform),
+    ])
+    cfgs = transforms.generate({}, 4, seed=42)
+
+    assert len(calls) == 1
+    assert all(cfg["param_1"] == 2 for cfg in cfgs)
+    assert len(set(cfg["param_2"] for cfg in cfgs)) == 4
+    assert cfgs == [transforms.sample({}, i, seed=42) for i in range(4)]
+    assert transforms.generate_batch({}, 2, seed=42).to_dicts()[0]["param_1"] == 2
+
+
+def test_constant_prefix_keeps_positions():
+    stochastic = Formula(keys=["param_2"], formula=decorators.accept_cfg("uniform"))
+    hoisted = Compose([Insert(keys=["param_1"], value=1), stochastic])
+    not_hoisted = Compose([Formula(keys=["param_1"], formula=lambda cfg: 1), stochastic])
+
+    assert not hoisted.constant and Compose([Insert(keys=["param_1"], value=1)]).constant
+    assert hoisted.generate({}, 3, seed=42) == not_hoisted.generate({}, 3, seed=42)
@@ -0,0 +1,109 @@
+import copy
+import functools
+import pickle
+import pytest
+import yaml
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from randfig.cow import CowDict
+from randfig.transforms import Compose, Formula, Insert, Nest, Remove, Save, Unpack
+
+
+def _base():
+    return {
+        "param_root": {"param_nest": {"param_0": 0, "param_1": 1}},
+        "param_list": [1, 2],
+        "param_2": 2,
+    }
+
+
+def test_cow_dict_shares_until_written():
+    base = _base()
+    cfg = CowDict(base)
+
+    cfg["param_root"]["param_nest"]["param_0"] = 10
+    cfg["param_list"].append(3)
+    cfg["param_3"] = 3
+    del cfg["param_2"]
+
+    assert base == _base()
+    assert cfg == {
+        "param_root": {"param_nest": {"param_0": 10, "param_1": 1}},
+        "param_list": [1, 2, 3],
+        "param_3": 3,
+    }
+    assert list(cfg) == ["param_root", "param_list", "param_3"]
+
+
+def test_cow_dict_reuses_children():
+    cfg = CowDict(_base())
+    assert cfg["param_root"] is cfg["param_root"]
+    assert cfg["param_list"] is cfg["param_list"]
+    assert "param_2" in cfg and len(cfg) == 3
+
+
+def test_cow_dict_to_dict():
+    base = _base()
+    out = CowDict(base).to_dict()
+
+    assert type(out) is dict and type(out["param_root"]["param_nest"]) is dict
+    assert out == base
+    assert out["param_list"] is not base["param_list"]
+
+
+@pytest.mark.parametrize("duplicate", [copy.deepcopy, lambda cfg: pickle.loads(pickle.dumps(cfg))])
+def test_cow_dict_copy(duplicate):
+    cfg = CowDict(_base())
+    cfg["param_root"]["param_nest"]["param_0"] = 10
+    out = duplicate(cfg)
+
+    assert out == cfg
+    out["param_root"]["param_nest"]["param_1"] = 11
+    assert cfg["param_root"]["param_nest"]["param_1"] == 1
+
+
+@pytest.mark.parametrize("tfs", [
+    Insert(keys=["param_root", "param_nest", "param_2"], value=2),
+    Remove(keys=["param_root", "param_nest", "param_0"]),
+    Formula(keys=["param_3"], formula=functools.partial(expressions.pop, key="param_list")),
+    Formula(keys=["param_3"], formula=lambda cfg: cfg["param_list"] + [cfg["param_2"]]),
+    Nest(keys=["param_2", "param_list"], root="param_new_root"),
+    Unpack(keys=["param_list"], new_keys=[["param_4", "param_5"]], remove=True),
+])
+def test_cow_dict_transforms(tfs):
+    base = _base()
+    expected = tfs(_base())
+    out = tfs(CowDict(base))
+
+    assert out == expected
+    assert base == _base()
+
+
+def test_cow_dict_save(tmp_path):
+    base = _base()
+    Save(keys=["param_root"], save_dir=tmp_path, filename="config.yaml")(CowDict(base))
+
+    with open(tmp_path.joinpath("config.yaml"), "r") as cfg_file:
+        assert yaml.safe_load(cfg_file) == base["param_root"]
+    assert base == _base()
+
+
+def _transforms():
+    return [
+        Insert(keys=["param_root", "param_nest", "param_2"], value=2),
+        Formula(keys=["param_3"], formula=decorators.accept_cfg("uniform", 0, 1)),
+        Remove(keys=["param_list"]),
+    ]
+
+
+def test_compose_copy_on_write():
+    base_cfg = _base()
+    expected = Compose(_transforms()).generate(base_cfg, n=4, seed=42)
+    compose = Compose(_transforms(), copy_on_write=True)
+    cfgs = compose.generate(base_cfg, n=4, seed=42)
+
+    assert all(isinstance(cfg, CowDict) for cfg in cfgs)
+    assert cfgs == expected
+    assert compose.generate(base_cfg, n=4, seed=42, workers=2) == expected
+    assert compose.prune().copy_on_write and compose.schedule().copy_on_write and compose.fuse().copy_on_write
+    assert base_cfg == _base()
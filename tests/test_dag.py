@@ -0,0 +1,152 @@
+import pytest
+import functools
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from pathlib import Path
+from randfig.dag import DependencyGraph, overlaps
+from randfig.transforms import Compose, Formula, Insert, Nest, Remove, Save, Unpack
+
+
+def double(cfg):
+    return 2 * cfg["param_0"]
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    [("param_0",), ("param_0",), True],
+    [("param_root",), ("param_root", "param_0"), True],
+    [(), ("param_0",), True],
+    [("param_0",), ("param_1",), False],
+    [("param_root", "param_0"), ("param_root", "param_1"), False],
+])
+def test_overlaps(a, b, expected):
+    assert overlaps(a, b) == expected
+    assert overlaps(b, a) == expected
+
+
+@pytest.mark.parametrize("tfs,reads,writes", [
+    [Insert(keys=["param_root", "param_0"], value=0), [], [("param_root", "param_0")]],
+    [Remove(keys=["param_0"]), [], [("param_0",)]],
+    [Nest(keys=["param_0"], root="param_root"), [("param_0",)], [("param_0",), ("param_root",)]],
+    [Unpack(keys=["param_0"], new_keys=[["param_1", "param_2"]], remove=True), [("param_0",)], [("param_1",), ("param_2",), ("param_0",)]],
+    [Formula(keys=["param_1"], formula=double), None, None],
+    [Formula(keys=["param_1"], formula=double, reads=["param_0"]), [("param_0",)], [("param_1",)]],
+    [Formula(keys=["param_1"], formula=double, reads=["param_0", ["param_root", "param_0"]]), [("param_0",), ("param_root", "param_0")], [("param_1",)]],
+    [Formula(keys=["param_1"], formula=functools.partial(expressions.division, num_key="param_0", den_key="param_2")), [("param_0",), ("param_2",)], [("param_1",)]],
+    [Formula(keys=["param_1"], formula=functools.partial(expressions.pop, key="param_0")), [("param_0",)], [("param_1",), ("param_0",)]],
+    [Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform")), [], [("param_1",)]],
+])
+def test_reads_writes(tfs, reads, writes):
+    assert tfs.reads == reads
+    assert tfs.writes == writes
+
+
+def test_save_reads(tmp_path: Path):
+    assert Save(tmp_path, "cfg.yaml").reads == [()]
+    assert Save(tmp_path, "cfg.yaml", keys=["param_root"]).writes == []
+
+
+def test_infer_keys():
+    assert expressions.infer_keys(double) is None
+    assert expressions.infer_keys(functools.partial(expressions.add, key_a="param_0")) is None
+    assert expressions.infer_keys(functools.partial(expressions.add, key_a="param_0", key_b="param_1")) == (["param_0", "param_1"], [])
+
+
+def test_levels():
+    graph = DependencyGraph([
+        Insert(keys=["param_0"], value=1),
+        Formula(keys=["param_1"], formula=double, reads=["param_0"]),
+        Insert(keys=["param_2"], value=2),
+        Formula(keys=["param_3"], formula=double, reads=["param_0"]),
+        Nest(keys=["param_1", "param_3"], root="param_root"),
+    ])
+
+    assert graph.levels() == [[0, 2], [1, 3], [4]]
+
+
+def test_unknown_transforms_are_barriers():
+    graph = DependencyGraph([Insert(keys=["param_0"], value=1), Formula(keys=["param_1"], formula=double), Insert(keys=["param_2"], value=2)])
+
+    assert graph.levels() == [[0], [1], [2]]
+
+
+def test_dead():
+    graph = DependencyGraph([
+        Formula(keys=["param_1"], formula=double, reads=["param_0"]),
+        Formula(keys=["param_2"], formula=double, reads=["param_0"]),
+        Formula(keys=["param_3"], formula=double, reads=["param_2"]),
+        Insert(keys=["param_1"], value=1),
+        Remove(keys=["param_2"]),
+        Remove(keys=["param_3"]),
+        Formula(keys=["param_4"], formula=double),
+    ])
+
+    assert graph.dead() == {0, 2}
+
+
+def test_nested_writes_keep_parent_alive():
+    graph = DependencyGraph([
+        Formula(keys=["param_root"], formula=lambda cfg: {}, reads=[]),
+        Insert(keys=["param_root", "param_0"], value=1),
+        Remove(keys=["param_root"]),
+    ])
+
+    assert graph.dead() == {1}
+
+
+def test_order_hoists_constant_transforms():
+    graph = DependencyGraph([
+        Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform")),
+        Insert(keys=["param_2"], value=2),
+        Remove(keys=["param_1"]),
+        Insert(keys=["param_3"], value=3),
+    ])
+
+    assert graph.order() == [1, 3, 0, 2]
+
+
+def test_compose_prune_and_schedule():
+    compose = Compose([
+        Formula(keys=["param_1"], formula=decorators.accept_cfg("uniform")),
+        Formula(keys=["param_2"], formula=decorators.accept_cfg("normal")),
+        Insert(keys=["param_3"], value=3),
+        Remove(keys=["param_1"]),
+    ])
+    pruned = compose.prune()
+    scheduled = pruned.schedule()
+
+    assert isinstance(pruned.transforms[0], Insert)
+    assert scheduled.positions == [0, 2, 3, 1]
+    assert compose.generate({}, 4, seed=42) == pruned.generate({}, 4, seed=42) == scheduled.generate({}, 4, seed=42)
+
+
+def test_compose_prune_nested_writes():
+    compose = Compose([
+        Formula(keys=["param_root"], formula=lambda cfg: {}, reads=[]),
+        Insert(keys=["param_root", "param_0"], value=1),
+        Remove(keys=["param_root"]),
+    ])
+    pruned = compose.prune()
+
+    assert isinstance(pruned.transforms[0], Formula)
+    assert pruned.sample({}, 0, seed=42) == compose.sample({}, 0, seed=42) == {}
+
+
+def test_compose_prune_unknown_side_effects():
+    compose = Compose([Formula(keys=["param_0"], formula=lambda cfg: cfg.update(param_side=1)), Remove(keys=["param_0"])])
+    pruned = compose.prune()
+
+    assert isinstance(pruned.transforms[0], Formula)
+    assert pruned.sample({}, 0, seed=42) == compose.sample({}, 0, seed=42) == {"param_side": 1}
+
+
+def test_compose_positions_value_error():
+    with pytest.raises(ValueError):
+        Compose([Insert(keys=["param_0"], value=0)], positions=[0, 1])
+
+
+def test_compose_reads_writes():
+    compose = Compose([Insert(keys=["param_0"], value=0), Nest(keys=["param_0"], root="param_root")])
+
+    assert compose.reads == [("param_0",)]
+    assert compose.writes == [("param_0",), ("param_root",)]
+    assert Compose([Formula(keys=["param_1"], formula=double)]).reads is None
@@ -1,6 +1,8 @@
 import pytest
 import random
+import numpy as np
 import randfig.decorators as decorators
+from randfig.rng import generation_context
 
 
 @pytest.mark.parametrize('fn,dtype,args,kwargs', [
@@ -22,3 +24,22 @@ def test_accept_cfg_as_decorator(config):
     
     assert fn(config) == 0
 
+
+
+def test_accept_cfg_generator_method(config):
+    fn = decorators.accept_cfg("integers", 0, 10)
+
+    with generation_context(42):
+        out = fn(config)
+
+    assert isinstance(out, int)
+    assert out == np.random.default_rng(42).integers(0, 10)
+
+
+def test_accept_cfg_global_random(config):
+    uniform = decorators.accept_cfg("uniform", 0, 1)
+    random.seed(0)
+    value = uniform(config)
+    random.seed(0)
+
+    assert uniform(config) == value
@@ -0,0 +1,134 @@
+import io
+import pickle
+import pytest
+import ruamel.yaml as yaml
+from collections import OrderedDict
+from randfig.formats import JsonFormat, MsgpackFormat, PickleFormat, YamlFormat, YamlTemplate, get_format, is_plain
+
+
+CFG = {"param_root": {"param_0": 0, "param_1": [1.5, "a", None, True]}, "param_2": "ü", "param_3": ["yes", "on", "0o17", "1e3"]}
+
+
+@pytest.mark.parametrize("fmt", [
+    YamlFormat(),
+    YamlFormat(c_dumper=True),
+    YamlFormat(template=True),
+    JsonFormat(),
+    JsonFormat(indent=2),
+    PickleFormat(),
+    MsgpackFormat(),
+])
+def test_format_round_trip(fmt):
+    assert fmt.loads(fmt.dumps(CFG)) == CFG
+    assert pickle.loads(pickle.dumps(fmt)).dumps(CFG) == fmt.dumps(CFG)
+
+
+@pytest.mark.parametrize("value,expected", [
+    [CFG, True],
+    [{"param_0": (0, 1)}, False],
+    [OrderedDict(param_0=0), False],
+])
+def test_is_plain(value, expected):
+    assert is_plain(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    0, 127, 128, -1, -32, -33, 255, 256, 2 ** 16, 2 ** 32, 2 ** 64 - 1, -2 ** 63,
+    0.1, -1e300, "", "a" * 31, "a" * 32, "ü" * 300, b"", b"\x00" * 70000,
+    [], list(range(20)), {}, {str(i): [i, {"param_0": None}] for i in range(20)},
+])
+def test_msgpack_round_trip(value):
+    fmt = MsgpackFormat()
+    assert fmt.loads(fmt.dumps(value)) == value
+
+
+def test_msgpack_known_encoding():
+    assert MsgpackFormat().dumps({"a": [1, -1, True, None]}) == b"\x81\xa1a\x94\x01\xff\xc3\xc0"
+
+
+@pytest.mark.parametrize("value,error", [
+    [2 ** 64, ValueError],
+    [-2 ** 63 - 1, ValueError],
+    [{1, 2}, TypeError],
+])
+def test_msgpack_not_serializable(value, error):
+    with pytest.raises(error):
+        MsgpackFormat().dumps(value)
+
+
+def test_msgpack_trailing_bytes():
+    with pytest.raises(ValueError):
+        MsgpackFormat().loads(b"\x01\x02")
+
+
+@pytest.mark.parametrize("fmt,expected", [
+    ["json", JsonFormat],
+    [".pkl", PickleFormat],
+    ["msgpack", MsgpackFormat],
+    [".yaml", YamlFormat],
+])
+def test_get_format(fmt, expected):
+    assert type(get_format(fmt)) is expected
+
+
+def test_get_format_instance():
+    fmt = JsonFormat(indent=2)
+    assert get_format(fmt) is fmt
+
+
+@pytest.mark.parametrize("fmt", ["yml", ".yml", ".txt", None])
+def test_get_format_unknown(fmt):
+    with pytest.raises(ValueError):
+        get_format(fmt)
+
+
+def _ruamel_dump(value, sequence, offset):
+    yml = yaml.YAML()
+    yml.indent(sequence=sequence, offset=offset)
+    stream = io.StringIO()
+    yml.dump(value, stream)
+    return stream.getvalue()
+
+
+PROTOTYPE = {"param_root": {"param_0": 0, "param_1": [1, 2, [3]], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []}
+
+
+@pytest.mark.parametrize("sequence,offset", [[2, 4], [4, 2], [2, 2]])
+@pytest.mark.parametrize("scalar", [
+    0, -10 ** 20, 1.5, 1e+20, float("nan"), float("-inf"), True, False, None,
+    "a", "a b", "", "yes", "true", "null", "1.5", "2020-01-01", "a: b", "#a", "it's", "ü", "x" * 60,
+])
+def test_yaml_template(sequence, offset, scalar):
+    template = YamlTemplate(PROTOTYPE, sequence, offset)
+    cfg = {"param_root": {"param_0": scalar, "param_1": [scalar, 2, [scalar]], "param_2": {}}, "param_3": [{"param_4": scalar}], "param_5": []}
+
+    assert template.render(cfg) == _ruamel_dump(cfg, sequence, offset)
+
+
+@pytest.mark.parametrize("cfg", [
+    {"param_root": {"param_0": 0}},
+    {"param_root": {"param_1": [1, 2, [3]], "param_0": 0, "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": 0, "param_1": [1, 2], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": [0], "param_1": [1, 2, [3]], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": 0, "param_1": [1, 2, [3]], "param_2": {"a": 1}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": "a\nb", "param_1": [1, 2, [3]], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": "a b" * 30, "param_1": [1, 2, [3]], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    {"param_root": {"param_0": (0, 1), "param_1": [1, 2, [3]], "param_2": {}}, "param_3": [{"param_4": None}], "param_5": []},
+    [0],
+])
+def test_yaml_template_fallback(cfg):
+    assert YamlTemplate(PROTOTYPE).render(cfg) is None
+
+
+@pytest.mark.parametrize("prototype", [[0], {"param_0": (0, 1)}, {"param_0": {1, 2}}])
+def test_yaml_template_not_plain(prototype):
+    with pytest.raises(ValueError):
+        YamlTemplate(prototype)
+
+
+def test_yaml_format_template_fallback():
+    fmt = YamlFormat(template=True)
+    fmt.dumps(CFG)
+    other = {"param_root": {"param_0": "a\nb"}, "param_1": (1, 2)}
+
+    assert fmt.dumps(other) == YamlFormat().dumps(other)
@@ -1,5 +1,9 @@
 import pytest
+import functools
 import random
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from randfig.cache import FormulaCache
 from randfig.transforms import Formula
 
 
@@ -24,3 +28,63 @@ def test_sum(config):
     assert cfg_rand["param_3"] == cfg["param_1"] + cfg["param_2"]
     for k, v in cfg.items():
         assert cfg[k] == v
+
+
+def test_cache():
+    calls = []
+
+    def pick(cfg):
+        calls.append(cfg["param_0"])
+        return {"value": cfg["param_0"]}
+
+    form = Formula(keys=["param_1"], formula=pick, constant=True, reads=["param_0"], cache=True)
+    cfgs = [form({"param_0": v}) for v in [0, 1, 0, 0]]
+    cfgs[0]["param_1"]["value"] = -1
+
+    assert calls == [0, 1]
+    assert form({"param_0": 0})["param_1"] == {"value": 0}
+    assert form.cache.info() == (3, 2, 0, 128, 2)
+
+
+def test_cache_expression():
+    form = Formula(
+        keys=["param_1"],
+        formula=functools.partial(expressions.pick_from_mapping, key="param_0", mapping={0: "a", 1: "b"}),
+        cache=FormulaCache(maxsize=1),
+    )
+
+    assert [form({"param_0": v})["param_1"] for v in [0, 0, 1, 0]] == ["a", "a", "b", "a"]
+    assert form.cache.info().evictions == 2
+
+
+def test_cache_input_types():
+    form = Formula(
+        keys=["param_1"],
+        formula=functools.partial(expressions.product_by_num, n_key="param_0", num=3),
+        reads=["param_0"],
+        cache=True,
+    )
+    values = [form({"param_0": v})["param_1"] for v in [1, 1.0, True, 1]]
+
+    assert values == [3, 3.0, 3, 3]
+    assert [type(v) for v in values] == [int, float, int, int]
+    assert form.cache.info().currsize == 3
+
+
+def test_cache_unhashable():
+    form = Formula(keys=["param_1"], formula=lambda cfg: len(cfg["param_0"]), reads=["param_0"], constant=True, cache=True)
+
+    assert form({"param_0": [0, 1]})["param_1"] == 2
+    assert form.cache.info().currsize == 0
+
+
+@pytest.mark.parametrize("formula,kwargs", [
+    [lambda cfg: 1, {"constant": True}],
+    [lambda cfg: random.random(), {"reads": []}],
+    [decorators.accept_cfg("uniform"), {}],
+    [functools.partial(expressions.get_jittered_value, key="param_0", p=0.1), {}],
+    [functools.partial(expressions.min_threshold_from_resolution, resolution_key="param_0", peak=511, jitter=0.1), {}],
+])
+def test_cache_value_error(formula, kwargs):
+    with pytest.raises(ValueError):
+        Formula(keys=["param_1"], formula=formula, cache=True, **kwargs)
@@ -0,0 +1,69 @@
+import pytest
+import functools
+import randfig.decorators as decorators
+import randfig.expressions as expressions
+from randfig.incremental import Incremental
+from randfig.transforms import Compose, Formula, Insert, Nest, Remove
+
+
+def compose():
+    return Compose([
+        Insert(keys=["param_root"], value={"param_0": 0}),
+        Formula(keys=["param_3"], formula=functools.partial(expressions.product_by_num, n_key="resolution", num=2)),
+        Formula(keys=["param_4"], formula=lambda cfg: cfg["param_3"] + 1),
+        Formula(keys=["param_5"], formula=functools.partial(expressions.add, key_a="param_1", key_b="param_2")),
+        Formula(keys=["param_6"], formula=decorators.accept_cfg("uniform")),
+        Insert(keys=["param_root", "param_1"], value=1),
+        Remove(keys=["param_2"]),
+    ])
+
+
+def test_incremental_recomputes_affected_transforms():
+    incremental = Incremental(compose(), seed=42, index=3)
+    base_cfg = {"resolution": 1, "param_1": 1, "param_2": 2}
+    cfg = incremental.run(base_cfg)
+
+    assert cfg == compose().sample(base_cfg, 3, seed=42)
+    assert incremental.recomputed == list(range(7))
+
+    new_cfg = incremental.run({"resolution": 2, "param_1": 1, "param_2": 2})
+
+    assert incremental.recomputed == [1, 2]
+    assert new_cfg == compose().sample({"resolution": 2, "param_1": 1, "param_2": 2}, 3, seed=42)
+    assert new_cfg["param_6"] == cfg["param_6"]
+
+    new_cfg["param_root"]["param_0"] = -1
+    assert incremental.run({"resolution": 2, "param_1": 1, "param_2": 2}) == compose().sample(
+        {"resolution": 2, "param_1": 1, "param_2": 2}, 3, seed=42
+    )
+    assert incremental.recomputed == []
+
+
+@pytest.mark.parametrize("base_cfg", [
+    {"resolution": 1, "param_1": 5, "param_2": 2},
+    {"resolution": 1, "param_1": 1},
+    {"resolution": 1.0, "param_1": 1, "param_2": 2, "param_7": 7},
+])
+def test_incremental_matches_sample(base_cfg):
+    incremental = Incremental(compose(), seed=0)
+    incremental.run({"resolution": 1, "param_1": 1, "param_2": 2})
+
+    if "param_2" not in base_cfg:
+        with pytest.raises(KeyError):
+            incremental.run(base_cfg)
+        base_cfg = {**base_cfg, "param_2": 3}
+
+    assert incremental.run(base_cfg) == compose().sample(base_cfg, 0, seed=0)
+
+
+def test_incremental_iterating_transforms():
+    transforms = Compose([
+        Formula(keys=["param_3"], formula=lambda cfg: 2 * cfg["param_0"]),
+        Nest(keys=["param_0", "param_3"], root="param_root"),
+        Formula(keys=["param_4"], formula=lambda cfg: cfg["param_1"]),
+    ])
+    incremental = Incremental(transforms)
+    incremental.run({"param_0": 0, "param_1": 1})
+
+    assert incremental.run({"param_0": 1, "param_1": 1}) == {"param_1": 1, "param_root": {"param_0": 1, "param_3": 2}, "param_4": 1}
+    assert incremental.recomputed == [0, 1]
@@ -24,3 +24,17 @@ def test_insert_two_times():
     for cfg in cfgs:
         inserted = insert(cfg)
         assert expected == inserted
+
+
+def test_insert_dotted_keys():
+    insert = Insert(keys="param_root.param_1", value=1)
+    inserted = insert({"param_root": {"param_0": 0}})
+    assert inserted == {"param_root": {"param_0": 0, "param_1": 1}}
+    assert insert.keys == ["param_root", "param_1"]
+    assert insert.writes == [("param_root", "param_1")]
+
+
+def test_insert_literal_dot_key():
+    insert = Insert(keys=["param.0"], value=1)
+    assert insert({}) == {"param.0": 1}
+    assert insert.path == ("param.0",)
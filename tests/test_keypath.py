@@ -0,0 +1,62 @@
+import pytest
+from randfig.keypath import KeyPath
+
+
+@pytest.mark.parametrize('keys,expected', [
+    ["param_root.param_nest", ("param_root", "param_nest")],
+    [["param_root", "param_nest"], ("param_root", "param_nest")],
+    [("param_root",), ("param_root",)],
+    [KeyPath("param_root.param_nest"), ("param_root", "param_nest")],
+])
+def test_keypath_keys(keys, expected):
+    path = KeyPath(keys)
+    assert path.keys == expected
+    assert path.parent == expected[:-1]
+    assert path.last == expected[-1]
+    assert path == KeyPath(expected)
+    assert list(path) == list(expected)
+
+
+@pytest.mark.parametrize('keys,exception', [
+    [[], ValueError],
+    [1, TypeError],
+])
+def test_keypath_invalid(keys, exception):
+    with pytest.raises(exception):
+        KeyPath(keys)
+
+
+def test_keypath_get(nested_config):
+    assert KeyPath("param_root.param_nest.param_1").get(nested_config) == 1
+    assert KeyPath(["param_root"]).get(nested_config) is nested_config["param_root"]
+
+    with pytest.raises(KeyError):
+        KeyPath("param_root.param_2").get(nested_config)
+
+
+def test_keypath_set_delete():
+    cfg = {"param_root": {"param_nest": {"param_0": 0}}}
+    path = KeyPath("param_root.param_nest.param_1")
+
+    path.set(cfg, 1)
+    assert cfg == {"param_root": {"param_nest": {"param_0": 0, "param_1": 1}}}
+
+    assert path.delete(cfg) == 1
+    assert cfg == {"param_root": {"param_nest": {"param_0": 0}}}
+
+    with pytest.raises(KeyError):
+        path.delete(cfg)
+
+
+@pytest.mark.parametrize('keys', [
+    ["param_0", "param_1"],
+    ["param_root", "param_0", "param_1"],
+])
+def test_keypath_not_mapping(keys):
+    cfg = {"param_0": 0, "param_root": {"param_0": [0]}}
+    path = KeyPath(keys)
+
+    with pytest.raises(TypeError, match="for one of the nested values"):
+        path.set(cfg, 1)
+    with pytest.raises(TypeError, match="for one of the nested values"):
+        path.delete(cfg)
@@ -23,3 +23,10 @@ def test_remove_two_times():
     for cfg in cfgs:
         removed = remove(cfg)
         assert expected == removed
+
+
+def test_remove_dotted_keys():
+    remove = Remove(keys="param_root.param_1")
+    removed = remove({"param_root": {"param_0": 0, "param_1": 1}})
+    assert removed == {"param_root": {"param_0": 0}}
+    assert remove.keys == ["param_root", "param_1"]
@@ -0,0 +1,66 @@
+import pytest
+import random
+import numpy as np
+import randfig.rng as rng
+
+
+def test_spawn_rngs():
+    values = [generator.random() for generator in rng.spawn_rngs(42, 3)]
+
+    assert values == [generator.random() for generator in rng.spawn_rngs(np.random.SeedSequence(42), 3)]
+    assert len(set(values)) == 3
+
+
+def test_generation_context():
+    assert rng.get_rng() is None
+
+    with rng.generation_context(42) as outer:
+        assert rng.current_rng() is outer
+        with rng.generation_context(np.random.default_rng(0)) as inner:
+            assert rng.get_rng() is inner
+        assert rng.get_rng() is outer
+
+    assert rng.get_rng() is None
+
+
+def test_current_rng_global_random():
+    random.seed(0)
+    values = [rng.current_rng().random() for _ in range(3)]
+    random.seed(0)
+
+    assert [rng.current_rng().random() for _ in range(3)] == values
+    assert len(set(values)) == 3
+
+
+def test_current_index():
+    assert rng.current_index() is None
+
+    with rng.seeded_random(), rng.sample_context(42, 7, 1):
+        assert rng.current_index() == 7
+
+    assert rng.current_index() is None
+
+
+def test_seeded_random_restores_state():
+    state = random.getstate()
+
+    with rng.seeded_random(42):
+        random.random()
+
+    assert random.getstate() == state
+
+
+def test_resolve_seed_value_error():
+    with pytest.raises(ValueError):
+        rng.resolve_seed(-1)
+
+
+def test_counter_rng_random_access():
+    assert rng.counter_rng(42, 10 ** 9, 2).random() == rng.counter_rng(42, 10 ** 9, 2).random()
+    assert rng.counter_rng(42, 1, 0).random() != rng.counter_rng(42, 0, 1).random()
+    assert rng.counter_rng(42, 1, 0).random() != rng.counter_rng(43, 1, 0).random()
+
+
+def test_counter_rng_value_error():
+    with pytest.raises(ValueError):
+        rng.counter_rng(42, -1)
@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+import randfig.utils as utils
+from collections import Counter
+from randfig.batch import ConfigBatch
+from randfig.rng import generation_context
+from randfig.transforms import Compose, SampleDivisorPair
+
+
+@pytest.mark.parametrize("n_range,divisor_range", [
+    [(1, 50), None],
+    [(100, 200), (8, 32)],
+    [(7, 7), (1, 7)],
+])
+def test_table(n_range, divisor_range):
+    sample = SampleDivisorPair(keys=["n", "divisor"], n_range=n_range, divisor_range=divisor_range)
+    d_min, d_max = divisor_range if divisor_range is not None else (1, n_range[1])
+    expected = [
+        (n, d) for n in range(n_range[0], n_range[1] + 1) for d in utils.get_divisors(n) if d_min <= d <= d_max
+    ]
+
+    assert list(zip(sample.n.tolist(), sample.divisors.tolist())) == expected
+
+
+def test_call():
+    sample = SampleDivisorPair(keys=["n", "divisor"], n_range=(1000, 1100), divisor_range=(16, 64))
+
+    with generation_context(42):
+        cfgs = [sample({"param_0": 0}) for _ in range(50)]
+
+    assert all(1000 <= cfg["n"] <= 1100 and 16 <= cfg["divisor"] <= 64 for cfg in cfgs)
+    assert all(cfg["n"] % cfg["divisor"] == 0 for cfg in cfgs)
+    assert all(type(cfg["n"]) is int and type(cfg["divisor"]) is int for cfg in cfgs)
+
+
+@pytest.mark.parametrize("per_n", [False, True])
+def test_distribution(per_n):
+    sample = SampleDivisorPair(keys=["n", "divisor"], n_range=(11, 12), per_n=per_n)
+
+    with generation_context(0):
+        counts = Counter(tuple(sample({}).values()) for _ in range(8000))
+
+    # 11 has 2 divisors and 12 has 6
+    n_11 = (counts[(11, 1)] + counts[(11, 11)]) / 8000
+    assert n_11 == pytest.approx(0.5 if per_n else 0.25, abs=0.03)
+    assert set(counts) == {(11, 1), (11, 11), (12, 1), (12, 2), (12, 3), (12, 4), (12, 6), (12, 12)}
+
+
+@pytest.mark.parametrize("per_n", [False, True])
+def test_batch_call(per_n):
+    sample = SampleDivisorPair(keys=["n", "divisor"], n_range=(64, 512), divisor_range=(4, 16), per_n=per_n)
+
+    with generation_context(0):
+        batch = sample.batch_call(ConfigBatch.from_config({"param_0": 0}, 100))
+
+    n, divisor = batch.column("n"), batch.column("divisor")
+
+    assert n.dtype == np.int64
+    assert ((n % divisor) == 0).all() and (divisor >= 4).all() and (divisor <= 16).all()
+
+
+def test_generate_is_deterministic():
+    compose = Compose([SampleDivisorPair(keys=["n", "divisor"], n_range=(64, 512))])
+
+    assert compose.generate({}, 4, seed=1) == compose.generate({}, 4, workers=2, seed=1)
+    assert compose.generate_batch({}, 4, seed=1).to_dicts() == compose.generate_batch({}, 4, seed=1).to_dicts()
+
+
+@pytest.mark.parametrize("keys,n_range,divisor_range", [
+    [["n"], (1, 10), None],
+    [["n", "divisor"], (0, 10), None],
+    [["n", "divisor"], (10, 1), None],
+    [["n", "divisor"], (1, 10), (5, 4)],
+    [["n", "divisor"], (11, 11), (2, 10)],
+])
+def test_value_error(keys, n_range, divisor_range):
+    with pytest.raises(ValueError):
+        SampleDivisorPair(keys=keys, n_range=n_range, divisor_range=divisor_range)
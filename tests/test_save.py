@@ -1,6 +1,11 @@
+import gc
+import pickle
 import pytest
 import yaml
-from randfig.transforms import Save
+from randfig.batch import ConfigBatch
+from randfig.formats import JsonFormat, get_format
+from randfig.shards import index_path, read_index, shard_path
+from randfig.transforms import Compose, Formula, Save
 
 
 @pytest.mark.parametrize("keys,expected_from_yaml",
@@ -35,7 +40,7 @@ def test_key_not_exists(tmp_path, nested_config, keys):
         save(nested_config)
 
 
-@pytest.mark.parametrize("ext", [".yml", ".txt", ".nii.gz"])
+@pytest.mark.parametrize("ext", [".yml", ".txt", ".nii.gz", "", ".jsonl"])
 def test_wrong_file_extension(tmp_path, ext):
     filename = "config" + ext
 
@@ -71,3 +76,151 @@ def test_keys_is_not_sequence(config, tmp_path):
     with pytest.raises(TypeError):
         Save(keys={}, save_dir=tmp_path, filename=tmp_path.joinpath("test.yaml"))
 
+
+
+def test_save_batch_row(tmp_path, nested_config):
+    filename = "config.yaml"
+    save = Save(keys=["param_root"], save_dir=tmp_path, filename=filename)
+    batch = save.batch_call(ConfigBatch.from_dicts([nested_config]))
+
+    with open(tmp_path.joinpath(filename), "r") as cfg_file:
+        out_cfg = yaml.safe_load(cfg_file)
+
+    assert out_cfg == nested_config["param_root"]
+    assert batch.to_dicts() == [nested_config]
+
+
+@pytest.mark.parametrize("c_dumper", [False, True])
+def test_save_c_dumper(tmp_path, nested_config, c_dumper):
+    save = Save(save_dir=tmp_path, filename="config.yaml", c_dumper=c_dumper)
+    cfg = {"param_root": nested_config["param_root"], "param_list": [1, "a", None, 1.5]}
+    save(cfg)
+
+    with open(tmp_path.joinpath("config.yaml"), "r") as cfg_file:
+        assert yaml.safe_load(cfg_file) == cfg
+
+
+def test_save_background(tmp_path):
+    cfg = {"param_0": 0}
+
+    with Save(save_dir=tmp_path, filename="config.yaml", queue_size=2) as save:
+        for i in range(50):
+            cfg["param_0"] = i
+            save(cfg)
+
+        save.flush()
+        with open(tmp_path.joinpath("config.yaml"), "r") as cfg_file:
+            assert yaml.safe_load(cfg_file) == {"param_0": 49}
+
+    assert save._queue is None
+    assert pickle.loads(pickle.dumps(save)).save_path == save.save_path
+
+
+def test_save_background_dropped(tmp_path):
+    save = Save(save_dir=tmp_path, filename="config.yaml", queue_size=4)
+    save({"param_0": 0})
+    thread = save._finalizer.peek()[2][1]
+
+    del save
+    gc.collect()
+
+    assert not thread.is_alive()
+    with open(tmp_path.joinpath("config.yaml"), "r") as cfg_file:
+        assert yaml.safe_load(cfg_file) == {"param_0": 0}
+
+
+def test_save_background_error(tmp_path):
+    save = Save(save_dir=tmp_path.joinpath("configs"), filename="config.yaml", queue_size=1)
+    tmp_path.joinpath("configs").rmdir()
+    save({"param_0": 0})
+
+    with pytest.raises(FileNotFoundError):
+        save.flush()
+
+    save.close()
+
+
+def test_save_negative_queue_size(tmp_path):
+    with pytest.raises(ValueError):
+        Save(save_dir=tmp_path, filename="config.yaml", queue_size=-1)
+
+
+@pytest.mark.parametrize("queue_size", [0, 4])
+def test_save_shards(tmp_path, queue_size):
+    compose = Compose([
+        Formula(keys=["param_1"], formula=lambda cfg: 2 * cfg["param_0"]),
+        Save(save_dir=tmp_path, filename="configs.yaml", shard_size=3, queue_size=queue_size),
+    ])
+    cfgs = compose.generate({"param_0": 1}, n=4, seed=42, start=10)
+    compose.transforms[-1].close()
+
+    index = read_index(index_path(tmp_path, "configs.yaml"))
+    assert index["sample_id"].tolist() == [10, 11, 12, 13]
+    assert index["shard"].tolist() == [0, 0, 0, 1]
+
+    with open(shard_path(tmp_path, "configs.yaml", 0), "r") as shard_file:
+        assert list(yaml.safe_load_all(shard_file)) == cfgs[:3]
+
+
+def test_save_background_workers(tmp_path):
+    compose = Compose([Save(save_dir=tmp_path, filename="config.yaml", queue_size=64)])
+    cfgs = compose.generate({"param_0": 0}, n=4, seed=0, workers=2)
+
+    with open(tmp_path.joinpath("config.yaml"), "r") as cfg_file:
+        assert yaml.safe_load(cfg_file) in cfgs
+
+
+def test_save_shards_workers(tmp_path):
+    compose = Compose([Save(save_dir=tmp_path, filename="configs.yaml", shard_size=3)])
+
+    with pytest.raises(RuntimeError):
+        compose.generate({"param_0": 0}, n=4, seed=0, workers=2)
+
+
+def test_save_shards_extension(tmp_path):
+    Save(save_dir=tmp_path, filename="configs.jsonl", shard_bytes=1024)
+
+    with pytest.raises(ValueError):
+        Save(save_dir=tmp_path, filename="configs.jsonl")
+
+
+@pytest.mark.parametrize("filename,fmt", [
+    ["config.json", None],
+    ["config.pkl", None],
+    ["config.msgpack", None],
+    ["config.yaml", "yaml"],
+    ["config.msgpack", "msgpack"],
+    ["config.json", JsonFormat(indent=2)],
+])
+def test_save_formats(tmp_path, nested_config, filename, fmt):
+    Save(save_dir=tmp_path, filename=filename, fmt=fmt)(nested_config)
+    data = tmp_path.joinpath(filename).read_bytes()
+
+    assert get_format(fmt if fmt is not None else filename[filename.index("."):]).loads(data) == nested_config
+
+
+@pytest.mark.parametrize("filename,fmt", [
+    ["config.yml", "yaml"],
+    ["config.yaml", "json"],
+    ["config.json", "toml"],
+])
+def test_save_wrong_format(tmp_path, filename, fmt):
+    with pytest.raises(ValueError):
+        Save(save_dir=tmp_path, filename=filename, fmt=fmt)
+
+
+def test_save_template(tmp_path, nested_config):
+    save = Save(save_dir=tmp_path, filename="config.yaml", template=True)
+    expected = Save(save_dir=tmp_path, filename="expected.yaml")
+
+    for value in [0, "a: b", None, {"param_2": 2}]:
+        nested_config["param_root"]["param_nest"]["param_0"] = value
+        save(nested_config)
+        expected(nested_config)
+
+        assert save.save_path.read_text() == expected.save_path.read_text()
+
+
+def test_save_format_with_shards(tmp_path):
+    with pytest.raises(ValueError):
+        Save(save_dir=tmp_path, filename="configs.jsonl", fmt="json", shard_size=10)
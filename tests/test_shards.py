@@ -0,0 +1,126 @@
+import json
+import pytest
+import yaml
+from randfig.shards import ShardReader, ShardWriter, index_path, read_index, shard_path
+
+
+def _cfgs(n):
+    return [{"param_root": {"param_0": i, "param_1": [i, "a"]}} for i in range(n)]
+
+
+@pytest.mark.parametrize("filename,load_all", [
+    ["configs.yaml", lambda text: list(yaml.safe_load_all(text))],
+    ["configs.jsonl", lambda text: [json.loads(line) for line in text.splitlines()]],
+])
+def test_shard_writer(tmp_path, filename, load_all):
+    cfgs = _cfgs(5)
+
+    with ShardWriter(tmp_path, filename, max_docs=2) as writer:
+        for cfg in cfgs:
+            writer.write(cfg)
+
+    index = read_index(index_path(tmp_path, filename))
+    assert index["sample_id"].tolist() == [0, 1, 2, 3, 4]
+    assert index["shard"].tolist() == [0, 0, 1, 1, 2]
+
+    shards = [shard_path(tmp_path, filename, i).read_bytes() for i in range(3)]
+    assert [cfg for shard in shards for cfg in load_all(shard.decode())] == cfgs
+
+    for record, cfg in zip(index, cfgs):
+        data = shards[record["shard"]][record["offset"]:record["offset"] + record["length"]]
+        assert writer.format.loads(data) == cfg
+
+
+def test_shard_writer_max_bytes(tmp_path):
+    with ShardWriter(tmp_path, "configs.jsonl", max_docs=None, max_bytes=64) as writer:
+        for cfg in _cfgs(4):
+            writer.write(cfg)
+
+    index = read_index(writer.index_path)
+    sizes = [shard_path(tmp_path, "configs.jsonl", i).stat().st_size for i in set(index["shard"].tolist())]
+    assert len(sizes) > 1 and all(size <= 64 for size in sizes)
+
+
+def test_shard_writer_append(tmp_path):
+    with ShardWriter(tmp_path, "configs.yaml") as writer:
+        writer.write({"param_0": 0}, sample_id=10)
+
+    with ShardWriter(tmp_path, "configs.yaml", append=True) as writer:
+        writer.write({"param_0": 1})
+
+    index = read_index(writer.index_path, mmap=False)
+    assert index["sample_id"].tolist() == [10, 1]
+    assert index["shard"].tolist() == [0, 1]
+
+    with pytest.raises(ValueError):
+        writer.write({"param_0": 2})
+
+
+def test_shard_writer_overwrite(tmp_path):
+    tmp_path.joinpath("configs-other-00000.yaml").write_text("")
+
+    for n in [7, 2]:
+        with ShardWriter(tmp_path, "configs.yaml", max_docs=2) as writer:
+            for i in range(n):
+                writer.write({"param_0": i}, sample_id=i)
+
+    assert sorted(p.name for p in tmp_path.glob("configs-*.yaml")) == ["configs-00000.yaml", "configs-other-00000.yaml"]
+    assert list(ShardReader(tmp_path, "configs.yaml").iter_range()) == [{"param_0": 0}, {"param_0": 1}]
+
+
+@pytest.mark.parametrize("filename,max_docs,max_bytes", [
+    ["configs.yml", 1, None],
+    ["configs.yaml", 0, None],
+    ["configs.yaml", None, 0],
+])
+def test_shard_writer_value_error(tmp_path, filename, max_docs, max_bytes):
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path, filename, max_docs=max_docs, max_bytes=max_bytes)
+
+
+def test_read_index_value_error(tmp_path):
+    tmp_path.joinpath("configs.idx").write_bytes(b"not an index")
+
+    with pytest.raises(ValueError):
+        read_index(tmp_path.joinpath("configs.idx"))
+
+
+@pytest.mark.parametrize("filename", ["configs.yaml", "configs.jsonl"])
+def test_shard_reader(tmp_path, filename):
+    # strings that YAML 1.1 loaders read as booleans
+    cfgs = [dict(cfg, param_2=["yes", "on"]) for cfg in _cfgs(20)]
+
+    with ShardWriter(tmp_path, filename, max_docs=3) as writer:
+        for i, cfg in enumerate(cfgs):
+            writer.write(cfg, sample_id=100 + i)
+
+    with ShardReader(tmp_path, filename) as reader:
+        assert len(reader) == 20
+        assert reader[107] == cfgs[7]
+        assert 119 in reader and 120 not in reader
+        assert list(reader.iter_range(105, 110)) == cfgs[5:10]
+        assert list(reader.iter_range()) == cfgs
+        assert list(reader.iter_range(110, workers=2, chunk_size=3)) == cfgs[10:]
+
+        with pytest.raises(KeyError):
+            reader[99]
+
+
+def test_shard_reader_unordered_ids(tmp_path):
+    with ShardWriter(tmp_path, "configs.jsonl") as writer:
+        for sample_id in [3, 1, 2, 1]:
+            writer.write({"sample_id": sample_id, "order": writer.count}, sample_id=sample_id)
+
+    reader = ShardReader(tmp_path, "configs.jsonl")
+    assert reader.ids.tolist() == [1, 2, 3]
+    assert reader[1] == {"sample_id": 1, "order": 3}
+    assert [cfg["sample_id"] for cfg in reader.iter_range(2)] == [2, 3]
+    reader.close()
+
+
+def test_shard_reader_value_error(tmp_path):
+    with ShardWriter(tmp_path, "configs.jsonl") as writer:
+        writer.write({"param_0": 0})
+
+    with pytest.raises(ValueError):
+        list(ShardReader(tmp_path, "configs.jsonl").iter_range(workers=0))
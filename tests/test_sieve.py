@@ -0,0 +1,75 @@
+import pytest
+import pickle
+import numpy as np
+import randfig.expressions as expressions
+import randfig.utils as utils
+from pathlib import Path
+from randfig.sieve import DivisorIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DivisorIndex(5000)
+
+
+def test_spf(index):
+    assert index.spf[:10].tolist() == [0, 1, 2, 3, 2, 5, 2, 7, 2, 3]
+    assert index.spf[4999] == 4999
+
+
+@pytest.mark.parametrize("n", [1, 2, 360, 4096, 4999, 5000, 5001, 720720])
+def test_divisors(index, n):
+    assert index.divisors(n) == utils.get_divisors(n)
+    assert index.factorize(n) == utils.factorize(n)
+
+
+@pytest.mark.parametrize("n,divisors,not_found_strategy,threshold", [
+    [4620, None, "min", 100],
+    [4620, None, "max", 100],
+    [4620, [13, 7], "max", 100],
+    [-15, None, "min", 4],
+    [10 ** 6, [7], "max", 333],
+])
+def test_search_divisor(index, n, divisors, not_found_strategy, threshold):
+    expected = utils.search_divisor(n, not_found_strategy, threshold, divisors)
+
+    assert utils.search_divisor(n, not_found_strategy, threshold, divisors, index=index) == expected
+    assert utils.get_divisors(n, index=index) == utils.get_divisors(n)
+
+
+def test_get_divisors_zero_value_error(index):
+    with pytest.raises(ValueError):
+        utils.get_divisors(0, index=index)
+
+
+def test_get_divisor_expression(index):
+    cfg = {"param_0": 4620}
+    kwargs = {"not_found_strategy": "max", "threshold": 50, "index": index}
+
+    assert expressions.get_divisor(cfg, "param_0", kwargs) == 55
+
+
+def test_save_load(index, tmp_path: Path):
+    path = index.save(tmp_path / "spf")
+    loaded = DivisorIndex.load(path)
+
+    assert path.suffix == ".npy"
+    assert isinstance(loaded.spf, np.memmap)
+    assert loaded.limit == index.limit
+    assert loaded.divisors(4620) == index.divisors(4620)
+    assert not isinstance(DivisorIndex.load(path, mmap=False).spf, np.memmap)
+
+
+def test_pickle(index, tmp_path: Path):
+    loaded = DivisorIndex.load(index.save(tmp_path / "spf.npy"))
+    pickled = pickle.dumps(loaded)
+
+    assert len(pickled) < 1000
+    assert isinstance(pickle.loads(pickled).spf, np.memmap)
+    assert pickle.loads(pickle.dumps(index)).divisors(360) == index.divisors(360)
+
+
+@pytest.mark.parametrize("limit,spf", [[0, None], [10, np.zeros(3, dtype=np.int32)]])
+def test_value_error(limit, spf):
+    with pytest.raises(ValueError):
+        DivisorIndex(limit, spf=spf)
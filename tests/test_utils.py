@@ -1,6 +1,9 @@
 import pytest
+import random
 import randfig.utils as utils
+import numpy as np
 from collections import defaultdict
+from randfig.rng import generation_context
 
 
 @pytest.mark.parametrize("mapping,map_list,expected",
@@ -82,6 +85,49 @@ def test_mapping_to_dict(expected, mapping):
     assert out == expected
 
 
+def test_mapping_to_dict_reuses_dicts():
+    plain = {"param_0": {"param_1": 1}}
+    mapping = defaultdict(defaultdict, {"param_root": defaultdict(defaultdict, {"param_2": 2}), "param_plain": plain})
+    out = utils.mapping_to_dict(mapping)
+
+    assert utils.mapping_to_dict(plain) is plain
+    assert out["param_plain"] is plain
+    assert type(out) is dict and type(out["param_root"]) is dict
+    assert type(mapping["param_root"]) is defaultdict
+
+
+@pytest.mark.parametrize("to_mapping,mapping_type,root", [
+    (utils.mapping_to_dict, dict, {}),
+    (utils.mapping_to_defaultdict, defaultdict, defaultdict(defaultdict)),
+])
+def test_mapping_conversion_inplace(to_mapping, mapping_type, root):
+    root["param_0"] = defaultdict(defaultdict, {"param_1": 1}) if mapping_type is dict else {"param_1": 1}
+    out = to_mapping(root, inplace=True)
+
+    assert out is root
+    assert type(out["param_0"]) is mapping_type
+    assert out["param_0"] == {"param_1": 1}
+
+
+@pytest.mark.parametrize("to_mapping,mapping_type", [
+    (utils.mapping_to_dict, dict),
+    (utils.mapping_to_defaultdict, defaultdict),
+])
+def test_mapping_conversion_deep(to_mapping, mapping_type):
+    mapping = defaultdict(defaultdict, {"param_leaf": 0}) if mapping_type is dict else {"param_leaf": 0}
+    for _ in range(5000):
+        mapping = defaultdict(defaultdict, {"param_nest": mapping}) if mapping_type is dict else {"param_nest": mapping}
+
+    out = to_mapping(mapping)
+    depth = 0
+    while "param_nest" in out:
+        assert type(out) is mapping_type
+        out = out["param_nest"]
+        depth += 1
+
+    assert depth == 5000 and out["param_leaf"] == 0
+
+
 @pytest.mark.parametrize('cfg,expected,keys,value', [
     [
         {"param_root_0": {"param_00": "value_00"}},
@@ -219,12 +265,31 @@ def test_add_uniform_jitter_type_error(value, p, reference):
     [2, [1, 2]],
     [25, [1, 5, 25]],
     [210, [1, 2, 3, 5, 6, 7, 10, 14, 15, 21, 30, 35, 42, 70, 105, 210]],
+    [210.7, [1, 2, 3, 5, 6, 7, 10, 14, 15, 21, 30, 35, 42, 70, 105, 210]],
+    [-6, [1, -6]],
+    [999999937, [1, 999999937]],
+    [2 ** 30, [2 ** e for e in range(31)]],
 ])
 def test_get_divisors(num, expected):
     out = utils.get_divisors(num)
     assert out == expected
 
 
+def test_get_divisors_returns_a_copy():
+    utils.get_divisors(12).append(0)
+    assert utils.get_divisors(12) == [1, 2, 3, 4, 6, 12]
+
+
+@pytest.mark.parametrize('n,expected', [
+    [1, []],
+    [2, [2]],
+    [360, [2, 2, 2, 3, 3, 5]],
+    [1000000007 * 3, [3, 1000000007]],
+])
+def test_factorize(n, expected):
+    assert utils.factorize(n) == expected
+
+
 def test_get_divisors_zero_value_error():
     with pytest.raises(ValueError):
         utils.get_divisors(0)
@@ -326,6 +391,41 @@ def test_search_divisor(n, divisors, not_found_strategy, threshold, expected):
     assert out == expected
 
 
+@pytest.mark.parametrize('n,divisors,not_found_strategy,threshold', [
+    [[1, 210, 210, 210, 45, 64, -15, 7919], [4, 9], "min", [1, 8, 7, -3, 1000, 3, 4, 100]],
+    [[1, 210, 210, 210, 45, 64, -15, 7919], [4, 9], "max", [1, 11, 14, 300, 2, 3, 4, 100]],
+    [[210, 210, 999999937, 2 ** 40], None, "min", 100],
+    [[210, 210, 999999937, 2 ** 40], None, "max", 100],
+    [[210, -6, 12], [-6, 1], "max", 5],
+    [np.arange(1, 500).reshape(-1, 1), [8, 6, 0], "max", np.arange(499, 0, -1).reshape(-1, 1)],
+])
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_search_divisor_array(n, divisors, not_found_strategy, threshold):
+    n_ = np.asarray(n).reshape(-1).tolist()
+    threshold_ = np.broadcast_to(threshold, np.shape(n)).reshape(-1).tolist()
+    expected = [utils.search_divisor(m, not_found_strategy, t, divisors) for m, t in zip(n_, threshold_)]
+    out = utils.search_divisor_array(n, not_found_strategy, threshold, divisors)
+
+    assert out.shape == np.shape(n)
+    assert out.dtype == np.int64
+    assert out.reshape(-1).tolist() == expected
+
+
+@pytest.mark.parametrize('n,divisors,not_found_strategy,threshold', [
+    [[1, 0], None, "min", 1],
+    [[4, 5], [0], "min", 1],
+    [[4, 5], [2], "middle", 1],
+    [[4, 5], [2], "min", [1, 0]],
+])
+def test_search_divisor_array_value_error(n, divisors, not_found_strategy, threshold):
+    with pytest.raises(ValueError):
+        utils.search_divisor_array(n, not_found_strategy, threshold, divisors)
+
+
+def test_search_divisor_array_preferred_divisors_only():
+    assert utils.search_divisor_array([4, 8], "middle", 0, [2]).tolist() == [2, 2]
+
+
 @pytest.mark.parametrize('cfg,new_keys,expected,remove', [
     [
         {"key": [0]},
@@ -388,3 +488,18 @@ def test_unpack_value_error(cfg, new_keys):
 def test_unpack_type_error(cfg, new_keys):
     with pytest.raises(TypeError):
         utils.unpack(cfg=cfg, key="key", new_keys=new_keys)
+
+
+def test_add_uniform_jitter_rng():
+    with generation_context(42):
+        out = utils.add_uniform_jitter(460, 0.01, 511)
+
+    assert out == utils.add_uniform_jitter(460, 0.01, 511, rng=np.random.default_rng(42))
+
+
+def test_add_uniform_jitter_global_random():
+    random.seed(0)
+    out = utils.add_uniform_jitter(460, 0.01, 511)
+    random.seed(0)
+
+    assert out == utils.add_uniform_jitter(460, 0.01, 511)
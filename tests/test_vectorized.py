@@ -0,0 +1,87 @@
+import pytest
+import functools
+import numpy as np
+import randfig.expressions as expressions
+from randfig.batch import ConfigBatch
+from randfig.expressions import vectorized
+from randfig.transforms import Formula
+
+
+CFGS = [
+    {"a": 7, "b": 2, "x": 2.675, "y": -3.5, "n": 210, "sides": 6, "list": [0, 1], "name": "k0"},
+    {"a": 9, "b": 4, "x": 1.005, "y": 0.5, "n": 45, "sides": 4, "list": [2, 3], "name": "k1"},
+    {"a": -7, "b": 3, "x": 0.125, "y": 5.5, "n": 45, "sides": 8, "list": [4, 5], "name": "k0"},
+]
+
+
+@pytest.mark.parametrize("fn,kwargs", [
+    ["pop", {"key": "list", "element": 1}],
+    ["rounding", {"key": "x", "decimals": 2}],
+    ["rounding", {"key": "y", "decimals": 0}],
+    ["min_threshold_from_resolution", {"resolution_key": "a", "peak": 511}],
+    ["max_threshold_from_resolution", {"resolution_key": "x", "peak": 511, "sigmas": 3}],
+    ["division", {"num_key": "a", "den_key": "b"}],
+    ["division", {"num_key": "a", "den_key": "b", "integer": True}],
+    ["division", {"num_key": "y", "den_key": "x", "integer": True}],
+    ["division_by_num", {"n_key": "a", "num": 2, "integer": True}],
+    ["product", {"a_key": "a", "b_key": "x"}],
+    ["product_by_num", {"n_key": "y", "num": 3}],
+    ["get_regular_polygon_sides", {"side_len_key": "a", "apothem_key": "b"}],
+    ["round_to_closest_even", {"key_n": "y"}],
+    ["round_to_closest_even", {"key_n": "a"}],
+    ["get_regular_polygon_apothem", {"side_len_key": "x", "n_sides_key": "sides"}],
+    ["get_divisor", {"key": "n", "search_divisor_kwargs": {"not_found_strategy": "min", "threshold": 8}}],
+    ["pick_from_mapping", {"key": "name", "mapping": {"k0": 0, "k1": 1}}],
+    ["pick_from_mapping", {"key": "sides", "mapping": {4: "a", 6: "b", 8: "c"}}],
+    ["add", {"key_a": "a", "key_b": "x"}],
+    ["add_value", {"key": "name", "value": "_suffix"}],
+    ["call", {"key": "y", "fn": abs}],
+    ["trunc", {"key": "x", "decimals": 2}],
+    ["trunc", {"key": "a", "decimals": 1}],
+])
+def test_vectorized_matches_scalar(fn, kwargs):
+    scalar_cfgs = [dict(cfg, list=list(cfg["list"])) for cfg in CFGS]
+    expected = [getattr(expressions, fn)(cfg, **kwargs) for cfg in scalar_cfgs]
+
+    batch = ConfigBatch.from_dicts([dict(cfg, list=list(cfg["list"])) for cfg in CFGS])
+    out = getattr(vectorized, fn)(batch, **kwargs)
+
+    assert isinstance(out, np.ndarray)
+    assert out.tolist() == expected
+    assert [type(v) for v in out.tolist()] == [type(v) for v in expected]
+
+
+@pytest.mark.parametrize("fn", ["min_threshold_from_resolution", "max_threshold_from_resolution"])
+def test_vectorized_threshold_jitter(fn):
+    batch = ConfigBatch.from_dicts(CFGS)
+    out = getattr(vectorized, fn)(batch, resolution_key="a", peak=511, jitter=0.01)
+    no_jitter = getattr(vectorized, fn)(batch, resolution_key="a", peak=511)
+
+    assert np.all(np.abs(out - no_jitter) <= 0.01 * 511)
+
+
+@pytest.mark.parametrize("fn,kwargs,error", [
+    ["division", {"num_key": "a", "den_key": "name"}, TypeError],
+    ["division_by_num", {"n_key": "a", "num": 0}, ZeroDivisionError],
+    ["pop", {"key": "a"}, TypeError],
+    ["max_threshold_from_resolution", {"resolution_key": "a", "peak": 511, "is_percentage": False}, ValueError],
+])
+def test_vectorized_errors(fn, kwargs, error):
+    batch = ConfigBatch.from_dicts(CFGS)
+
+    with pytest.raises(error):
+        getattr(vectorized, fn)(batch, **kwargs)
+
+
+def test_get_vectorized():
+    formula = functools.partial(expressions.division, num_key="a", den_key="b")
+
+    assert isinstance(vectorized.get_vectorized(formula), functools.partial)
+    assert vectorized.get_vectorized(lambda cfg: cfg["a"]) is None
+
+
+def test_formula_batch_call():
+    formula = Formula(keys=["c"], formula=functools.partial(expressions.product, a_key="a", b_key="b"))
+    batch = formula.batch_call(ConfigBatch.from_dicts(CFGS))
+
+    assert batch.column("c").tolist() == [cfg["a"] * cfg["b"] for cfg in CFGS]